@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import logging
+import sqlite3
 from pathlib import Path
 import voluptuous as vol
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.components.frontend import add_extra_js_url
 
@@ -19,11 +21,13 @@ from .const import (
     CONF_WEATHER_RAIN_TODAY_ENTITY,
     CONF_WEATHER_RAIN_FORECAST_24H_ENTITY,
     CONF_WEATHER_TEMP_ENTITY,
+    CONF_WEATHER_FORECAST_ENTITY,
     CONF_KILL_SWITCH_ENTITY,
     CONF_KILL_SWITCH_MODE,
     CONF_GLOBAL_SKIP_RAIN_MM,
     CONF_GLOBAL_SKIP_FORECAST_MM,
     CONF_GLOBAL_MIN_RUN_LITERS,
+    CONF_RECORD_FLOW_TRACES,
     DEFAULT_KILL_SWITCH_MODE,
     DEFAULT_GLOBAL_SKIP_RAIN_MM,
     DEFAULT_GLOBAL_SKIP_FORECAST_MM,
@@ -33,8 +37,13 @@ from .const import (
     SCHEDULE_MODE_SMART,
     SCHEDULE_MODE_FIXED,
     DAYS_OF_WEEK,
+    SIMULATE_MAX_SCENARIOS,
 )
 from .manager import ValveManager
+from .websocket import async_register_websocket_handlers
+from .export import SessionExportView
+from .importer import IMPORT_FORMATS
+from .database import IrrigationDatabase
 from .zone_store import ZoneStore
 
 _LOGGER = logging.getLogger(__name__)
@@ -77,6 +86,18 @@ SERVICE_CANCEL_QUEUE = "cancel_queue"
 # v4.0-alpha-3 — reset a single zone's stored config back to defaults
 SERVICE_RESET_ZONE_TO_DEFAULTS = "reset_zone_to_defaults"
 
+# v4.2 — what-if calculator runs (returns a response, changes nothing)
+SERVICE_SIMULATE = "simulate"
+
+# v4.2 — bulk session history import from a file under /config
+SERVICE_IMPORT_SESSIONS = "import_sessions"
+
+# v4.2 — check (and optionally repair) lifetime totals against sessions
+SERVICE_VERIFY_TOTALS = "verify_totals"
+
+# v4.2 — online database backup to /config/backups
+SERVICE_BACKUP_DATABASE = "backup_database"
+
 SCHEMA_START_TIMED = vol.Schema({
     vol.Required("valve"): cv.string,
     vol.Required("minutes"): vol.Coerce(float),
@@ -160,6 +181,36 @@ SCHEMA_NONE = vol.Schema({})
 # v4.0-alpha-3
 SCHEMA_RESET_ZONE_TO_DEFAULTS = vol.Schema({vol.Required("zone"): cv.string})
 
+# v4.2 — a missing scenario key means "use the current sensor reading";
+# an explicit null means "sensor missing" (calculator neutral default).
+_OPTIONAL_FLOAT = vol.Any(None, vol.Coerce(float))
+SIMULATE_SCENARIO_SCHEMA = vol.Schema({
+    vol.Optional("vpd_kpa"): _OPTIONAL_FLOAT,
+    vol.Optional("rain_today_mm"): _OPTIONAL_FLOAT,
+    vol.Optional("rain_forecast_24h_mm"): _OPTIONAL_FLOAT,
+})
+SCHEMA_SIMULATE = vol.Schema({
+    vol.Required("scenarios"): vol.All(
+        cv.ensure_list, [SIMULATE_SCENARIO_SCHEMA],
+        vol.Length(min=1, max=SIMULATE_MAX_SCENARIOS),
+    ),
+    vol.Optional("zones", default=[]): _ZONE_LIST,
+    vol.Optional("global_min_run_liters"): vol.Coerce(float),
+})
+
+SCHEMA_IMPORT_SESSIONS = vol.Schema({
+    vol.Required("path"): cv.string,
+    vol.Optional("format"): vol.In(IMPORT_FORMATS),
+})
+
+SCHEMA_VERIFY_TOTALS = vol.Schema({
+    vol.Optional("repair", default=False): cv.boolean,
+})
+
+SCHEMA_BACKUP_DATABASE = vol.Schema({
+    vol.Optional("method", default="backup"): vol.In(IrrigationDatabase.BACKUP_METHODS),
+})
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # v4.0-alpha-6 — auto-register the embed card frontend resource
@@ -283,11 +334,13 @@ def _apply_options_to_manager(mgr: ValveManager, options) -> None:
         DEFAULT_GLOBAL_SKIP_RAIN_MM,
         DEFAULT_GLOBAL_SKIP_FORECAST_MM,
         DEFAULT_GLOBAL_MIN_RUN_LITERS,
+        DEFAULT_RECORD_FLOW_TRACES,
     )
     mgr.weather_vpd_entity = options.get(CONF_WEATHER_VPD_ENTITY) or None
     mgr.weather_rain_today_entity = options.get(CONF_WEATHER_RAIN_TODAY_ENTITY) or None
     mgr.weather_rain_forecast_24h_entity = options.get(CONF_WEATHER_RAIN_FORECAST_24H_ENTITY) or None
     mgr.weather_temp_entity = options.get(CONF_WEATHER_TEMP_ENTITY) or None
+    mgr.weather_forecast_entity = options.get(CONF_WEATHER_FORECAST_ENTITY) or None
     mgr.global_skip_rain_threshold_mm = float(
         options.get(CONF_GLOBAL_SKIP_RAIN_MM, DEFAULT_GLOBAL_SKIP_RAIN_MM)
     )
@@ -297,9 +350,17 @@ def _apply_options_to_manager(mgr: ValveManager, options) -> None:
     mgr.global_min_run_liters = float(
         options.get(CONF_GLOBAL_MIN_RUN_LITERS, DEFAULT_GLOBAL_MIN_RUN_LITERS)
     )
+    mgr.record_flow_traces = bool(
+        options.get(CONF_RECORD_FLOW_TRACES, DEFAULT_RECORD_FLOW_TRACES)
+    )
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    # v4.2 — websocket commands are domain-wide; register them once here
+    # rather than per config entry.
+    async_register_websocket_handlers(hass)
+    # v4.2 — session history export (CSV / NDJSON), see export.py.
+    hass.http.register_view(SessionExportView())
     return True
 
 
@@ -564,6 +625,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _reset_zone_to_defaults, SCHEMA_RESET_ZONE_TO_DEFAULTS,
     )
 
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — what-if simulation
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def _simulate(call):
+        return await mgr.async_simulate(
+            call.data["scenarios"],
+            zones=call.data.get("zones") or None,
+            global_min_run_liters=call.data.get("global_min_run_liters"),
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SIMULATE, _simulate, SCHEMA_SIMULATE,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — bulk session import
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def _import_sessions(call):
+        try:
+            return await mgr.async_import_sessions(
+                call.data["path"], call.data.get("format"),
+            )
+        except ValueError as e:
+            raise HomeAssistantError(str(e)) from e
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_IMPORT_SESSIONS, _import_sessions, SCHEMA_IMPORT_SESSIONS,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _verify_totals(call):
+        return await mgr.async_verify_totals(repair=call.data["repair"])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_VERIFY_TOTALS, _verify_totals, SCHEMA_VERIFY_TOTALS,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _backup_database(call):
+        try:
+            return await mgr.async_backup_database(call.data["method"])
+        except (OSError, sqlite3.Error) as e:
+            raise HomeAssistantError(f"Database backup failed: {e}") from e
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKUP_DATABASE, _backup_database, SCHEMA_BACKUP_DATABASE,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     await mgr.async_start()
 
@@ -21,14 +21,17 @@ Why a separate cache (instead of querying the DB on every sensor read):
 This module does no I/O directly — `build_daily_summary` is async only
 because the database calls are. Pure-data helpers (`zero_fill`,
 `sum_by_date`) are sync and unit-testable in isolation.
+
+v4.2 — columnar layout (see "Data shapes"); the date axis uses the
+local date, matching the local-time binning of the breakdown query.
 """
 
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .database import IrrigationDatabase
 
@@ -37,79 +40,126 @@ _LOGGER = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Data shapes
+#
+# v4.2 — columnar. One shared date axis (`DailySummary.dates`, most-recent
+# first) and, per zone, parallel `liters` / `minutes` / `sessions` arrays
+# indexed like it. 50 zones × 30 days is now 150 short lists instead of
+# 1 500 per-day dicts — in memory, in the JSON store and in the sensor
+# attributes.
 # ─────────────────────────────────────────────────────────────────────────────
 
-
-@dataclass
-class DayBucket:
-    """One day of delivery for one zone (or for all zones combined)."""
-    date: str           # ISO date "YYYY-MM-DD"
-    liters: float
-    minutes: float
-    sessions: int
+SUMMARY_FORMAT_VERSION = 2
 
 
 @dataclass
 class ZoneSeries:
-    """Time-series of daily buckets for one zone, most-recent first."""
+    """Daily columns for one zone (or all zones combined), aligned to
+    `DailySummary.dates`."""
     zone: str
     name: str
-    days: List[DayBucket] = field(default_factory=list)
+    liters: List[float] = field(default_factory=list)
+    minutes: List[float] = field(default_factory=list)
+    sessions: List[int] = field(default_factory=list)
 
     @property
     def total_liters(self) -> float:
-        return round(sum(d.liters for d in self.days), 2)
+        return round(sum(self.liters), 2)
 
     @property
     def total_minutes(self) -> float:
-        return round(sum(d.minutes for d in self.days), 2)
+        return round(sum(self.minutes), 2)
 
     @property
     def total_sessions(self) -> int:
-        return sum(d.sessions for d in self.days)
+        return sum(self.sessions)
+
+    def columns(self) -> Dict[str, Any]:
+        return {
+            "liters": self.liters,
+            "minutes": self.minutes,
+            "sessions": self.sessions,
+        }
 
 
 @dataclass
 class DailySummary:
-    """Full snapshot — per-zone series + a global combined series."""
+    """Full snapshot — per-zone columns + a combined series."""
     days_back: int
     built_at: str               # ISO timestamp
+    dates: List[str] = field(default_factory=list)
     zones: List[ZoneSeries] = field(default_factory=list)
-    combined: List[DayBucket] = field(default_factory=list)
+    combined: ZoneSeries = field(
+        default_factory=lambda: ZoneSeries(zone="", name="All zones"),
+    )
+
+    def zone(self, topic: str) -> Optional[ZoneSeries]:
+        for zs in self.zones:
+            if zs.zone == topic:
+                return zs
+        return None
+
+    def index_of(self, day: str) -> Optional[int]:
+        """Column index of an ISO date, or None if outside the window."""
+        if not self.dates:
+            return None
+        try:
+            offset = (date.fromisoformat(self.dates[0]) - date.fromisoformat(day)).days
+        except ValueError:
+            return None
+        return offset if 0 <= offset < len(self.dates) else None
 
     def to_dict(self) -> Dict[str, Any]:
-        """JSON-serializable view used by ZoneStore persistence."""
+        """JSON-serializable columnar view used by ZoneStore persistence.
+
+        `combined` is derived, so it isn't stored.
+        """
         return {
+            "v": SUMMARY_FORMAT_VERSION,
             "days_back": self.days_back,
             "built_at": self.built_at,
+            "dates": self.dates,
             "zones": [
-                {
-                    "zone": z.zone,
-                    "name": z.name,
-                    "days": [asdict(d) for d in z.days],
-                }
+                {"zone": z.zone, "name": z.name, **z.columns()}
                 for z in self.zones
             ],
-            "combined": [asdict(d) for d in self.combined],
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "DailySummary":
-        """Inverse of to_dict — used to hydrate from the persisted snapshot."""
-        zones = []
-        for zd in data.get("zones", []):
-            days = [DayBucket(**dd) for dd in zd.get("days", [])]
-            zones.append(ZoneSeries(
-                zone=zd.get("zone", ""),
-                name=zd.get("name", zd.get("zone", "")),
-                days=days,
-            ))
-        combined = [DayBucket(**dd) for dd in data.get("combined", [])]
+        """Inverse of to_dict — also accepts the pre-v4.2 per-day dicts."""
+        days_back = int(data.get("days_back", 30))
+        zones: List[ZoneSeries] = []
+        if data.get("v") == SUMMARY_FORMAT_VERSION:
+            dates = list(data.get("dates") or [])
+            for zd in data.get("zones", []):
+                zones.append(ZoneSeries(
+                    zone=zd.get("zone", ""),
+                    name=zd.get("name", zd.get("zone", "")),
+                    liters=[float(x) for x in zd.get("liters") or []],
+                    minutes=[float(x) for x in zd.get("minutes") or []],
+                    sessions=[int(x) for x in zd.get("sessions") or []],
+                ))
+        else:
+            # Pre-v4.2: every zone carries its own list of
+            # {date, liters, minutes, sessions}, all zero-filled to the
+            # same window — the first zone's dates are the axis.
+            legacy = data.get("zones", [])
+            dates = [d.get("date", "") for d in (legacy[0].get("days", []) if legacy else [])]
+            for zd in legacy:
+                rows = zd.get("days", [])
+                zones.append(ZoneSeries(
+                    zone=zd.get("zone", ""),
+                    name=zd.get("name", zd.get("zone", "")),
+                    liters=[float(d.get("liters", 0)) for d in rows],
+                    minutes=[float(d.get("minutes", 0)) for d in rows],
+                    sessions=[int(d.get("sessions", 0)) for d in rows],
+                ))
         return cls(
-            days_back=int(data.get("days_back", 30)),
+            days_back=days_back,
             built_at=data.get("built_at", ""),
+            dates=dates,
             zones=zones,
-            combined=combined,
+            combined=sum_by_date(zones, len(dates)),
         )
 
 
@@ -118,61 +168,62 @@ class DailySummary:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def _date_str(d: date) -> str:
-    return d.isoformat()
+def date_axis(today: date, days_back: int) -> List[str]:
+    """ISO dates from `today` back `days_back - 1` days, most-recent first."""
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(days_back)]
 
 
-def zero_fill(rows: List[Dict[str, Any]], days_back: int) -> List[DayBucket]:
-    """Convert a sparse list of rows from the SQL query into a dense
-    contiguous date series, most-recent first, with zero-filled gaps.
+def zero_fill(
+    rows: List[Dict[str, Any]],
+    days_back: int,
+    today: Optional[date] = None,
+) -> Tuple[List[float], List[float], List[int]]:
+    """Scatter sparse SQL rows onto a dense date axis in one pass.
 
     `rows` is the raw output of `IrrigationDatabase.get_daily_breakdown`
-    — only days that had at least one session are present. The dashboard
-    chart wants every date in the window so the bars line up.
+    — only days that had at least one session are present. Returns
+    `(liters, minutes, sessions)` columns aligned to
+    `date_axis(today, days_back)`, zeros where there was no session.
+
+    v4.2 — `today` should be the LOCAL date the rows were binned by;
+    it defaults to the UTC date for backwards compatibility.
     """
-    by_date = {r["date"]: r for r in rows}
-    today = datetime.now(timezone.utc).date()
-    out: List[DayBucket] = []
-    for offset in range(days_back):
-        d = today - timedelta(days=offset)
-        key = _date_str(d)
-        r = by_date.get(key)
-        if r is None:
-            out.append(DayBucket(date=key, liters=0.0, minutes=0.0, sessions=0))
-        else:
-            out.append(DayBucket(
-                date=key,
-                liters=float(r.get("liters", 0)),
-                minutes=float(r.get("minutes", 0)),
-                sessions=int(r.get("sessions", 0)),
-            ))
-    return out
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+    liters = [0.0] * days_back
+    minutes = [0.0] * days_back
+    sessions = [0] * days_back
+    for r in rows:
+        try:
+            i = (today - date.fromisoformat(r["date"])).days
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= i < days_back:
+            liters[i] = float(r.get("liters", 0))
+            minutes[i] = float(r.get("minutes", 0))
+            sessions[i] = int(r.get("sessions", 0))
+    return liters, minutes, sessions
 
 
-def sum_by_date(zone_series: List[ZoneSeries]) -> List[DayBucket]:
-    """Combine per-zone series into a single across-all-zones series.
+def sum_by_date(zone_series: List[ZoneSeries], days: int) -> ZoneSeries:
+    """Column-wise sum of per-zone series into one all-zones series.
 
-    Iterates each zone's days, accumulating into a per-date bucket. The
-    output is in the same date order as the input series (most-recent
-    first), one entry per unique date observed.
+    Every input series is aligned to the same date axis, so this is a
+    single element-wise pass per column.
     """
-    by_date: Dict[str, DayBucket] = {}
-    for zs in zone_series:
-        for db in zs.days:
-            agg = by_date.get(db.date)
-            if agg is None:
-                by_date[db.date] = DayBucket(
-                    date=db.date,
-                    liters=db.liters,
-                    minutes=db.minutes,
-                    sessions=db.sessions,
-                )
-            else:
-                agg.liters = round(agg.liters + db.liters, 2)
-                agg.minutes = round(agg.minutes + db.minutes, 2)
-                agg.sessions += db.sessions
-    # Most-recent first
-    return sorted(by_date.values(), key=lambda x: x.date, reverse=True)
+    def _col(name: str) -> List[Any]:
+        cols = [getattr(zs, name) for zs in zone_series]
+        if not cols:
+            return [0] * days
+        return [sum(vals) for vals in zip(*cols)]
+
+    return ZoneSeries(
+        zone="",
+        name="All zones",
+        liters=[round(v, 2) for v in _col("liters")],
+        minutes=[round(v, 2) for v in _col("minutes")],
+        sessions=_col("sessions"),
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -199,6 +250,8 @@ async def build_daily_summary(
     at 22:00 local (= 12:00 UTC) to the previous day. The manager
     passes `dt_util.DEFAULT_TIME_ZONE` (HA's configured local TZ).
     """
+    now = datetime.now(timezone.utc)
+    today = (now.astimezone(local_tz) if local_tz is not None else now).date()
     zone_series: List[ZoneSeries] = []
     for topic, v in valves.items():
         try:
@@ -210,19 +263,21 @@ async def build_daily_summary(
                 "Aggregator: get_daily_breakdown(%s) failed: %s", topic, e,
             )
             rows = []
+        liters, minutes, sessions = zero_fill(rows, days_back, today)
         zone_series.append(ZoneSeries(
             zone=topic,
             name=getattr(v, "name", topic),
-            days=zero_fill(rows, days_back),
+            liters=liters,
+            minutes=minutes,
+            sessions=sessions,
         ))
 
-    combined = sum_by_date(zone_series)
-
     summary = DailySummary(
         days_back=days_back,
-        built_at=datetime.now(timezone.utc).isoformat(),
+        built_at=now.isoformat(),
+        dates=date_axis(today, days_back),
         zones=zone_series,
-        combined=combined,
+        combined=sum_by_date(zone_series, days_back),
     )
     _LOGGER.debug(
         "📊 Aggregator: built %d-day summary across %d zones, %.2f L total",
@@ -230,3 +285,109 @@ async def build_daily_summary(
         sum(zs.total_liters for zs in zone_series),
     )
     return summary
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# v4.2 — Multi-resolution usage series
+#
+# Day / ISO-week / month / year buckets over an arbitrary local-date
+# range, served from the `usage_daily` rollup (see database.py). The
+# result is columnar like `DailySummary`: one `periods` axis (oldest
+# first, zero-filled) and parallel arrays per zone.
+# ─────────────────────────────────────────────────────────────────────────────
+
+USAGE_RESOLUTIONS = ("day", "week", "month", "year")
+
+
+def period_axis(resolution: str, start: date, end: date) -> List[Tuple[str, str]]:
+    """`(rollup key, label)` for every period touching `[start, end]`,
+    oldest first. Week labels are ISO `YYYY-Www`; keys are the Monday.
+    """
+    out: List[Tuple[str, str]] = []
+    if resolution == "day":
+        d = start
+        while d <= end:
+            out.append((d.isoformat(), d.isoformat()))
+            d += timedelta(days=1)
+    elif resolution == "week":
+        d = start - timedelta(days=start.weekday())
+        while d <= end:
+            iso = d.isocalendar()
+            out.append((d.isoformat(), f"{iso[0]}-W{iso[1]:02d}"))
+            d += timedelta(days=7)
+    elif resolution == "month":
+        y, m = start.year, start.month
+        while (y, m) <= (end.year, end.month):
+            key = f"{y:04d}-{m:02d}"
+            out.append((key, key))
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    elif resolution == "year":
+        for y in range(start.year, end.year + 1):
+            out.append((f"{y:04d}", f"{y:04d}"))
+    else:
+        raise ValueError(f"unknown resolution {resolution!r}")
+    return out
+
+
+def count_periods(resolution: str, start: date, end: date) -> int:
+    """Length of `period_axis` without building it."""
+    if end < start:
+        return 0
+    if resolution == "day":
+        return (end - start).days + 1
+    if resolution == "week":
+        monday = start - timedelta(days=start.weekday())
+        return (end - monday).days // 7 + 1
+    if resolution == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    if resolution == "year":
+        return end.year - start.year + 1
+    raise ValueError(f"unknown resolution {resolution!r}")
+
+
+async def build_usage_series(
+    db: IrrigationDatabase,
+    valves: Dict[str, Any],
+    resolution: str,
+    start: date,
+    end: date,
+) -> Dict[str, Any]:
+    """Zero-filled per-zone + combined usage at `resolution` over local
+    dates `[start, end]`. One rollup query for all zones."""
+    axis = period_axis(resolution, start, end)
+    index = {key: i for i, (key, _label) in enumerate(axis)}
+    n = len(axis)
+    topics = list(valves)
+    rows = await db.get_usage_buckets(
+        resolution, start.isoformat(), end.isoformat(), topics,
+    )
+    series: Dict[str, ZoneSeries] = {
+        t: ZoneSeries(
+            zone=t,
+            name=getattr(valves[t], "name", t),
+            liters=[0.0] * n,
+            minutes=[0.0] * n,
+            sessions=[0] * n,
+        )
+        for t in topics
+    }
+    for r in rows:
+        zs = series.get(r["valve_topic"])
+        i = index.get(r["period"])
+        if zs is None or i is None:
+            continue
+        zs.liters[i] = r["liters"]
+        zs.minutes[i] = r["minutes"]
+        zs.sessions[i] = r["sessions"]
+    zone_list = list(series.values())
+    combined = sum_by_date(zone_list, n)
+    return {
+        "resolution": resolution,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "periods": [label for _key, label in axis],
+        "zones": [
+            {"zone": z.zone, "name": z.name, **z.columns()} for z in zone_list
+        ],
+        "combined": combined.columns(),
+    }
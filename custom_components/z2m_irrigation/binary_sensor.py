@@ -33,6 +33,7 @@ from .const import (
     MANUFACTURER,
     MODEL,
     SIG_NEW_VALVE,
+    SIG_PANIC_STATE,
     sig_update,
     sig_zone_config_changed,
 )
@@ -41,7 +42,7 @@ from .zone_store import ZoneConfig
 
 _LOGGER = logging.getLogger(__name__)
 
-_PANIC_SIGNAL = "z2m_irrigation_panic_state_changed"
+_PANIC_SIGNAL = SIG_PANIC_STATE
 
 
 async def async_setup_entry(
@@ -18,15 +18,33 @@ Inputs that are missing or unavailable are treated as neutral:
 The calculator does no I/O. The integration's `weather.py` helper is
 responsible for reading sensor states and producing a `WeatherInputs`
 struct, which is then handed in here.
+
+v4.2 — `compute_batch` evaluates the same formula for every zone under
+many weather scenarios at once (the `simulate` service / websocket
+command). It uses NumPy when it is importable and falls back to plain
+Python otherwise; both paths produce identical numbers to `compute`
+(the NumPy path vectorizes the grid but rounds and totals in Python).
+
+v4.2 — optional per-zone `carryover_mm` from the soil water balance
+(`water_balance.py`) is added to the need before rain is subtracted:
+
+    need_mm  = max(0, carryover_mm + base_mm * dryness - rain - 0.7 * fc24)
+
+A zero carry-over leaves every number unchanged.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
 
 from .zone_store import ZoneConfig
 
+try:  # Optional — HA ships NumPy on most installs, but don't require it.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the install
+    np = None
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Defaults applied when inputs are missing
@@ -43,7 +61,7 @@ DRYNESS_VPD_DIVISOR = 3.0
 FORECAST_DAMPENING = 0.7  # 70% of forecasted rain is subtracted from need
 
 
-@dataclass
+@dataclass(frozen=True)
 class WeatherInputs:
     """Resolved weather inputs for a single calculator run."""
     vpd_kpa: Optional[float]
@@ -64,7 +82,7 @@ class WeatherInputs:
         return self.fc24_mm if self.fc24_mm is not None else NEUTRAL_FC24_MM
 
 
-@dataclass
+@dataclass(frozen=True)
 class ZoneCalc:
     """Per-zone calculator output."""
     zone: str
@@ -76,16 +94,45 @@ class ZoneCalc:
     liters: float
     skipped: bool
     skip_reason: Optional[str]  # "below_min_run" | "not_in_smart_cycle" | None
+    carryover_mm: float = 0.0   # v4.2 — water-balance deficit drawn today
 
 
-@dataclass
+@dataclass(frozen=True)
 class CalculatorResult:
-    """Aggregate result of a calculator run, ready to render and to act on."""
+    """Aggregate result of a calculator run, ready to render and to act on.
+
+    v4.2 — frozen so the manager can hand the same instance back on a
+    memo hit. The VPD diagnostics are filled in by the manager through
+    `dataclasses.replace`; `compute` leaves them at their defaults.
+    """
     weather: WeatherInputs
     dryness: float                   # global dryness factor (same for all zones)
     zones: List[ZoneCalc]
     total_liters: float
     runnable_zones: int              # count of zones with liters > 0 and not skipped
+    vpd_snapshot_kpa: Optional[float] = None
+    vpd_24h_avg_kpa: Optional[float] = None
+    vpd_sample_count: int = 0
+    vpd_window_avgs_kpa: Dict[str, Optional[float]] = field(default_factory=dict)
+
+
+# v4.2 — memo-key resolution for `quantize_inputs`. Input changes smaller
+# than one step are treated as "same weather" by the manager's cache.
+QUANT_VPD_KPA = 0.01
+QUANT_MM = 0.1
+
+
+def quantize_inputs(weather: WeatherInputs) -> tuple:
+    """Hashable, quantized (vpd, rain, fc24) for result memoization.
+
+    Uses the *effective* values, so "sensor missing" and "sensor reads
+    the neutral default" share a key — they produce the same result.
+    """
+    return (
+        round(weather.effective_vpd / QUANT_VPD_KPA),
+        round(weather.effective_rain_today / QUANT_MM),
+        round(weather.effective_fc24 / QUANT_MM),
+    )
 
 
 def _clamp(value: float, lo: float, hi: float) -> float:
@@ -105,6 +152,7 @@ def compute(
     zones: dict[str, ZoneConfig],
     weather: WeatherInputs,
     global_min_run_liters: float,
+    carryover_mm: Optional[Dict[str, float]] = None,
 ) -> CalculatorResult:
     """Run the full calculator over a set of zones.
 
@@ -113,6 +161,8 @@ def compute(
         weather: resolved weather inputs (with `None`s for missing sensors)
         global_min_run_liters: fallback minimum-run threshold for zones
             that don't have their own override
+        carryover_mm: v4.2 — per-zone soil-water deficit to add to the
+            need (missing zones carry 0)
 
     Returns:
         CalculatorResult with per-zone breakdown and a total.
@@ -122,11 +172,13 @@ def compute(
     fc24 = weather.effective_fc24
     dryness = compute_dryness(vpd)
 
+    carry = carryover_mm or {}
     out: List[ZoneCalc] = []
     total = 0.0
     runnable = 0
 
     for name, cfg in zones.items():
+        carry_mm = float(carry.get(name, 0.0))
         # Zones not in the smart cycle still get a calc row (so the dashboard
         # can show "would have been Xl"), but they're flagged skipped.
         if not cfg.in_smart_cycle:
@@ -141,11 +193,14 @@ def compute(
                     liters=0.0,
                     skipped=True,
                     skip_reason="not_in_smart_cycle",
+                    carryover_mm=carry_mm,
                 )
             )
             continue
 
-        need_mm = max(0.0, cfg.base_mm * dryness - rain - FORECAST_DAMPENING * fc24)
+        need_mm = max(
+            0.0, carry_mm + cfg.base_mm * dryness - rain - FORECAST_DAMPENING * fc24,
+        )
         liters = need_mm * cfg.factor * cfg.l_per_mm
 
         min_run = (
@@ -167,6 +222,7 @@ def compute(
                 liters=round(liters, 2),
                 skipped=skipped,
                 skip_reason=skip_reason,
+                carryover_mm=carry_mm,
             )
         )
 
@@ -181,3 +237,166 @@ def compute(
         total_liters=round(total, 2),
         runnable_zones=runnable,
     )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# v4.2 — Batch / what-if evaluation
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class ZoneBatch:
+    """Column-oriented zone parameters for `compute_batch`."""
+    names: List[str]
+    base_mm: List[float]
+    factor: List[float]
+    l_per_mm: List[float]
+    min_run_liters: List[float]      # per-zone override already resolved
+    in_smart_cycle: List[bool]
+    carryover_mm: List[float] = field(default_factory=list)  # v4.2; empty = zeros
+
+    @classmethod
+    def from_zones(
+        cls,
+        zones: Dict[str, ZoneConfig],
+        global_min_run_liters: float,
+        carryover_mm: Optional[Dict[str, float]] = None,
+    ) -> "ZoneBatch":
+        names = list(zones)
+        cfgs = [zones[n] for n in names]
+        carry = carryover_mm or {}
+        return cls(
+            names=names,
+            base_mm=[float(c.base_mm) for c in cfgs],
+            factor=[float(c.factor) for c in cfgs],
+            l_per_mm=[float(c.l_per_mm) for c in cfgs],
+            min_run_liters=[
+                float(c.min_run_liters)
+                if c.min_run_liters is not None else float(global_min_run_liters)
+                for c in cfgs
+            ],
+            in_smart_cycle=[bool(c.in_smart_cycle) for c in cfgs],
+            carryover_mm=[float(carry.get(n, 0.0)) for n in names],
+        )
+
+    def carry(self) -> List[float]:
+        return self.carryover_mm or [0.0] * len(self.names)
+
+
+@dataclass
+class BatchResult:
+    """Scenario × zone grid of calculator outputs.
+
+    Row `i` of `liters` / `skipped` belongs to `scenarios[i]`; column `j`
+    to `zones[j]`. Zones below min-run are marked skipped but still
+    carry their would-be liters, matching `compute`'s "would have been
+    X L" rows; zones not in the smart cycle are skipped and report 0 L,
+    as in `compute`. Skipped zones don't count toward `total_liters`.
+    """
+    zones: List[str]
+    scenarios: List[WeatherInputs]
+    dryness: List[float]
+    liters: List[List[float]] = field(default_factory=list)
+    skipped: List[List[bool]] = field(default_factory=list)
+    total_liters: List[float] = field(default_factory=list)
+    runnable_zones: List[int] = field(default_factory=list)
+    backend: str = "python"
+
+
+def compute_batch(
+    zones: ZoneBatch,
+    scenarios: Sequence[WeatherInputs],
+) -> BatchResult:
+    """Evaluate the calculator for every (scenario, zone) pair at once."""
+    if np is not None and zones.names and scenarios:
+        return _compute_batch_numpy(zones, scenarios)
+    return _compute_batch_python(zones, scenarios)
+
+
+def _compute_batch_numpy(
+    zones: ZoneBatch, scenarios: Sequence[WeatherInputs],
+) -> BatchResult:
+    vpd = np.array([w.effective_vpd for w in scenarios], dtype=float)
+    rain = np.array([w.effective_rain_today for w in scenarios], dtype=float)
+    fc24 = np.array([w.effective_fc24 for w in scenarios], dtype=float)
+    dryness = np.clip(
+        DRYNESS_BASELINE + vpd / DRYNESS_VPD_DIVISOR, DRYNESS_FLOOR, DRYNESS_CEIL,
+    )
+
+    base = np.array(zones.base_mm, dtype=float)
+    factor = np.array(zones.factor, dtype=float)
+    l_per_mm = np.array(zones.l_per_mm, dtype=float)
+    carry = np.array(zones.carry(), dtype=float)
+    min_run = np.array(zones.min_run_liters, dtype=float)
+    in_cycle = np.array(zones.in_smart_cycle, dtype=bool)
+
+    # (S, 1) against (Z,) broadcasts to the (S, Z) grid. Element-wise
+    # operation order mirrors `compute`, so the unrounded grid is
+    # bit-identical to it.
+    need = np.maximum(
+        0.0,
+        carry + base * dryness[:, None] - rain[:, None] - (FORECAST_DAMPENING * fc24)[:, None],
+    )
+    liters = np.where(in_cycle, need * factor * l_per_mm, 0.0)
+    skipped = (liters < min_run) | ~in_cycle
+
+    # Rounding and the row totals stay in Python: `np.round` (scale,
+    # rint, unscale) and the pairwise `.sum` both differ from Python's
+    # `round` and `compute`'s sequential `total +=` in the last digit.
+    result = BatchResult(
+        zones=list(zones.names),
+        scenarios=list(scenarios),
+        dryness=dryness.tolist(),
+        skipped=skipped.tolist(),
+        runnable_zones=(~skipped).sum(axis=1).astype(int).tolist(),
+        backend="numpy",
+    )
+    for row_l, row_s in zip(liters.tolist(), result.skipped):
+        total = 0.0
+        for x, skip in zip(row_l, row_s):
+            if not skip:
+                total += x
+        result.liters.append([round(x, 2) for x in row_l])
+        result.total_liters.append(round(total, 2))
+    return result
+
+
+def _compute_batch_python(
+    zones: ZoneBatch, scenarios: Sequence[WeatherInputs],
+) -> BatchResult:
+    result = BatchResult(
+        zones=list(zones.names), scenarios=list(scenarios), dryness=[],
+    )
+    params = list(zip(
+        zones.base_mm, zones.factor, zones.l_per_mm,
+        zones.min_run_liters, zones.in_smart_cycle, zones.carry(),
+    ))
+    for w in scenarios:
+        dryness = compute_dryness(w.effective_vpd)
+        rain = w.effective_rain_today
+        fc_wet = FORECAST_DAMPENING * w.effective_fc24
+        row_l: List[float] = []
+        row_s: List[bool] = []
+        total = 0.0
+        runnable = 0
+        for base_mm, factor, l_per_mm, min_run, in_cycle, carry_mm in params:
+            if not in_cycle:
+                row_l.append(0.0)
+                row_s.append(True)
+                continue
+            liters = (
+                max(0.0, carry_mm + base_mm * dryness - rain - fc_wet)
+                * factor * l_per_mm
+            )
+            skipped = liters < min_run
+            row_l.append(round(liters, 2))
+            row_s.append(skipped)
+            if not skipped:
+                total += liters
+                runnable += 1
+        result.dryness.append(dryness)
+        result.liters.append(row_l)
+        result.skipped.append(row_s)
+        result.total_liters.append(round(total, 2))
+        result.runnable_zones.append(runnable)
+    return result
@@ -2,7 +2,8 @@
 
 v4.0-alpha-1 — rewritten as a 3-step options flow:
   Step 1 (init)    — MQTT base topic, manual topics, flow scale.
-  Step 2 (weather) — VPD / rain-today / forecast-24h / temp entity ids.
+  Step 2 (weather) — VPD / rain-today / forecast-24h / temp entity ids,
+                     plus (v4.2) a weather entity for the 7-day planner.
   Step 3 (safety)  — Kill switch entity, mode, global skip thresholds.
 
 The initial setup step (`async_step_user`) is intentionally trivial: it
@@ -28,10 +29,13 @@ from .const import (
     CONF_MANUAL_TOPICS,
     CONF_FLOW_SCALE,
     DEFAULT_FLOW_SCALE,
+    CONF_RECORD_FLOW_TRACES,
+    DEFAULT_RECORD_FLOW_TRACES,
     CONF_WEATHER_VPD_ENTITY,
     CONF_WEATHER_RAIN_TODAY_ENTITY,
     CONF_WEATHER_RAIN_FORECAST_24H_ENTITY,
     CONF_WEATHER_TEMP_ENTITY,
+    CONF_WEATHER_FORECAST_ENTITY,
     CONF_KILL_SWITCH_ENTITY,
     CONF_KILL_SWITCH_MODE,
     CONF_GLOBAL_SKIP_RAIN_MM,
@@ -101,6 +105,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_FLOW_SCALE,
                     default=float(self._collected.get(CONF_FLOW_SCALE, DEFAULT_FLOW_SCALE)),
                 ): vol.Coerce(float),
+                vol.Optional(
+                    CONF_RECORD_FLOW_TRACES,
+                    default=bool(self._collected.get(
+                        CONF_RECORD_FLOW_TRACES, DEFAULT_RECORD_FLOW_TRACES,
+                    )),
+                ): bool,
             }),
             description_placeholders={"step": "1 / 3"},
         )
@@ -118,6 +128,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_WEATHER_RAIN_TODAY_ENTITY,
                 CONF_WEATHER_RAIN_FORECAST_24H_ENTITY,
                 CONF_WEATHER_TEMP_ENTITY,
+                CONF_WEATHER_FORECAST_ENTITY,
             ):
                 if user_input.get(key) in ("", None):
                     user_input[key] = None
@@ -127,6 +138,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         sensor_selector = selector.EntitySelector(
             selector.EntitySelectorConfig(domain="sensor")
         )
+        # v4.2 — the water budget planner reads a `weather.*` forecast.
+        weather_selector = selector.EntitySelector(
+            selector.EntitySelectorConfig(domain="weather")
+        )
 
         return self.async_show_form(
             step_id="weather",
@@ -155,6 +170,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         "suggested_value": self._collected.get(CONF_WEATHER_TEMP_ENTITY) or "",
                     },
                 ): sensor_selector,
+                vol.Optional(
+                    CONF_WEATHER_FORECAST_ENTITY,
+                    description={
+                        "suggested_value": self._collected.get(CONF_WEATHER_FORECAST_ENTITY) or "",
+                    },
+                ): weather_selector,
             }),
             description_placeholders={"step": "2 / 3"},
         )
@@ -8,6 +8,9 @@ DEFAULT_BASE_TOPIC = "zigbee2mqtt"
 CONF_MANUAL_TOPICS = "manual_topics"  # newline-separated friendly names
 CONF_FLOW_SCALE = "flow_scale"        # multiply incoming 'flow' to end up in L/min
 DEFAULT_FLOW_SCALE = 1.0
+# v4.2 — keep each session's flow curve (see flowtrace.py)
+CONF_RECORD_FLOW_TRACES = "record_flow_traces"
+DEFAULT_RECORD_FLOW_TRACES = False
 
 Z2M_MODEL = "SWV"  # Sonoff smart water valve
 
@@ -22,6 +25,13 @@ def sig_update(topic: str) -> str:
 # care about per-valve state subscribe to those individually via SIG_NEW_VALVE.
 SIG_GLOBAL_UPDATE = "z2m_irrigation_global_update"
 
+# v4.2 — fired after a schedule fire/skip is written to the
+# `irrigation_events` table so the schedule history sensor re-reads it.
+SIG_SCHEDULE_EVENT = "z2m_irrigation_schedule_event"
+
+# v3.2 — panic raised / cleared (binary sensor + live subscription).
+SIG_PANIC_STATE = "z2m_irrigation_panic_state_changed"
+
 def sig_zone_config_changed(zone: str) -> str:
     return f"z2m_irrigation_zone_config_changed::{zone}"
 
@@ -217,6 +227,27 @@ INITIAL_VALVE_AUTO_CLOSE_WHEN_WATER_SHORTAGE = "DISABLE"
 STORE_VERSION = 1
 STORE_KEY_PREFIX = "z2m_irrigation"
 
+# v4.2 — high-churn cache sections live in their own Store documents,
+# keyed `z2m_irrigation.<entry_id>.<name>`, so a 15-min VPD persist or a
+# daily-summary rebuild never re-serializes the zone/schedule config.
+# Cache writes go through `Store.async_delay_save` so bursts coalesce
+# into one disk write and HA flushes anything pending on shutdown.
+STORE_CACHE_VERSION = 1
+STORE_CACHE_VPD_BUFFER = "vpd_buffer"
+STORE_CACHE_DAILY_SUMMARY = "daily_summary"
+STORE_CACHE_HISTORY = "history"
+STORE_CACHE_WATER_BALANCE = "water_balance"
+STORE_CACHE_SAVE_DELAY_SECONDS = 10
+
+# v4.2 — time-weighted rolling VPD windows (see `vpd_window.py`). All
+# windows are tracked together; the calculator uses VPD_CALC_WINDOW_HOURS
+# and the others are exposed as diagnostics on the today_calculation
+# sensor. The buffer snapshot is persisted on this coarse interval and
+# on shutdown — not on every 15-min sample.
+VPD_ROLLING_WINDOWS_HOURS = (6, 24, 72)
+VPD_CALC_WINDOW_HOURS = 24
+VPD_PERSIST_INTERVAL_MINUTES = 60
+
 # Per-zone defaults applied when a valve is first discovered. The user can
 # edit any of these per-zone via the Setup tab in v4.0 / via service calls.
 DEFAULT_ZONE_FACTOR = 1.0
@@ -224,16 +255,11 @@ DEFAULT_ZONE_L_PER_MM = 12.0
 DEFAULT_ZONE_BASE_MM = 4.0
 DEFAULT_ZONE_IN_SMART_CYCLE = True
 
-# Persistence retention for the per-zone run history. Older entries are
-# pruned on each write to keep the JSON store small. Both a date cutoff
-# AND a hard count cap apply — whichever is more aggressive wins.
+# Persistence retention for run history. The schedule event timeline
+# (SQLite `irrigation_events`, v4.2) is pruned by date only, in SQL, on
+# every insert.
 HISTORY_RETENTION_DAYS = 90
 
-# Hard cap on history entries per scope (e.g. global schedule timeline,
-# per-zone session summaries). Prevents unbounded JSON growth even on
-# unusual usage patterns. ~500 entries × ~200 bytes ≈ 100 KB per scope.
-HISTORY_MAX_ENTRIES = 500
-
 # Lookback used by the rolling avg-flow per-zone sensor. Reads from the
 # existing SQLite session history via `db.get_recent_avg_flow`. Higher
 # values smooth out one-off anomalies; lower values react faster to
@@ -250,6 +276,8 @@ CONF_WEATHER_VPD_ENTITY = "weather_vpd_entity"
 CONF_WEATHER_RAIN_TODAY_ENTITY = "weather_rain_today_entity"
 CONF_WEATHER_RAIN_FORECAST_24H_ENTITY = "weather_rain_forecast_24h_entity"
 CONF_WEATHER_TEMP_ENTITY = "weather_temp_entity"
+# v4.2 — HA `weather.*` entity feeding the 7-day water budget planner.
+CONF_WEATHER_FORECAST_ENTITY = "weather_forecast_entity"
 
 # Step 3 — safety + global thresholds
 CONF_KILL_SWITCH_ENTITY = "kill_switch_entity"
@@ -272,6 +300,104 @@ DEFAULT_GLOBAL_SKIP_RAIN_MM = 5.0
 DEFAULT_GLOBAL_SKIP_FORECAST_MM = 8.0
 DEFAULT_GLOBAL_MIN_RUN_LITERS = 2.0
 
+# v4.2 — event-driven calculator refresh. State changes on the configured
+# weather entities are throttled (the first change arms a timer that later
+# changes don't push back), then the calculator re-runs only when an
+# input moved by at least its delta (or appeared/disappeared). The
+# interval timer stays as a slow safety net.
+WEATHER_DEBOUNCE_SECONDS = 30
+WEATHER_DELTA_VPD_KPA = 0.05
+WEATHER_DELTA_RAIN_MM = 0.5
+WEATHER_DELTA_FORECAST_MM = 0.5
+WEATHER_DELTA_TEMP_C = 1.0
+CALC_SAFETY_NET_MINUTES = 60
+
+# v4.2 — `simulate` service / websocket: upper bound on scenarios per call.
+SIMULATE_MAX_SCENARIOS = 1000
+
+# v4.2 — forward water budget planner. The forecast is fetched from the
+# weather entity at most once per TTL; the plan itself is rebuilt only
+# when config, forecast, local date or a skip gate changes.
+PLANNER_DAYS = 7
+PLANNER_FORECAST_TTL_MINUTES = 30
+
+# v4.2 — soil water balance (see water_balance.py). A zone's bucket holds
+# at most this many days of `base_mm` deficit; after a longer outage only
+# the most recent days are replayed (the cap makes older ones moot).
+WATER_BALANCE_MAX_DEFICIT_DAYS = 3.0
+WATER_BALANCE_MAX_CATCHUP_DAYS = 7
+
+# v4.2 — `z2m_irrigation/usage` websocket: default window (in periods)
+# per resolution when no start date is given, and a hard cap on the
+# number of periods per request so latency stays bounded.
+USAGE_DEFAULT_PERIODS = {"day": 30, "week": 12, "month": 12, "year": 5}
+USAGE_MAX_PERIODS = 1500
+
+# v4.2 — `z2m_irrigation/sessions/*` websocket. Pages are keyset-paged
+# and capped; bulk deletes take at most SESSIONS_DELETE_MAX ids per
+# call, and `clear` deletes in batches so the DB lock is held briefly.
+SESSIONS_PAGE_DEFAULT = 50
+SESSIONS_PAGE_MAX = 500
+SESSIONS_DELETE_MAX = 500
+SESSIONS_CLEAR_BATCH = 500
+
+# v4.2 — `z2m_irrigation/subscribe` websocket: bounds on the per-
+# subscription push rate (messages per second). Updates arriving faster
+# are coalesced into the next message.
+LIVE_DEFAULT_MAX_RATE = 2.0
+LIVE_MIN_RATE = 0.1
+LIVE_MAX_RATE = 10.0
+
+# v4.2 — session export HTTP view: rows fetched (and written) per chunk.
+EXPORT_URL = "/api/z2m_irrigation/sessions/export"
+EXPORT_CHUNK_ROWS = 1000
+
+# v4.2 — `import_sessions` service: rows per staged transaction, and the
+# file size above which the session indexes are rebuilt after the load
+# instead of being maintained row by row.
+IMPORT_BATCH_ROWS = 5000
+IMPORT_DEFER_INDEX_BYTES = 5 * 1024 * 1024
+
+# v4.2 — `backup_database` service. The online backup copies this many
+# pages per step and sleeps between steps so writers are never stalled;
+# the newest BACKUP_KEEP backups in BACKUP_DIR (under /config) are kept.
+BACKUP_DIR = "backups"
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP_SECONDS = 0.005
+BACKUP_KEEP = 5
+
+# v4.2 — storage maintenance (WAL checkpoint, PRAGMA optimize,
+# incremental vacuum). Checked every MAINTENANCE_CHECK_MINUTES, run at
+# most every MAINTENANCE_INTERVAL_HOURS and only while irrigation is
+# idle; each run frees at most MAINTENANCE_VACUUM_PAGES free pages.
+MAINTENANCE_CHECK_MINUTES = 30
+MAINTENANCE_INTERVAL_HOURS = 6
+MAINTENANCE_VACUUM_PAGES = 2000
+# The one-time auto_vacuum conversion (a full VACUUM) is only attempted
+# when no schedule is due within this many minutes.
+MAINTENANCE_CONVERT_CLEAR_MINUTES = 120
+
+# v4.2 — per-session flow trace ring size (samples per valve). A session
+# with more flow reports than this keeps the most recent ones.
+FLOW_TRACE_MAX_SAMPLES = 4096
+
+# v4.2 — panic flight recorder: decoded MQTT reports kept per valve,
+# shutoff chain events kept per valve, and how many gzip dumps are kept
+# in FLIGHT_RECORDER_DIR (under /config).
+FLIGHT_RECORDER_SAMPLES = 256
+SHUTOFF_HISTORY_MAX = 32
+FLIGHT_RECORDER_DIR = "z2m_irrigation_flight_recorder"
+FLIGHT_RECORDER_KEEP = 20
+
+# v4.2 — `z2m_irrigation/series` downsampling websocket: requested point
+# count bounds, default / max daily-usage range, and how many reduced
+# series are kept in the LRU cache.
+SERIES_DEFAULT_POINTS = 500
+SERIES_MAX_POINTS = 5000
+SERIES_DEFAULT_DAYS = 365
+SERIES_MAX_DAYS = 3660
+SERIES_CACHE_SIZE = 64
+
 # ─────────────────────────────────────────────────────────────────────────────
 # v4.0-alpha-2 — Scheduler engine
 # ─────────────────────────────────────────────────────────────────────────────
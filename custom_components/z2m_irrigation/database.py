@@ -1,12 +1,20 @@
 from __future__ import annotations
+import base64
+import heapq
+import json
 import logging
 import sqlite3
 import asyncio
 import threading
+from contextlib import aclosing
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional, Dict, List, Tuple
+from typing import Any, AsyncIterator, Iterable, NamedTuple, Optional, Dict, List, Tuple
 from pathlib import Path
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from . import flowtrace
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,18 +58,84 @@ def _ensure_tz(s: Optional[str]) -> Optional[str]:
         return s  # already tagged
     return s + "+00:00"
 
+class SessionRow(NamedTuple):
+    """v4.2 — one completed session as yielded by `iter_sessions`.
+
+    Timestamps are tagged-UTC ISO strings (see `_ensure_tz`).
+    """
+    id: int
+    session_id: str
+    valve_topic: str
+    valve_name: str
+    started_at: str
+    ended_at: str
+    duration_minutes: Optional[float]
+    volume_liters: Optional[float]
+    avg_flow_rate: Optional[float]
+    trigger_type: Optional[str]
+    target_liters: Optional[float]
+    target_minutes: Optional[float]
+    completed_successfully: bool
+
+
 class IrrigationDatabase:
     """Local SQLite database for irrigation persistence"""
 
+    # Secondary indexes on `sessions`. v4.2 — kept in one place so a bulk
+    # import can drop and rebuild them (see `import_sessions`).
+    _SESSION_INDEXES = {
+        "idx_sessions_started":
+            "CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at DESC)",
+        "idx_sessions_ended":
+            "CREATE INDEX IF NOT EXISTS idx_sessions_ended ON sessions(ended_at DESC)",
+        # v4.2 — keyset paging of the session log on (ended_at, id),
+        # globally and per valve.
+        "idx_sessions_ended_id":
+            "CREATE INDEX IF NOT EXISTS idx_sessions_ended_id ON sessions(ended_at, id)",
+        "idx_sessions_valve_ended_id":
+            "CREATE INDEX IF NOT EXISTS idx_sessions_valve_ended_id "
+            "ON sessions(valve_id, ended_at, id)",
+        # v4.2 — sessions of one schedule (via `triggers.schedule_id`).
+        "idx_sessions_trigger_ended_id":
+            "CREATE INDEX IF NOT EXISTS idx_sessions_trigger_ended_id "
+            "ON sessions(trigger_id, ended_at, id)",
+    }
+
+    # v4.2 — indexes of the pre-normalization `sessions` table, dropped
+    # by `_migrate_sessions_v2`.
+    _LEGACY_SESSION_INDEXES = (
+        "idx_sessions_valve", "idx_sessions_started", "idx_sessions_ended",
+        "idx_sessions_ended_id", "idx_sessions_valve_ended_id",
+    )
+
+    # v4.2 — `sessions` columns in their denormalized form. Reads go
+    # through this view; writes resolve `valves` / `triggers` ids.
+    _SESSION_LOG_VIEW = """
+        CREATE VIEW IF NOT EXISTS session_log AS
+        SELECT s.id, s.session_id,
+               v.topic AS valve_topic, v.name AS valve_name,
+               s.started_at, s.ended_at, s.duration_minutes,
+               s.volume_liters, s.avg_flow_rate,
+               t.trigger_type, t.kind AS trigger_kind, t.schedule_id,
+               s.target_liters, s.target_minutes,
+               s.completed_successfully, s.created_at
+        FROM sessions AS s
+        JOIN valves AS v ON v.id = s.valve_id
+        LEFT JOIN triggers AS t ON t.id = s.trigger_id
+    """
+
     def __init__(self, hass: HomeAssistant):
         self.hass = hass
         self.db_path = Path(hass.config.config_dir) / "z2m_irrigation.db"
         self._conn: Optional[sqlite3.Connection] = None
         self._lock = threading.Lock()  # Protect database operations
+        # v4.2 — timezone the `usage_daily` rollup bins by (HA's local tz).
+        self._local_tz = dt_util.DEFAULT_TIME_ZONE
         _LOGGER.info(f"💾 Irrigation database: {self.db_path}")
 
     async def async_init(self):
         """Initialize database connection and create tables"""
+        self._local_tz = dt_util.DEFAULT_TIME_ZONE
         await self.hass.async_add_executor_job(self._init_sync)
 
     def _init_sync(self):
@@ -73,6 +147,10 @@ class IrrigationDatabase:
                 timeout=10.0
             )
             self._conn.row_factory = sqlite3.Row
+            # v4.2 — new databases are created with incremental
+            # auto-vacuum; existing ones are converted by the first
+            # maintenance run (see `run_maintenance`).
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
             # Enable WAL mode for better concurrent access
             self._conn.execute("PRAGMA journal_mode=WAL")
             self._conn.execute("PRAGMA synchronous=NORMAL")
@@ -105,39 +183,117 @@ class IrrigationDatabase:
                     updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # v4.2 — lifetime totals never go down, so deleted sessions
+            # are moved to a per-valve `pruned_*` ledger instead; the
+            # verifier expects lifetime = sessions + pruned.
+            totals_columns = {
+                r["name"] for r in cursor.execute("PRAGMA table_info(valve_totals)")
+            }
+            for col, decl in (
+                ("pruned_liters", "REAL DEFAULT 0"),
+                ("pruned_minutes", "REAL DEFAULT 0"),
+                ("pruned_session_count", "INTEGER DEFAULT 0"),
+            ):
+                if col not in totals_columns:
+                    cursor.execute(f"ALTER TABLE valve_totals ADD COLUMN {col} {decl}")
+
+            # v4.2 — dictionary tables for `sessions`: each valve topic
+            # and each trigger string is stored once, sessions carry the
+            # integer ids. `kind` / `schedule_id` split a trigger like
+            # `schedule_smart:<id>` so sessions can be found by schedule.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS valves (
+                    id INTEGER PRIMARY KEY,
+                    topic TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS triggers (
+                    id INTEGER PRIMARY KEY,
+                    trigger_type TEXT UNIQUE NOT NULL,
+                    kind TEXT NOT NULL,
+                    schedule_id TEXT
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_triggers_schedule
+                ON triggers(schedule_id)
+            """)
 
             # Sessions table (complete history)
+            columns = {
+                r["name"] for r in cursor.execute("PRAGMA table_info(sessions)")
+            }
+            if "valve_topic" in columns:
+                self._migrate_sessions_v2()
+            else:
+                cursor.execute(self._SESSIONS_DDL)
+            cursor.execute(self._SESSION_LOG_VIEW)
+
+            # Create indexes for performance
+            for ddl in self._SESSION_INDEXES.values():
+                cursor.execute(ddl)
+
+            # v4.2 — schedule event timeline (fires + skips). Replaces the
+            # `_schedule_events` list in the JSON history store.
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sessions (
+                CREATE TABLE IF NOT EXISTS irrigation_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT UNIQUE NOT NULL,
-                    valve_topic TEXT NOT NULL,
-                    valve_name TEXT NOT NULL,
-                    started_at TEXT NOT NULL,
-                    ended_at TEXT,
-                    duration_minutes REAL,
-                    volume_liters REAL DEFAULT 0,
-                    avg_flow_rate REAL,
-                    trigger_type TEXT DEFAULT 'manual',
-                    target_liters REAL,
-                    target_minutes REAL,
-                    completed_successfully INTEGER DEFAULT 1,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    at TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    schedule_id TEXT,
+                    schedule_name TEXT,
+                    outcome TEXT NOT NULL,
+                    mode TEXT,
+                    trigger TEXT,
+                    zones TEXT,
+                    total_liters REAL
                 )
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_at
+                ON irrigation_events(at)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_schedule
+                ON irrigation_events(schedule_id, id)
+            """)
 
-            # Create indexes for performance
+            # v4.2 — small key/value table for schema bookkeeping.
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sessions_valve
-                ON sessions(valve_topic)
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+            # v4.2 — per-valve per-local-day usage rollup. Maintained on
+            # every session end; week/month/year buckets are GROUP BYs
+            # over it, so range queries never touch `sessions`.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS usage_daily (
+                    valve_topic TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    liters REAL NOT NULL DEFAULT 0,
+                    minutes REAL NOT NULL DEFAULT 0,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (valve_topic, day)
+                )
             """)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sessions_started
-                ON sessions(started_at DESC)
+                CREATE INDEX IF NOT EXISTS idx_usage_daily_day
+                ON usage_daily(day)
             """)
+
+            # v4.2 — optional per-session flow trace (see flowtrace.py),
+            # one encoded BLOB per session, written with the session end.
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sessions_ended
-                ON sessions(ended_at DESC)
+                CREATE TABLE IF NOT EXISTS flow_traces (
+                    session_row_id INTEGER PRIMARY KEY REFERENCES sessions(id),
+                    samples INTEGER NOT NULL,
+                    trace BLOB NOT NULL
+                )
             """)
 
             self._conn.commit()
@@ -145,6 +301,128 @@ class IrrigationDatabase:
         finally:
             cursor.close()
 
+        # v4.2 — (re)build the rollup on first run or if HA's timezone
+        # changed since it was built (day boundaries moved).
+        tz_key = str(self._local_tz)
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'rollup_tz'"
+        ).fetchone()
+        if row is None or row["value"] != tz_key:
+            self._rebuild_usage_rollup_locked()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rollup_tz', ?)",
+                (tz_key,),
+            )
+            self._conn.commit()
+
+    _SESSIONS_DDL = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            valve_id INTEGER NOT NULL REFERENCES valves(id),
+            started_at TEXT NOT NULL,
+            ended_at TEXT,
+            duration_minutes REAL,
+            volume_liters REAL DEFAULT 0,
+            avg_flow_rate REAL,
+            trigger_id INTEGER REFERENCES triggers(id),
+            target_liters REAL,
+            target_minutes REAL,
+            completed_successfully INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    def _migrate_sessions_v2(self) -> None:
+        """v4.2 — rewrite a pre-normalization `sessions` table in place.
+
+        One transaction: the old table is renamed, `valves` / `triggers`
+        are filled from its distinct values (a valve keeps the name of
+        its most recent session), rows are copied with their ids, and
+        the old table is dropped. Free pages are returned to the OS by
+        the next maintenance run.
+        """
+        started = time.monotonic()
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            for name in self._LEGACY_SESSION_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.execute("ALTER TABLE sessions RENAME TO sessions_v1")
+            conn.execute(self._SESSIONS_DDL)
+            conn.execute("""
+                INSERT INTO valves (topic, name)
+                SELECT valve_topic, valve_name FROM sessions_v1
+                WHERE true ORDER BY id
+                ON CONFLICT(topic) DO UPDATE SET name = excluded.name
+            """)
+            for (trigger_type,) in conn.execute(
+                "SELECT DISTINCT trigger_type FROM sessions_v1 "
+                "WHERE trigger_type IS NOT NULL"
+            ).fetchall():
+                self._trigger_id_locked(trigger_type)
+            copied = conn.execute("""
+                INSERT INTO sessions (
+                    id, session_id, valve_id, started_at, ended_at,
+                    duration_minutes, volume_liters, avg_flow_rate,
+                    trigger_id, target_liters, target_minutes,
+                    completed_successfully, created_at
+                )
+                SELECT o.id, o.session_id, v.id, o.started_at, o.ended_at,
+                       o.duration_minutes, o.volume_liters, o.avg_flow_rate,
+                       t.id, o.target_liters, o.target_minutes,
+                       o.completed_successfully, o.created_at
+                FROM sessions_v1 AS o
+                JOIN valves AS v ON v.topic = o.valve_topic
+                LEFT JOIN triggers AS t ON t.trigger_type = o.trigger_type
+            """).rowcount
+            conn.execute("DROP TABLE sessions_v1")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        _LOGGER.info(
+            "🔄 Migrated %d session(s) to dictionary-encoded valves/triggers in %.2fs",
+            copied, time.monotonic() - started,
+        )
+
+    def _valve_id_locked(self, valve_topic: str, valve_name: str) -> int:
+        """Id of `valve_topic` in `valves`, added (or renamed) as needed.
+
+        Caller holds `self._lock` and commits.
+        """
+        self._conn.execute(
+            """
+            INSERT INTO valves (topic, name) VALUES (?, ?)
+            ON CONFLICT(topic) DO UPDATE SET name = excluded.name
+            WHERE name <> excluded.name
+            """,
+            (str(valve_topic), str(valve_name)),
+        )
+        return self._conn.execute(
+            "SELECT id FROM valves WHERE topic = ?", (str(valve_topic),),
+        ).fetchone()[0]
+
+    def _trigger_id_locked(self, trigger_type: Optional[str]) -> Optional[int]:
+        """Id of `trigger_type` in `triggers`, added as needed.
+
+        `schedule_smart:<id>` is stored as kind `schedule_smart` and
+        schedule id `<id>`; a trigger without `:` has no schedule id.
+        Caller holds `self._lock` and commits.
+        """
+        if trigger_type is None:
+            return None
+        trigger_type = str(trigger_type)
+        kind, _, schedule_id = trigger_type.partition(":")
+        self._conn.execute(
+            "INSERT OR IGNORE INTO triggers (trigger_type, kind, schedule_id) "
+            "VALUES (?, ?, ?)",
+            (trigger_type, kind, schedule_id or None),
+        )
+        return self._conn.execute(
+            "SELECT id FROM triggers WHERE trigger_type = ?", (trigger_type,),
+        ).fetchone()[0]
+
     async def load_valve_totals(self, valve_topic: str) -> Dict[str, float]:
         """Load persisted totals from local database"""
         _LOGGER.debug(f"💾 [DB] ➡️ load_valve_totals: {valve_topic}")
@@ -232,83 +510,94 @@ class IrrigationDatabase:
 
         with self._lock:
             try:
-                # Use connection.execute for better thread safety
-                cursor = self._conn.execute(
-                    "SELECT * FROM valve_totals WHERE valve_topic = ?",
-                    (str(valve_topic),)
+                new_totals = self._add_valve_totals_locked(
+                    valve_topic, valve_name, liters, minutes,
                 )
-                try:
-                    existing = cursor.fetchone()
-
-                    if existing:
-                        # Update existing record
-                        new_totals = {
-                            "lifetime_total_liters": float(existing["lifetime_total_liters"]) + liters,
-                            "lifetime_total_minutes": float(existing["lifetime_total_minutes"]) + minutes,
-                            "lifetime_session_count": int(existing["lifetime_session_count"]) + 1,
-                            "resettable_total_liters": float(existing["resettable_total_liters"]) + liters,
-                            "resettable_total_minutes": float(existing["resettable_total_minutes"]) + minutes,
-                            "resettable_session_count": int(existing["resettable_session_count"]) + 1,
-                        }
-
-                        cursor.execute("""
-                            UPDATE valve_totals
-                            SET valve_name = ?,
-                                lifetime_total_liters = ?,
-                                lifetime_total_minutes = ?,
-                                lifetime_session_count = ?,
-                                resettable_total_liters = ?,
-                                resettable_total_minutes = ?,
-                                resettable_session_count = ?,
-                                updated_at = CURRENT_TIMESTAMP
-                            WHERE valve_topic = ?
-                        """, (
-                            valve_name,
-                            new_totals["lifetime_total_liters"],
-                            new_totals["lifetime_total_minutes"],
-                            new_totals["lifetime_session_count"],
-                            new_totals["resettable_total_liters"],
-                            new_totals["resettable_total_minutes"],
-                            new_totals["resettable_session_count"],
-                            valve_topic
-                        ))
-                    else:
-                        # Insert new record
-                        new_totals = {
-                            "lifetime_total_liters": liters,
-                            "lifetime_total_minutes": minutes,
-                            "lifetime_session_count": 1,
-                            "resettable_total_liters": liters,
-                            "resettable_total_minutes": minutes,
-                            "resettable_session_count": 1,
-                        }
-
-                        cursor.execute("""
-                            INSERT INTO valve_totals
-                            (valve_topic, valve_name, lifetime_total_liters, lifetime_total_minutes,
-                             lifetime_session_count, resettable_total_liters, resettable_total_minutes,
-                             resettable_session_count)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            valve_topic, valve_name,
-                            new_totals["lifetime_total_liters"],
-                            new_totals["lifetime_total_minutes"],
-                            new_totals["lifetime_session_count"],
-                            new_totals["resettable_total_liters"],
-                            new_totals["resettable_total_minutes"],
-                            new_totals["resettable_session_count"]
-                        ))
-
-                    self._conn.commit()
-                    _LOGGER.debug(f"💾 Saved totals for {valve_topic}: +{liters:.2f}L, +{minutes:.2f}min")
-                    return new_totals
-                finally:
-                    cursor.close()
+                self._conn.commit()
+                _LOGGER.debug(f"💾 Saved totals for {valve_topic}: +{liters:.2f}L, +{minutes:.2f}min")
+                return new_totals
 
             except Exception as e:
                 _LOGGER.error(f"❌ Error saving valve totals: {e}", exc_info=True)
                 return None
 
+    def _add_valve_totals_locked(self, valve_topic: str, valve_name: str,
+                                 liters: float, minutes: float) -> Dict[str, float]:
+        """Add one session to the lifetime + resettable totals.
+
+        Caller holds `self._lock` and commits.
+        """
+        # Use connection.execute for better thread safety
+        cursor = self._conn.execute(
+            "SELECT * FROM valve_totals WHERE valve_topic = ?",
+            (str(valve_topic),)
+        )
+        try:
+            existing = cursor.fetchone()
+
+            if existing:
+                # Update existing record
+                new_totals = {
+                    "lifetime_total_liters": float(existing["lifetime_total_liters"]) + liters,
+                    "lifetime_total_minutes": float(existing["lifetime_total_minutes"]) + minutes,
+                    "lifetime_session_count": int(existing["lifetime_session_count"]) + 1,
+                    "resettable_total_liters": float(existing["resettable_total_liters"]) + liters,
+                    "resettable_total_minutes": float(existing["resettable_total_minutes"]) + minutes,
+                    "resettable_session_count": int(existing["resettable_session_count"]) + 1,
+                }
+
+                cursor.execute("""
+                    UPDATE valve_totals
+                    SET valve_name = ?,
+                        lifetime_total_liters = ?,
+                        lifetime_total_minutes = ?,
+                        lifetime_session_count = ?,
+                        resettable_total_liters = ?,
+                        resettable_total_minutes = ?,
+                        resettable_session_count = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE valve_topic = ?
+                """, (
+                    valve_name,
+                    new_totals["lifetime_total_liters"],
+                    new_totals["lifetime_total_minutes"],
+                    new_totals["lifetime_session_count"],
+                    new_totals["resettable_total_liters"],
+                    new_totals["resettable_total_minutes"],
+                    new_totals["resettable_session_count"],
+                    valve_topic
+                ))
+            else:
+                # Insert new record
+                new_totals = {
+                    "lifetime_total_liters": liters,
+                    "lifetime_total_minutes": minutes,
+                    "lifetime_session_count": 1,
+                    "resettable_total_liters": liters,
+                    "resettable_total_minutes": minutes,
+                    "resettable_session_count": 1,
+                }
+
+                cursor.execute("""
+                    INSERT INTO valve_totals
+                    (valve_topic, valve_name, lifetime_total_liters, lifetime_total_minutes,
+                     lifetime_session_count, resettable_total_liters, resettable_total_minutes,
+                     resettable_session_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    valve_topic, valve_name,
+                    new_totals["lifetime_total_liters"],
+                    new_totals["lifetime_total_minutes"],
+                    new_totals["lifetime_session_count"],
+                    new_totals["resettable_total_liters"],
+                    new_totals["resettable_total_minutes"],
+                    new_totals["resettable_session_count"]
+                ))
+
+            return new_totals
+        finally:
+            cursor.close()
+
     async def reset_resettable_totals(self, valve_topic: str) -> bool:
         """Reset only resettable totals (preserve lifetime)"""
         return await self.hass.async_add_executor_job(
@@ -372,10 +661,11 @@ class IrrigationDatabase:
                 # Use connection.execute for better thread safety
                 self._conn.execute("""
                     INSERT INTO sessions
-                    (session_id, valve_topic, valve_name, started_at, trigger_type,
+                    (session_id, valve_id, started_at, trigger_id,
                      target_liters, target_minutes, completed_successfully)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
-                """, (str(session_id), str(valve_topic), str(valve_name), str(started_at), str(trigger_type),
+                    VALUES (?, ?, ?, ?, ?, ?, 0)
+                """, (str(session_id), self._valve_id_locked(valve_topic, valve_name),
+                      str(started_at), self._trigger_id_locked(str(trigger_type)),
                       target_liters, target_minutes))
 
                 self._conn.commit()
@@ -387,37 +677,35 @@ class IrrigationDatabase:
                 return False
 
     async def end_session(self, session_id: str, duration_minutes: float,
-                         volume_liters: float, avg_flow_rate: float) -> bool:
-        """Log session end and update totals"""
+                         volume_liters: float, avg_flow_rate: float,
+                         flow_trace: Optional[Any] = None) -> bool:
+        """Log session end and update totals.
+
+        v4.2 — `flow_trace` is a `FlowTraceRecorder.snapshot()`; it is
+        encoded in the executor and stored with the session end.
+        """
         _LOGGER.debug(f"💾 [DB] ➡️ end_session: {session_id}, {duration_minutes:.2f}min, {volume_liters:.2f}L, {avg_flow_rate:.2f}lpm")
         result = await self.hass.async_add_executor_job(
-            self._end_session_sync, session_id, duration_minutes, volume_liters, avg_flow_rate
+            self._end_session_sync, session_id, duration_minutes, volume_liters, avg_flow_rate,
+            flow_trace,
         )
         _LOGGER.debug(f"💾 [DB] ⮅️ end_session result: {result}")
         return result
 
     def _end_session_sync(self, session_id: str, duration_minutes: float,
-                          volume_liters: float, avg_flow_rate: float) -> bool:
+                          volume_liters: float, avg_flow_rate: float,
+                          flow_trace: Optional[Any] = None) -> bool:
         """Synchronous session end"""
         if not self._conn:
             return False
 
+        trace_blob = self._encode_trace(session_id, flow_trace)
         with self._lock:
             try:
-                # v4.0-rc-3 hotfix: tagged-UTC ISO (see _iso_utc above).
-                ended_at = _iso_utc()
-
-                # Use connection.execute for better thread safety
-                self._conn.execute("""
-                    UPDATE sessions
-                    SET ended_at = ?,
-                        duration_minutes = ?,
-                        volume_liters = ?,
-                        avg_flow_rate = ?,
-                        completed_successfully = 1
-                    WHERE session_id = ?
-                """, (str(ended_at), duration_minutes, volume_liters, avg_flow_rate, str(session_id)))
-
+                self._end_session_locked(
+                    session_id, duration_minutes, volume_liters, avg_flow_rate,
+                    flow_trace, trace_blob,
+                )
                 self._conn.commit()
                 _LOGGER.info(f"🛑 Session ended: {session_id} - {duration_minutes:.2f}min, {volume_liters:.2f}L")
                 return True
@@ -426,6 +714,98 @@ class IrrigationDatabase:
                 _LOGGER.error(f"❌ Error ending session: {e}", exc_info=True)
                 return False
 
+    async def finish_session(self, session_id: str, valve_topic: str, valve_name: str,
+                             duration_minutes: float, volume_liters: float,
+                             avg_flow_rate: float,
+                             flow_trace: Optional[Any] = None) -> Optional[Dict[str, float]]:
+        """v4.2 — end a session and add it to the valve's totals in ONE
+        transaction, so no reader (the totals verifier in particular) can
+        see the session without its totals or vice versa.
+
+        Returns the updated totals like `save_valve_totals`, None on error.
+        """
+        return await self.hass.async_add_executor_job(
+            self._finish_session_sync, session_id, valve_topic, valve_name,
+            duration_minutes, volume_liters, avg_flow_rate, flow_trace,
+        )
+
+    def _finish_session_sync(self, session_id: str, valve_topic: str, valve_name: str,
+                             duration_minutes: float, volume_liters: float,
+                             avg_flow_rate: float,
+                             flow_trace: Optional[Any]) -> Optional[Dict[str, float]]:
+        if not self._conn:
+            return None
+
+        trace_blob = self._encode_trace(session_id, flow_trace)
+        with self._lock:
+            try:
+                self._end_session_locked(
+                    session_id, duration_minutes, volume_liters, avg_flow_rate,
+                    flow_trace, trace_blob,
+                )
+                totals = self._add_valve_totals_locked(
+                    valve_topic, valve_name, volume_liters, duration_minutes,
+                )
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                _LOGGER.error(f"❌ Error finishing session: {e}", exc_info=True)
+                return None
+        _LOGGER.info(f"🛑 Session ended: {session_id} - {duration_minutes:.2f}min, {volume_liters:.2f}L")
+        return totals
+
+    @staticmethod
+    def _encode_trace(session_id: str, flow_trace: Optional[Any]) -> Optional[bytes]:
+        if flow_trace is None or len(flow_trace) < 2:
+            return None
+        try:
+            return flowtrace.encode(flow_trace)
+        except Exception as e:
+            _LOGGER.warning("Failed to encode flow trace for %s: %s", session_id, e)
+            return None
+
+    def _end_session_locked(self, session_id: str, duration_minutes: float,
+                            volume_liters: float, avg_flow_rate: float,
+                            flow_trace: Optional[Any],
+                            trace_blob: Optional[bytes]) -> None:
+        """Mark the session ended, roll it up and store its trace.
+
+        Caller holds `self._lock` and commits.
+        """
+        # v4.0-rc-3 hotfix: tagged-UTC ISO (see _iso_utc above).
+        ended_at = _iso_utc()
+
+        # Use connection.execute for better thread safety
+        self._conn.execute("""
+            UPDATE sessions
+            SET ended_at = ?,
+                duration_minutes = ?,
+                volume_liters = ?,
+                avg_flow_rate = ?,
+                completed_successfully = 1
+            WHERE session_id = ?
+        """, (str(ended_at), duration_minutes, volume_liters, avg_flow_rate, str(session_id)))
+
+        # v4.2 — fold the session into the daily usage rollup.
+        row = self._conn.execute(
+            "SELECT valve_topic FROM session_log WHERE session_id = ?",
+            (str(session_id),),
+        ).fetchone()
+        if row is not None:
+            self._rollup_add_locked(
+                row["valve_topic"], ended_at,
+                volume_liters, duration_minutes, 1,
+            )
+
+        if trace_blob is not None:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO flow_traces (session_row_id, samples, trace)
+                SELECT id, ?, ? FROM sessions WHERE session_id = ?
+                """,
+                (len(flow_trace) // 2, trace_blob, str(session_id)),
+            )
+
     async def get_usage_last_24h(self, valve_topic: str) -> Tuple[float, float]:
         """Get liters and minutes used in last 24 hours"""
         _LOGGER.debug(f"💾 [DB] ➡️ get_usage_last_24h: {valve_topic}")
@@ -459,7 +839,7 @@ class IrrigationDatabase:
                     SELECT
                         COALESCE(SUM(volume_liters), 0) as total_liters,
                         COALESCE(SUM(duration_minutes), 0) as total_minutes
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at >= ?
                       AND ended_at IS NOT NULL
@@ -515,7 +895,7 @@ class IrrigationDatabase:
                     SELECT
                         COALESCE(SUM(volume_liters), 0) as total_liters,
                         COALESCE(SUM(duration_minutes), 0) as total_minutes
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at >= ?
                       AND ended_at IS NOT NULL
@@ -556,7 +936,7 @@ class IrrigationDatabase:
             try:
                 cursor = self._conn.execute("""
                     SELECT started_at
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at IS NOT NULL
                     ORDER BY started_at DESC
@@ -592,7 +972,7 @@ class IrrigationDatabase:
             try:
                 cursor = self._conn.execute("""
                     SELECT ended_at
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at IS NOT NULL
                     ORDER BY ended_at DESC
@@ -642,7 +1022,7 @@ class IrrigationDatabase:
                     """
                     SELECT volume_liters, duration_minutes, started_at,
                            ended_at, trigger_type, target_liters, target_minutes
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at IS NOT NULL
                     ORDER BY ended_at DESC
@@ -717,7 +1097,7 @@ class IrrigationDatabase:
                                volume_liters, avg_flow_rate, trigger_type,
                                target_liters, target_minutes,
                                completed_successfully
-                        FROM sessions
+                        FROM session_log
                         WHERE valve_topic = ?
                           AND ended_at IS NOT NULL
                         ORDER BY ended_at DESC
@@ -733,7 +1113,7 @@ class IrrigationDatabase:
                                volume_liters, avg_flow_rate, trigger_type,
                                target_liters, target_minutes,
                                completed_successfully
-                        FROM sessions
+                        FROM session_log
                         WHERE ended_at IS NOT NULL
                         ORDER BY ended_at DESC
                         LIMIT ?
@@ -741,42 +1121,7 @@ class IrrigationDatabase:
                         (int(limit),),
                     )
                 try:
-                    rows = cursor.fetchall()
-                    return [
-                        {
-                            "session_id": r["session_id"],
-                            "valve": r["valve_topic"],
-                            "name": r["valve_name"],
-                            # rc-3 hotfix: tag legacy NAIVE timestamps as
-                            # UTC so the Log tab's Jinja can correctly
-                            # convert via `as_datetime | as_local`.
-                            "started_at": _ensure_tz(r["started_at"]),
-                            "ended_at": _ensure_tz(r["ended_at"]),
-                            "duration_minutes": (
-                                round(float(r["duration_minutes"]), 2)
-                                if r["duration_minutes"] is not None else None
-                            ),
-                            "volume_liters": (
-                                round(float(r["volume_liters"]), 2)
-                                if r["volume_liters"] is not None else None
-                            ),
-                            "avg_flow_lpm": (
-                                round(float(r["avg_flow_rate"]), 3)
-                                if r["avg_flow_rate"] is not None else None
-                            ),
-                            "trigger_type": r["trigger_type"],
-                            "target_liters": (
-                                float(r["target_liters"])
-                                if r["target_liters"] is not None else None
-                            ),
-                            "target_minutes": (
-                                float(r["target_minutes"])
-                                if r["target_minutes"] is not None else None
-                            ),
-                            "completed_successfully": bool(r["completed_successfully"]),
-                        }
-                        for r in rows
-                    ]
+                    return [self._session_dict(r) for r in cursor.fetchall()]
                 finally:
                     cursor.close()
             except Exception as e:
@@ -785,6 +1130,976 @@ class IrrigationDatabase:
                 )
                 return []
 
+    @staticmethod
+    def _session_dict(r: sqlite3.Row) -> Dict[str, Any]:
+        """Shape one `sessions` row for the Session Log (sensor + websocket)."""
+        return {
+            "session_id": r["session_id"],
+            "valve": r["valve_topic"],
+            "name": r["valve_name"],
+            # rc-3 hotfix: tag legacy NAIVE timestamps as UTC so the Log
+            # tab's Jinja can correctly convert via `as_datetime | as_local`.
+            "started_at": _ensure_tz(r["started_at"]),
+            "ended_at": _ensure_tz(r["ended_at"]),
+            "duration_minutes": (
+                round(float(r["duration_minutes"]), 2)
+                if r["duration_minutes"] is not None else None
+            ),
+            "volume_liters": (
+                round(float(r["volume_liters"]), 2)
+                if r["volume_liters"] is not None else None
+            ),
+            "avg_flow_lpm": (
+                round(float(r["avg_flow_rate"]), 3)
+                if r["avg_flow_rate"] is not None else None
+            ),
+            "trigger_type": r["trigger_type"],
+            "target_liters": (
+                float(r["target_liters"])
+                if r["target_liters"] is not None else None
+            ),
+            "target_minutes": (
+                float(r["target_minutes"])
+                if r["target_minutes"] is not None else None
+            ),
+            "completed_successfully": bool(r["completed_successfully"]),
+        }
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Session log queries (`z2m_irrigation/sessions/*` websocket)
+    #
+    # Completed sessions are paged newest-first by keyset on
+    # (ended_at, id), served by idx_sessions_ended_id /
+    # idx_sessions_valve_ended_id, so a page costs O(limit) regardless
+    # of history size or page depth. The cursor is opaque to clients.
+    # Deletes also take the rows out of the `usage_daily` rollup;
+    # `valve_totals` (the lifetime meter) is left alone. In-flight
+    # sessions are never returned or deleted.
+    # ─────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def encode_session_cursor(ended_at: str, row_id: int) -> str:
+        raw = json.dumps([ended_at, int(row_id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_session_cursor(cursor: str) -> Tuple[str, int]:
+        """Inverse of `encode_session_cursor`. Raises ValueError."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            ended_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+            return str(ended_at), int(row_id)
+        except Exception as e:
+            raise ValueError("invalid cursor") from e
+
+    @staticmethod
+    def _session_filters(
+        start: Optional[str],
+        end: Optional[str],
+        trigger_types: Optional[List[str]],
+        success: Optional[bool],
+        schedule_ids: Optional[List[str]] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """WHERE terms over `session_log` shared by list / clear (valve
+        filter excluded).
+
+        `start` (inclusive) and `end` (exclusive) are tagged-UTC ISO
+        bounds on `ended_at`. A trigger type matches exactly or as the
+        kind of a `<kind>:<schedule id>` value (`schedule_smart`
+        matches `schedule_smart:abc`); `schedule_ids` match the part
+        after the colon.
+        """
+        where = ["ended_at IS NOT NULL"]
+        params: List[Any] = []
+        if start:
+            where.append("ended_at >= ?")
+            params.append(str(start))
+        if end:
+            where.append("ended_at < ?")
+            params.append(str(end))
+        if trigger_types:
+            marks = ",".join("?" * len(trigger_types))
+            where.append(f"(trigger_type IN ({marks}) OR trigger_kind IN ({marks}))")
+            params.extend(str(t) for t in trigger_types)
+            params.extend(str(t) for t in trigger_types)
+        if schedule_ids:
+            where.append(f"schedule_id IN ({','.join('?' * len(schedule_ids))})")
+            params.extend(str(t) for t in schedule_ids)
+        if success is not None:
+            where.append("completed_successfully = ?")
+            params.append(1 if success else 0)
+        return where, params
+
+    async def get_sessions_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        valve_topics: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        trigger_types: Optional[List[str]] = None,
+        success: Optional[bool] = None,
+        schedule_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """One page of completed sessions, newest first.
+
+        Returns {"sessions": [...], "next_cursor": str | None}; pass
+        `next_cursor` back to fetch the next (older) page. Raises
+        ValueError for a malformed cursor.
+        """
+        before = self.decode_session_cursor(cursor) if cursor else None
+        return await self.hass.async_add_executor_job(
+            self._get_sessions_page_sync,
+            limit, before, valve_topics, start, end, trigger_types, success,
+            schedule_ids,
+        )
+
+    def _get_sessions_page_sync(
+        self,
+        limit: int,
+        before: Optional[Tuple[str, int]],
+        valve_topics: Optional[List[str]],
+        start: Optional[str],
+        end: Optional[str],
+        trigger_types: Optional[List[str]],
+        success: Optional[bool],
+        schedule_ids: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        if not self._conn:
+            return {"sessions": [], "next_cursor": None}
+        where, params = self._session_filters(
+            start, end, trigger_types, success, schedule_ids,
+        )
+        if before is not None:
+            where.append("(ended_at, id) < (?, ?)")
+            params.extend(before)
+        sql = f"""
+            SELECT id, session_id, valve_topic, valve_name,
+                   started_at, ended_at, duration_minutes,
+                   volume_liters, avg_flow_rate, trigger_type,
+                   target_liters, target_minutes, completed_successfully
+            FROM session_log
+            WHERE {' AND '.join(where)} {{valve}}
+            ORDER BY ended_at DESC, id DESC
+            LIMIT ?
+        """
+        # One index range scan per valve, merged here: an `IN (...)`
+        # over several valves would sort every matching row instead.
+        scans: List[Tuple[str, List[Any]]] = (
+            [(sql.format(valve="AND valve_topic = ?"), params + [str(t)])
+             for t in dict.fromkeys(valve_topics)]
+            if valve_topics else [(sql.format(valve=""), list(params))]
+        )
+        with self._lock:
+            try:
+                runs = [
+                    self._conn.execute(q, p + [int(limit) + 1]).fetchall()
+                    for q, p in scans
+                ]
+            except Exception as e:
+                _LOGGER.error("❌ Error paging sessions: %s", e, exc_info=True)
+                return {"sessions": [], "next_cursor": None}
+        rows = list(heapq.merge(
+            *runs, key=lambda r: (r["ended_at"], r["id"]), reverse=True,
+        ))[: int(limit) + 1]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_session_cursor(rows[-1]["ended_at"], rows[-1]["id"])
+        sessions = []
+        for r in rows:
+            item = self._session_dict(r)
+            item["id"] = r["id"]
+            sessions.append(item)
+        return {"sessions": sessions, "next_cursor": next_cursor}
+
+    def _delete_session_rows_locked(self, rows: List[sqlite3.Row]) -> int:
+        """Delete `rows` (id, valve_topic, ended_at, volume_liters,
+        duration_minutes), take them out of the usage rollup and move
+        them to the valve's `pruned_*` ledger (lifetime totals are left
+        as they are).
+
+        Caller holds `self._lock` and commits.
+        """
+        pruned: Dict[str, List[float]] = {}
+        for r in rows:
+            liters = float(r["volume_liters"] or 0)
+            minutes = float(r["duration_minutes"] or 0)
+            self._rollup_add_locked(
+                r["valve_topic"], r["ended_at"], -liters, -minutes, -1,
+            )
+            p = pruned.setdefault(r["valve_topic"], [0.0, 0.0, 0])
+            p[0] += liters
+            p[1] += minutes
+            p[2] += 1
+        self._conn.executemany(
+            """
+            UPDATE valve_totals
+            SET pruned_liters = pruned_liters + ?,
+                pruned_minutes = pruned_minutes + ?,
+                pruned_session_count = pruned_session_count + ?
+            WHERE valve_topic = ?
+            """,
+            [(p[0], p[1], p[2], topic) for topic, p in pruned.items()],
+        )
+        self._conn.executemany(
+            "DELETE FROM sessions WHERE id = ?", [(r["id"],) for r in rows],
+        )
+        self._conn.executemany(
+            "DELETE FROM flow_traces WHERE session_row_id = ?", [(r["id"],) for r in rows],
+        )
+        self._conn.execute(
+            "DELETE FROM usage_daily WHERE sessions <= 0"
+        )
+        return len(rows)
+
+    async def delete_sessions(self, session_ids: List[str]) -> int:
+        """Delete completed sessions by `session_id`. Returns rows deleted."""
+        return await self.hass.async_add_executor_job(
+            self._delete_sessions_sync, session_ids,
+        )
+
+    def _delete_sessions_sync(self, session_ids: List[str]) -> int:
+        if not self._conn or not session_ids:
+            return 0
+        ids = [str(s) for s in dict.fromkeys(session_ids)]
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT id, valve_topic, ended_at, volume_liters, duration_minutes
+                    FROM session_log
+                    WHERE session_id IN ({','.join('?' * len(ids))})
+                      AND ended_at IS NOT NULL
+                    """,
+                    ids,
+                ).fetchall()
+                deleted = self._delete_session_rows_locked(rows)
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                _LOGGER.error("❌ Error deleting sessions: %s", e, exc_info=True)
+                return 0
+        if deleted:
+            _LOGGER.info("🗑️ Deleted %d session(s)", deleted)
+        return deleted
+
+    async def clear_sessions(
+        self,
+        batch_size: int,
+        valve_topics: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        trigger_types: Optional[List[str]] = None,
+        success: Optional[bool] = None,
+        schedule_ids: Optional[List[str]] = None,
+    ) -> int:
+        """Delete every completed session matching the filters.
+
+        Runs as a sequence of `batch_size` transactions; the DB lock is
+        released between batches so MQTT-driven session writes are not
+        held up by a large clear. Returns rows deleted.
+        """
+        return await self.hass.async_add_executor_job(
+            self._clear_sessions_sync,
+            batch_size, valve_topics, start, end, trigger_types, success,
+            schedule_ids,
+        )
+
+    def _clear_sessions_sync(
+        self,
+        batch_size: int,
+        valve_topics: Optional[List[str]],
+        start: Optional[str],
+        end: Optional[str],
+        trigger_types: Optional[List[str]],
+        success: Optional[bool],
+        schedule_ids: Optional[List[str]],
+    ) -> int:
+        if not self._conn:
+            return 0
+        where, params = self._session_filters(
+            start, end, trigger_types, success, schedule_ids,
+        )
+        if valve_topics:
+            where.append(f"valve_topic IN ({','.join('?' * len(valve_topics))})")
+            params.extend(str(t) for t in valve_topics)
+        total = self._delete_matching_sessions_sync(where, params, batch_size)
+        if total:
+            _LOGGER.info("🧹 Cleared %d session(s)", total)
+        return total
+
+    def _delete_matching_sessions_sync(
+        self, where: List[str], params: List[Any], batch_size: int,
+    ) -> int:
+        """Delete the `session_log` rows matching `where` through
+        `_delete_session_rows_locked`, `batch_size` per transaction with
+        the lock released in between. Returns rows deleted."""
+        where = where + ["id > ?"]
+        sql = f"""
+            SELECT id, valve_topic, ended_at, volume_liters, duration_minutes
+            FROM session_log
+            WHERE {' AND '.join(where)}
+            ORDER BY id
+            LIMIT ?
+        """
+        total = 0
+        last_id = 0
+        while True:
+            with self._lock:
+                try:
+                    rows = self._conn.execute(
+                        sql, params + [last_id, int(batch_size)],
+                    ).fetchall()
+                    if not rows:
+                        break
+                    total += self._delete_session_rows_locked(rows)
+                    self._conn.commit()
+                except Exception as e:
+                    self._conn.rollback()
+                    _LOGGER.error("❌ Error clearing sessions: %s", e, exc_info=True)
+                    break
+            last_id = rows[-1]["id"]
+            if len(rows) < batch_size:
+                break
+        return total
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Streaming session reads
+    #
+    # `iter_sessions` runs on its own read-only connection: WAL gives it
+    # a consistent snapshot without taking `self._lock`, so a long scan
+    # never stalls session writes. Rows are pulled `fetchmany` chunk by
+    # chunk in the executor, so memory is bounded by the chunk size, not
+    # by history size. The export and the daily breakdown stream from it.
+    # ─────────────────────────────────────────────────────────────────────
+
+    # Rows fetched per executor hop by `iter_sessions`.
+    _ITER_CHUNK_ROWS = 500
+
+    # Column order of `export_session_chunks` rows.
+    EXPORT_COLUMNS = (
+        "session_id", "valve", "name", "started_at", "ended_at",
+        "duration_minutes", "volume_liters", "avg_flow_lpm", "trigger_type",
+        "target_liters", "target_minutes", "completed_successfully",
+    )
+
+    def _open_reader_sync(self) -> sqlite3.Connection:
+        """A separate read-only connection (caller closes it)."""
+        return sqlite3.connect(
+            f"{self.db_path.as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            timeout=10.0,
+        )
+
+    def _open_session_scan_sync(
+        self,
+        where: List[str],
+        params: List[Any],
+        newest_first: bool,
+    ) -> Tuple[sqlite3.Connection, sqlite3.Cursor]:
+        order = "DESC" if newest_first else "ASC"
+        conn = self._open_reader_sync()
+        try:
+            cursor = conn.execute(
+                f"""
+                SELECT {', '.join(SessionRow._fields)}
+                FROM session_log
+                WHERE {' AND '.join(where)}
+                ORDER BY ended_at {order}, id {order}
+                """,
+                params,
+            )
+        except Exception:
+            conn.close()
+            raise
+        return conn, cursor
+
+    @staticmethod
+    def _fetch_session_rows_sync(cursor: sqlite3.Cursor, size: int) -> List[SessionRow]:
+        return [
+            SessionRow(
+                *r[:4], _ensure_tz(r[4]), _ensure_tz(r[5]), *r[6:12], bool(r[12]),
+            )
+            for r in cursor.fetchmany(size)
+        ]
+
+    async def iter_sessions(
+        self,
+        valve_topics: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        trigger_types: Optional[List[str]] = None,
+        success: Optional[bool] = None,
+        schedule_ids: Optional[List[str]] = None,
+        newest_first: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> AsyncIterator[SessionRow]:
+        """Yield completed sessions one `SessionRow` at a time.
+
+        Ordered by (ended_at, id), oldest first unless `newest_first`.
+        Filters are those of `get_sessions_page`. Use under
+        `contextlib.aclosing` so the reader connection is closed if the
+        consumer stops early.
+        """
+        if not self._conn:
+            return
+        where, params = self._session_filters(
+            start, end, trigger_types, success, schedule_ids,
+        )
+        if valve_topics:
+            where.append(f"valve_topic IN ({','.join('?' * len(valve_topics))})")
+            params.extend(str(t) for t in valve_topics)
+        size = int(chunk_size or self._ITER_CHUNK_ROWS)
+        conn, cursor = await self.hass.async_add_executor_job(
+            self._open_session_scan_sync, where, params, newest_first,
+        )
+        try:
+            while True:
+                rows = await self.hass.async_add_executor_job(
+                    self._fetch_session_rows_sync, cursor, size,
+                )
+                for row in rows:
+                    yield row
+                if len(rows) < size:
+                    break
+        finally:
+            await self.hass.async_add_executor_job(conn.close)
+
+    async def export_session_chunks(
+        self,
+        chunk_size: int,
+        valve_topics: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> AsyncIterator[List[Tuple]]:
+        """Yield completed sessions, oldest first, `chunk_size` at a time.
+
+        Rows are tuples in `EXPORT_COLUMNS` order with timestamps tagged
+        UTC. `start` / `end` are tagged-UTC bounds on `ended_at` as for
+        `get_sessions_page`. Use under `contextlib.aclosing`, as for
+        `iter_sessions`.
+        """
+        chunk: List[Tuple] = []
+        async with aclosing(self.iter_sessions(
+            valve_topics, start, end, chunk_size=chunk_size,
+        )) as rows:
+            async for row in rows:
+                chunk.append(row[1:])
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Bulk session import
+    #
+    # Rows are staged `batch_size` at a time in a TEMP table with
+    # `executemany`, then moved into `sessions` with one INSERT … SELECT
+    # per batch (one transaction each, lock released in between).
+    # Sessions whose `session_id` already exists are skipped. Each
+    # batch adds its inserted rows' `valve_totals` and `usage_daily`
+    # deltas in the same transaction as the INSERT, so a failed or
+    # interrupted import never leaves sessions the totals don't count
+    # (see the verifier below). For large files the secondary session
+    # indexes are dropped for the load and rebuilt afterwards
+    # (`_create_tables` recreates them on the next start should HA stop
+    # mid-import).
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def import_sessions(
+        self,
+        rows: Iterable[Tuple],
+        batch_size: int,
+        defer_indexes: bool = False,
+    ) -> Tuple[int, int]:
+        """Insert completed sessions (tuples in `importer.IMPORT_COLUMNS`
+        order). Returns (inserted, duplicates)."""
+        return await self.hass.async_add_executor_job(
+            self._import_sessions_sync, rows, batch_size, defer_indexes,
+        )
+
+    def _import_sessions_sync(
+        self,
+        rows: Iterable[Tuple],
+        batch_size: int,
+        defer_indexes: bool,
+    ) -> Tuple[int, int]:
+        if not self._conn:
+            return 0, 0
+        with self._lock:
+            self._conn.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS import_stage (
+                    session_id TEXT PRIMARY KEY,
+                    valve_topic TEXT NOT NULL,
+                    valve_name TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    ended_at TEXT NOT NULL,
+                    duration_minutes REAL,
+                    volume_liters REAL,
+                    avg_flow_rate REAL,
+                    trigger_type TEXT,
+                    target_liters REAL,
+                    target_minutes REAL,
+                    completed_successfully INTEGER
+                )
+            """)
+            if defer_indexes:
+                for name in self._SESSION_INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            self._conn.commit()
+
+        inserted = duplicates = 0
+        batch: List[Tuple] = []
+        it = iter(rows)
+        try:
+            while True:
+                batch.clear()
+                for row in it:
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        break
+                if not batch:
+                    break
+                with self._lock:
+                    try:
+                        self._conn.execute("DELETE FROM temp.import_stage")
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO temp.import_stage VALUES "
+                            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            batch,
+                        )
+                        new_rows = self._conn.execute("""
+                            SELECT valve_topic, valve_name, ended_at,
+                                   volume_liters, duration_minutes
+                            FROM temp.import_stage AS s
+                            WHERE NOT EXISTS (
+                                SELECT 1 FROM sessions WHERE session_id = s.session_id
+                            )
+                        """).fetchall()
+                        # Existing valves keep their current name.
+                        self._conn.execute("""
+                            INSERT OR IGNORE INTO valves (topic, name)
+                            SELECT valve_topic, valve_name FROM temp.import_stage
+                        """)
+                        for (trigger_type,) in self._conn.execute(
+                            "SELECT DISTINCT trigger_type FROM temp.import_stage "
+                            "WHERE trigger_type IS NOT NULL"
+                        ).fetchall():
+                            self._trigger_id_locked(trigger_type)
+                        self._conn.execute("""
+                            INSERT OR IGNORE INTO sessions (
+                                session_id, valve_id, started_at,
+                                ended_at, duration_minutes, volume_liters,
+                                avg_flow_rate, trigger_id, target_liters,
+                                target_minutes, completed_successfully
+                            )
+                            SELECT s.session_id, v.id, s.started_at,
+                                   s.ended_at, s.duration_minutes, s.volume_liters,
+                                   s.avg_flow_rate, t.id, s.target_liters,
+                                   s.target_minutes, s.completed_successfully
+                            FROM temp.import_stage AS s
+                            JOIN valves AS v ON v.topic = s.valve_topic
+                            LEFT JOIN triggers AS t ON t.trigger_type = s.trigger_type
+                        """)
+                        self._apply_import_deltas_locked(new_rows)
+                        self._conn.commit()
+                    except Exception as e:
+                        self._conn.rollback()
+                        _LOGGER.error("❌ Session import batch failed: %s", e, exc_info=True)
+                        raise
+                inserted += len(new_rows)
+                duplicates += len(batch) - len(new_rows)
+        finally:
+            with self._lock:
+                self._conn.execute("DROP TABLE IF EXISTS temp.import_stage")
+                if defer_indexes:
+                    for ddl in self._SESSION_INDEXES.values():
+                        self._conn.execute(ddl)
+                self._conn.commit()
+        return inserted, duplicates
+
+    def _apply_import_deltas_locked(self, new_rows: List[sqlite3.Row]) -> None:
+        """Add one import batch's sessions to `valve_totals` and `usage_daily`.
+
+        Caller holds `self._lock` and commits.
+        """
+        totals: Dict[str, List[Any]] = {}           # topic → [name, L, min, n]
+        rollup: Dict[Tuple[str, str], List[float]] = {}
+        for r in new_rows:
+            liters = float(r["volume_liters"] or 0)
+            minutes = float(r["duration_minutes"] or 0)
+            t = totals.setdefault(r["valve_topic"], [r["valve_name"], 0.0, 0.0, 0])
+            t[1] += liters
+            t[2] += minutes
+            t[3] += 1
+            day = self._local_day(r["ended_at"])
+            if day is not None:
+                b = rollup.setdefault((r["valve_topic"], day), [0.0, 0.0, 0])
+                b[0] += liters
+                b[1] += minutes
+                b[2] += 1
+        # Lifetime totals only: the resettable counters cover the period
+        # since the user's last reset, which imported history predates.
+        self._conn.executemany(
+            """
+            INSERT INTO valve_totals (
+                valve_topic, valve_name, lifetime_total_liters,
+                lifetime_total_minutes, lifetime_session_count
+            ) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(valve_topic) DO UPDATE SET
+                lifetime_total_liters = lifetime_total_liters + excluded.lifetime_total_liters,
+                lifetime_total_minutes = lifetime_total_minutes + excluded.lifetime_total_minutes,
+                lifetime_session_count = lifetime_session_count + excluded.lifetime_session_count,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            [(topic, t[0], t[1], t[2], t[3]) for topic, t in totals.items()],
+        )
+        self._conn.executemany(
+            """
+            INSERT INTO usage_daily (valve_topic, day, liters, minutes, sessions)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(valve_topic, day) DO UPDATE SET
+                liters = liters + excluded.liters,
+                minutes = minutes + excluded.minutes,
+                sessions = sessions + excluded.sessions
+            """,
+            [(t, d, b[0], b[1], b[2]) for (t, d), b in rollup.items()],
+        )
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — valve_totals verifier
+    #
+    # `valve_totals` is maintained incrementally and can drift from
+    # `sessions` after crashes or orphan recovery. Lifetime totals never
+    # go down: deleted sessions move to the `pruned_*` ledger, and the
+    # expected lifetime is `sessions + pruned`.
+    #
+    # The verifier reads both tables in one snapshot on the read-only
+    # connection (one grouped aggregate over `sessions`, no lock held),
+    # and a repair applies the drift as a delta under the lock. Every
+    # writer changes a session and its valve's totals in the same
+    # transaction (`finish_session`, `import_sessions`, deletes), so a
+    # snapshot never sees one without the other, and a session that ends
+    # after the snapshot is neither lost nor counted twice by the delta.
+    # Lock hold is one short transaction of O(valves) statements.
+    # ─────────────────────────────────────────────────────────────────────
+
+    # Differences at or below these are rounding, not drift.
+    _TOTALS_TOLERANCE_LITERS = 0.01
+    _TOTALS_TOLERANCE_MINUTES = 0.01
+
+    async def verify_valve_totals(self, repair: bool = False) -> Dict[str, Any]:
+        """Compare lifetime totals with `sessions`; optionally repair.
+
+        Returns {"checked", "drifted": [{valve, name, recorded,
+        expected, delta}], "repaired", "seconds"}.
+        """
+        return await self.hass.async_add_executor_job(
+            self._verify_valve_totals_sync, repair,
+        )
+
+    def _verify_valve_totals_sync(self, repair: bool) -> Dict[str, Any]:
+        started = time.monotonic()
+        report: Dict[str, Any] = {"checked": 0, "drifted": [], "repaired": False}
+        if not self._conn:
+            return report
+        reader = self._open_reader_sync()
+        try:
+            reader.execute("BEGIN")  # both reads from one snapshot
+            expected = {
+                r[0]: (r[1], float(r[2] or 0), float(r[3] or 0), int(r[4]))
+                for r in reader.execute("""
+                    SELECT valve_topic, MAX(valve_name), SUM(volume_liters),
+                           SUM(duration_minutes), COUNT(*)
+                    FROM session_log
+                    WHERE ended_at IS NOT NULL
+                    GROUP BY valve_topic
+                """)
+            }
+            recorded = {}
+            for r in reader.execute("""
+                SELECT valve_topic, valve_name, lifetime_total_liters,
+                       lifetime_total_minutes, lifetime_session_count,
+                       pruned_liters, pruned_minutes, pruned_session_count
+                FROM valve_totals
+            """):
+                recorded[r[0]] = (r[1], float(r[2] or 0), float(r[3] or 0), int(r[4] or 0))
+                # Deleted history still counts toward the lifetime figures.
+                if r[5] or r[6] or r[7]:
+                    e = expected.get(r[0], (r[1], 0.0, 0.0, 0))
+                    expected[r[0]] = (
+                        e[0], e[1] + float(r[5] or 0), e[2] + float(r[6] or 0),
+                        e[3] + int(r[7] or 0),
+                    )
+            reader.rollback()
+        finally:
+            reader.close()
+
+        deltas: List[Tuple] = []
+        for topic in sorted(set(expected) | set(recorded)):
+            e = expected.get(topic, (None, 0.0, 0.0, 0))
+            r = recorded.get(topic, (None, 0.0, 0.0, 0))
+            d = (e[1] - r[1], e[2] - r[2], e[3] - r[3])
+            report["checked"] += 1
+            if (
+                abs(d[0]) <= self._TOTALS_TOLERANCE_LITERS
+                and abs(d[1]) <= self._TOTALS_TOLERANCE_MINUTES
+                and d[2] == 0
+            ):
+                continue
+            name = r[0] or e[0] or topic
+            report["drifted"].append({
+                "valve": topic,
+                "name": name,
+                "recorded": {"liters": round(r[1], 3), "minutes": round(r[2], 3), "sessions": r[3]},
+                "expected": {"liters": round(e[1], 3), "minutes": round(e[2], 3), "sessions": e[3]},
+                "delta": {"liters": round(d[0], 3), "minutes": round(d[1], 3), "sessions": d[2]},
+            })
+            deltas.append((topic, name, d[0], d[1], d[2]))
+
+        if repair and deltas:
+            with self._lock:
+                try:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO valve_totals (
+                            valve_topic, valve_name, lifetime_total_liters,
+                            lifetime_total_minutes, lifetime_session_count
+                        ) VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(valve_topic) DO UPDATE SET
+                            lifetime_total_liters = lifetime_total_liters + excluded.lifetime_total_liters,
+                            lifetime_total_minutes = lifetime_total_minutes + excluded.lifetime_total_minutes,
+                            lifetime_session_count = lifetime_session_count + excluded.lifetime_session_count,
+                            updated_at = CURRENT_TIMESTAMP
+                        """,
+                        deltas,
+                    )
+                    self._conn.commit()
+                    report["repaired"] = True
+                except Exception as e:
+                    self._conn.rollback()
+                    _LOGGER.error("❌ Error repairing valve totals: %s", e, exc_info=True)
+        report["seconds"] = round(time.monotonic() - started, 3)
+        if report["drifted"]:
+            _LOGGER.warning(
+                "🔎 valve_totals drift on %d of %d valve(s)%s",
+                len(report["drifted"]), report["checked"],
+                " — repaired" if report["repaired"] else "",
+            )
+        else:
+            _LOGGER.info("🔎 valve_totals consistent (%d valve(s))", report["checked"])
+        return report
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Online backup
+    #
+    # Copies a consistent snapshot of the live WAL database without
+    # taking `self._lock`: the source is the read-only connection, so
+    # session writes carry on while the copy runs. Two methods:
+    #
+    #   backup  SQLite online backup API, `pages` pages per step with a
+    #           short sleep between steps (the copy restarts if another
+    #           connection writes mid-way; writes here are rare).
+    #   vacuum  `VACUUM INTO` — one statement, one read snapshot, and
+    #           the copy comes out defragmented.
+    #
+    # The file is written as `<name>.partial` and renamed when complete.
+    # ─────────────────────────────────────────────────────────────────────
+
+    BACKUP_METHODS = ("backup", "vacuum")
+
+    async def backup_to(
+        self,
+        target: Path,
+        method: str = "backup",
+        pages: int = 256,
+        sleep: float = 0.005,
+    ) -> Dict[str, Any]:
+        """Write a consistent copy of the database to `target`.
+
+        Returns {"path", "method", "bytes", "seconds"}.
+        """
+        return await self.hass.async_add_executor_job(
+            self._backup_to_sync, target, method, pages, sleep,
+        )
+
+    def _backup_to_sync(
+        self, target: Path, method: str, pages: int, sleep: float,
+    ) -> Dict[str, Any]:
+        if method not in self.BACKUP_METHODS:
+            raise ValueError(f"unknown backup method {method!r}")
+        started = time.monotonic()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        partial.unlink(missing_ok=True)
+        reader = self._open_reader_sync()
+        try:
+            if method == "vacuum":
+                reader.execute("VACUUM INTO ?", (str(partial),))
+            else:
+                dest = sqlite3.connect(str(partial))
+                try:
+                    reader.backup(dest, pages=pages, sleep=sleep)
+                finally:
+                    dest.close()
+        except Exception:
+            partial.unlink(missing_ok=True)
+            raise
+        finally:
+            reader.close()
+        partial.replace(target)
+        result = {
+            "path": str(target),
+            "method": method,
+            "bytes": target.stat().st_size,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        _LOGGER.info(
+            "💾 Database backup (%s) written to %s: %d bytes in %.2fs",
+            method, target, result["bytes"], result["seconds"],
+        )
+        return result
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Storage maintenance
+    #
+    # The manager calls `run_maintenance` while irrigation is idle. Each
+    # bounded step takes the lock on its own: an `incremental_vacuum` of
+    # at most `vacuum_pages` pages, `PRAGMA optimize`, and a
+    # `wal_checkpoint(TRUNCATE)` that shrinks the WAL file back to zero.
+    #
+    # The one-time conversion to auto_vacuum=INCREMENTAL is a full VACUUM
+    # whose run time grows with the database, so it only runs when the
+    # caller passes `convert=True`, and it runs on its own connection
+    # WITHOUT `self._lock`: session writes arriving meanwhile wait in
+    # SQLite's busy handler (the 10 s connection timeout) rather than
+    # behind a Python lock with no bound.
+    # ─────────────────────────────────────────────────────────────────────
+
+    _AUTO_VACUUM_INCREMENTAL = 2
+
+    async def get_storage_stats(self) -> Dict[str, Any]:
+        """Database / WAL file sizes and free-page (fragmentation) figures."""
+        return await self.hass.async_add_executor_job(self._get_storage_stats_sync)
+
+    def _get_storage_stats_sync(self) -> Dict[str, Any]:
+        if not self._conn:
+            return {}
+        with self._lock:
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = self._conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        wal = self.db_path.with_name(self.db_path.name + "-wal")
+        return {
+            "db_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist,
+            "fragmentation_pct": (
+                round(100.0 * freelist / page_count, 2) if page_count else 0.0
+            ),
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, auto_vacuum),
+        }
+
+    async def run_maintenance(self, vacuum_pages: int, convert: bool = False) -> Dict[str, Any]:
+        """One maintenance pass. Returns what was done plus fresh stats.
+
+        `convert` allows the one-time auto_vacuum conversion (a full
+        VACUUM) if the database still needs it.
+        """
+        return await self.hass.async_add_executor_job(
+            self._run_maintenance_sync, vacuum_pages, convert,
+        )
+
+    def _run_maintenance_sync(self, vacuum_pages: int, convert: bool = False) -> Dict[str, Any]:
+        if not self._conn:
+            return {}
+        started = time.monotonic()
+        result: Dict[str, Any] = {"converted": False, "conversion_pending": False}
+        with self._lock:
+            mode = self._conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != self._AUTO_VACUUM_INCREMENTAL:
+            if convert:
+                result["converted"] = self._convert_auto_vacuum_sync()
+            result["conversion_pending"] = not result["converted"]
+        with self._lock:
+            before = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion; a plain
+            # execute() stops after the first freed page.
+            self._conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+            after = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            result["freed_pages"] = before - after
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+        with self._lock:
+            busy, log_frames, checkpointed = self._conn.execute(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).fetchone()
+            result["checkpoint"] = {
+                "busy": bool(busy), "log_frames": log_frames, "checkpointed": checkpointed,
+            }
+        result["seconds"] = round(time.monotonic() - started, 3)
+        result["stats"] = self._get_storage_stats_sync()
+        _LOGGER.info(
+            "🧹 Database maintenance: freed %d page(s), WAL checkpoint %s, %.2fs",
+            result["freed_pages"],
+            "busy" if busy else "truncated", result["seconds"],
+        )
+        return result
+
+    def _convert_auto_vacuum_sync(self) -> bool:
+        """One-time VACUUM into auto_vacuum=INCREMENTAL on a private
+        connection (no `self._lock`). Returns True on success."""
+        _LOGGER.info("🧹 Converting database to auto_vacuum=INCREMENTAL (one-time VACUUM)")
+        started = time.monotonic()
+        conn = sqlite3.connect(str(self.db_path), timeout=10.0)
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        except sqlite3.Error as e:
+            _LOGGER.warning("auto_vacuum conversion skipped (%s); will retry", e)
+            return False
+        finally:
+            conn.close()
+        _LOGGER.info("🧹 auto_vacuum conversion done in %.2fs", time.monotonic() - started)
+        return True
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Flow traces
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def get_flow_trace(self, session_id: str) -> Optional[List[Tuple[float, float]]]:
+        """Decoded flow trace of a session: [(seconds, L/min), ...], or
+        None when the session has no trace."""
+        return await self.hass.async_add_executor_job(
+            self._get_flow_trace_sync, session_id,
+        )
+
+    def _get_flow_trace_sync(self, session_id: str) -> Optional[List[Tuple[float, float]]]:
+        if not self._conn:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT f.trace FROM flow_traces AS f
+                JOIN sessions AS s ON s.id = f.session_row_id
+                WHERE s.session_id = ?
+                """,
+                (str(session_id),),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return flowtrace.decode(row["trace"])
+        except Exception as e:
+            _LOGGER.warning("Unreadable flow trace for %s: %s", session_id, e)
+            return None
+
     # ─────────────────────────────────────────────────────────────────────
     # v3.1 — Safety: in-flight session recovery support
     # ─────────────────────────────────────────────────────────────────────
@@ -810,7 +2125,7 @@ class IrrigationDatabase:
                 cursor = self._conn.execute("""
                     SELECT session_id, valve_topic, valve_name, started_at,
                            target_liters, target_minutes, trigger_type
-                    FROM sessions
+                    FROM session_log
                     WHERE ended_at IS NULL
                     ORDER BY started_at ASC
                 """)
@@ -844,7 +2159,7 @@ class IrrigationDatabase:
             try:
                 cursor = self._conn.execute("""
                     SELECT avg_flow_rate
-                    FROM sessions
+                    FROM session_log
                     WHERE valve_topic = ?
                       AND ended_at IS NOT NULL
                       AND avg_flow_rate IS NOT NULL
@@ -897,70 +2212,43 @@ class IrrigationDatabase:
         Insight tab chart. The local_tz binning fixes this for both
         legacy NAIVE rows and new tagged rows.
         """
-        return await self.hass.async_add_executor_job(
-            self._get_daily_breakdown_sync, valve_topic, days, local_tz,
-        )
-
-    def _get_daily_breakdown_sync(
-        self,
-        valve_topic: str,
-        days: int,
-        local_tz: Optional[Any] = None,
-    ) -> List[Dict[str, Any]]:
-        if not self._conn:
-            return []
         if not valve_topic or not isinstance(valve_topic, str):
             return []
-        with self._lock:
-            try:
-                cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-                cursor = self._conn.execute(
-                    """
-                    SELECT ended_at, volume_liters, duration_minutes
-                    FROM sessions
-                    WHERE valve_topic = ?
-                      AND ended_at IS NOT NULL
-                      AND ended_at >= ?
-                    ORDER BY ended_at DESC
-                    """,
-                    (str(valve_topic), str(cutoff)),
-                )
-                try:
-                    rows = cursor.fetchall()
-                except Exception:
-                    rows = []
-                finally:
-                    cursor.close()
-            except Exception as e:
-                _LOGGER.error(
-                    "❌ Error querying daily breakdown for %s: %s",
-                    valve_topic, e, exc_info=True,
-                )
-                return []
-
-        # Python-side bucketing by LOCAL-TIME date so the Insight tab
-        # chart shows sessions on the day the user perceives them, not
-        # the UTC day they happened to fall on.
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        # v4.2 — streamed from `iter_sessions`: only the per-day buckets
+        # are held, however long the range.
         from collections import defaultdict
         buckets: Dict[str, Dict[str, float]] = defaultdict(
             lambda: {"liters": 0.0, "minutes": 0.0, "sessions": 0}
         )
-        for r in rows:
-            ended_at_str = _ensure_tz(r["ended_at"])
-            try:
-                ended_dt = datetime.fromisoformat(ended_at_str)
-            except Exception:
-                continue
-            if local_tz is not None:
-                try:
-                    ended_dt = ended_dt.astimezone(local_tz)
-                except Exception:
-                    pass  # fall back to whatever TZ ended_dt has
-            day_key = ended_dt.date().isoformat()
-            b = buckets[day_key]
-            b["liters"] += float(r["volume_liters"] or 0)
-            b["minutes"] += float(r["duration_minutes"] or 0)
-            b["sessions"] += 1
+        try:
+            async with aclosing(
+                self.iter_sessions([valve_topic], start=cutoff)
+            ) as rows:
+                async for r in rows:
+                    # Python-side bucketing by LOCAL-TIME date so the
+                    # Insight tab chart shows sessions on the day the
+                    # user perceives them, not the UTC day they happened
+                    # to fall on.
+                    try:
+                        ended_dt = datetime.fromisoformat(r.ended_at)
+                    except Exception:
+                        continue
+                    if local_tz is not None:
+                        try:
+                            ended_dt = ended_dt.astimezone(local_tz)
+                        except Exception:
+                            pass  # fall back to whatever TZ ended_dt has
+                    b = buckets[ended_dt.date().isoformat()]
+                    b["liters"] += float(r.volume_liters or 0)
+                    b["minutes"] += float(r.duration_minutes or 0)
+                    b["sessions"] += 1
+        except Exception as e:
+            _LOGGER.error(
+                "❌ Error querying daily breakdown for %s: %s",
+                valve_topic, e, exc_info=True,
+            )
+            return []
 
         return sorted(
             (
@@ -976,37 +2264,380 @@ class IrrigationDatabase:
             reverse=True,
         )
 
-    async def cleanup_old_sessions(self, days: int = 90):
-        """Clean up sessions older than specified days"""
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Usage rollup (`usage_daily`)
+    #
+    # One row per (valve, local date). Session ends add to it; range
+    # queries at any resolution aggregate it, so their cost scales with
+    # the number of days in the range, not with session history.
+    # ─────────────────────────────────────────────────────────────────────
+
+    # SQL key for each resolution. ISO weeks are keyed by their Monday.
+    _ROLLUP_PERIOD_SQL = {
+        "day": "day",
+        "week": "date(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days')",
+        "month": "substr(day, 1, 7)",
+        "year": "substr(day, 1, 4)",
+    }
+
+    def _local_day(self, iso_ts: Optional[str]) -> Optional[str]:
+        try:
+            ts = datetime.fromisoformat(_ensure_tz(iso_ts))
+        except (TypeError, ValueError):
+            return None
+        return ts.astimezone(self._local_tz).date().isoformat()
+
+    def _rollup_add_locked(
+        self,
+        valve_topic: str,
+        ended_at: Optional[str],
+        liters: Optional[float],
+        minutes: Optional[float],
+        sessions: int,
+    ) -> None:
+        """Add (or, with negative values, remove) one session's usage.
+
+        Caller holds `self._lock` and commits.
+        """
+        day = self._local_day(ended_at)
+        if day is None:
+            return
+        self._conn.execute(
+            """
+            INSERT INTO usage_daily (valve_topic, day, liters, minutes, sessions)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(valve_topic, day) DO UPDATE SET
+                liters = liters + excluded.liters,
+                minutes = minutes + excluded.minutes,
+                sessions = sessions + excluded.sessions
+            """,
+            (str(valve_topic), day, float(liters or 0), float(minutes or 0), int(sessions)),
+        )
+
+    def _rebuild_usage_rollup_locked(self) -> int:
+        """Recompute `usage_daily` from `sessions` in one streaming pass.
+
+        Caller holds `self._lock` (or runs before the connection is
+        shared) and commits. Returns the number of rollup rows written.
+        """
+        buckets: Dict[Tuple[str, str], List[float]] = {}
+        cursor = self._conn.execute(
+            """
+            SELECT valve_topic, ended_at, volume_liters, duration_minutes
+            FROM session_log WHERE ended_at IS NOT NULL
+            """
+        )
+        try:
+            while True:
+                chunk = cursor.fetchmany(1000)
+                if not chunk:
+                    break
+                for r in chunk:
+                    day = self._local_day(r["ended_at"])
+                    if day is None:
+                        continue
+                    b = buckets.setdefault((r["valve_topic"], day), [0.0, 0.0, 0])
+                    b[0] += float(r["volume_liters"] or 0)
+                    b[1] += float(r["duration_minutes"] or 0)
+                    b[2] += 1
+        finally:
+            cursor.close()
+        self._conn.execute("DELETE FROM usage_daily")
+        self._conn.executemany(
+            """
+            INSERT INTO usage_daily (valve_topic, day, liters, minutes, sessions)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(t, d, b[0], b[1], b[2]) for (t, d), b in buckets.items()],
+        )
+        _LOGGER.info(
+            "📊 Usage rollup rebuilt: %d valve-day row(s) (tz %s)",
+            len(buckets), self._local_tz,
+        )
+        return len(buckets)
+
+    async def get_usage_buckets(
+        self,
+        resolution: str,
+        start_day: str,
+        end_day: str,
+        valve_topics: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Usage per (valve, period) over local dates `[start_day, end_day]`.
+
+        `resolution` is `day`, `week`, `month` or `year`. Each row:
+        {valve_topic, period, liters, minutes, sessions}; `period` is the
+        ISO date (day), the Monday's ISO date (week), `YYYY-MM` (month)
+        or `YYYY` (year). Periods without usage are omitted.
+        """
         return await self.hass.async_add_executor_job(
-            self._cleanup_old_sessions_sync, days
+            self._get_usage_buckets_sync,
+            resolution, start_day, end_day, valve_topics,
         )
 
-    def _cleanup_old_sessions_sync(self, days: int):
-        """Synchronous cleanup of old sessions"""
+    def _get_usage_buckets_sync(
+        self,
+        resolution: str,
+        start_day: str,
+        end_day: str,
+        valve_topics: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
         if not self._conn:
-            return
+            return []
+        period = self._ROLLUP_PERIOD_SQL.get(resolution)
+        if period is None:
+            raise ValueError(f"unknown resolution {resolution!r}")
+        where = "day BETWEEN ? AND ?"
+        params: List[Any] = [str(start_day), str(end_day)]
+        if valve_topics:
+            where += f" AND valve_topic IN ({','.join('?' * len(valve_topics))})"
+            params.extend(str(t) for t in valve_topics)
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT valve_topic, {period} AS period,
+                           SUM(liters) AS liters, SUM(minutes) AS minutes,
+                           SUM(sessions) AS sessions
+                    FROM usage_daily
+                    WHERE {where}
+                    GROUP BY valve_topic, period
+                    """,
+                    params,
+                ).fetchall()
+            except Exception as e:
+                _LOGGER.error("❌ Error querying usage rollup: %s", e, exc_info=True)
+                return []
+        return [
+            {
+                "valve_topic": r["valve_topic"],
+                "period": r["period"],
+                "liters": round(float(r["liters"] or 0), 2),
+                "minutes": round(float(r["minutes"] or 0), 2),
+                "sessions": int(r["sessions"] or 0),
+            }
+            for r in rows
+        ]
 
-        try:
-            cursor = self._conn.cursor()
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Schedule event timeline
+    #
+    # Append-only `irrigation_events` table. Inserts prune by time with a
+    # single indexed DELETE; reads page newest-first by keyset on `id`
+    # (`before_id`), so neither path scales with the retained row count.
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def record_schedule_event(
+        self, event: Dict[str, Any], retention_days: int,
+    ) -> Optional[int]:
+        """Insert one schedule event and prune rows past the retention window.
+
+        `event` carries the keys produced by the schedule engine: `at`,
+        `kind`, `schedule_id`, `schedule_name`, `outcome`, `mode`,
+        `trigger`, `zones`, `total_liters`. Returns the new row id.
+        """
+        return await self.hass.async_add_executor_job(
+            self._record_schedule_event_sync, event, retention_days,
+        )
+
+    def _record_schedule_event_sync(
+        self, event: Dict[str, Any], retention_days: int,
+    ) -> Optional[int]:
+        if not self._conn:
+            return None
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(days=retention_days)
+        ).isoformat()
+        with self._lock:
             try:
-                cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+                cursor = self._conn.execute(
+                    """
+                    INSERT INTO irrigation_events (
+                        at, kind, schedule_id, schedule_name, outcome,
+                        mode, trigger, zones, total_liters
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    self._event_params(event),
+                )
+                row_id = cursor.lastrowid
+                cursor.close()
+                self._conn.execute(
+                    "DELETE FROM irrigation_events WHERE at < ?", (cutoff,),
+                )
+                self._conn.commit()
+                return row_id
+            except Exception as e:
+                _LOGGER.error(
+                    "❌ Error recording schedule event: %s", e, exc_info=True,
+                )
+                return None
 
-                cursor.execute("""
-                    DELETE FROM sessions
-                    WHERE started_at < ?
-                """, (cutoff,))
+    async def import_schedule_events(self, events: List[Dict[str, Any]]) -> int:
+        """Bulk-insert legacy JSON timeline records (oldest first).
 
-                deleted = cursor.rowcount
+        Used once on upgrade to carry the pre-v4.2 `_schedule_events`
+        list over. Returns the number of rows inserted.
+        """
+        return await self.hass.async_add_executor_job(
+            self._import_schedule_events_sync, events,
+        )
+
+    def _import_schedule_events_sync(self, events: List[Dict[str, Any]]) -> int:
+        if not self._conn or not events:
+            return 0
+        rows = [self._event_params(e) for e in events if e.get("at")]
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO irrigation_events (
+                        at, kind, schedule_id, schedule_name, outcome,
+                        mode, trigger, zones, total_liters
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
                 self._conn.commit()
+                return len(rows)
+            except Exception as e:
+                _LOGGER.error(
+                    "❌ Error importing schedule events: %s", e, exc_info=True,
+                )
+                return 0
+
+    @staticmethod
+    def _event_params(event: Dict[str, Any]) -> Tuple:
+        total = event.get("total_liters")
+        return (
+            _ensure_tz(event.get("at")) or _iso_utc(),
+            event.get("kind") or "",
+            event.get("schedule_id"),
+            event.get("schedule_name"),
+            event.get("outcome") or "",
+            event.get("mode"),
+            event.get("trigger"),
+            json.dumps(list(event.get("zones") or [])),
+            round(float(total), 2) if total is not None else None,
+        )
 
-                if deleted > 0:
-                    _LOGGER.info(f"🧹 Cleaned up {deleted} old sessions (>{days} days)")
-            finally:
-                cursor.close()
+    async def get_schedule_events(
+        self,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        schedule_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return one page of the schedule timeline, newest first.
 
-        except Exception as e:
-            _LOGGER.error(f"❌ Error cleaning up sessions: {e}", exc_info=True)
+        Pass the smallest `id` of the previous page as `before_id` to
+        fetch the next (older) page. `schedule_id` narrows the timeline
+        to a single schedule.
+        """
+        return await self.hass.async_add_executor_job(
+            self._get_schedule_events_sync, limit, before_id, schedule_id,
+        )
+
+    def _get_schedule_events_sync(
+        self,
+        limit: int,
+        before_id: Optional[int],
+        schedule_id: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        if not self._conn:
+            return []
+        where: List[str] = []
+        params: List[Any] = []
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(int(before_id))
+        if schedule_id:
+            where.append("schedule_id = ?")
+            params.append(str(schedule_id))
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        params.append(int(limit))
+        with self._lock:
+            try:
+                cursor = self._conn.execute(
+                    f"""
+                    SELECT id, at, kind, schedule_id, schedule_name, outcome,
+                           mode, trigger, zones, total_liters
+                    FROM irrigation_events
+                    {clause}
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    params,
+                )
+                try:
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+            except Exception as e:
+                _LOGGER.error(
+                    "❌ Error reading schedule events: %s", e, exc_info=True,
+                )
+                return []
+        out: List[Dict[str, Any]] = []
+        for r in rows:
+            try:
+                zones = json.loads(r["zones"]) if r["zones"] else []
+            except ValueError:
+                zones = []
+            out.append({
+                "id": r["id"],
+                "at": r["at"],
+                "kind": r["kind"],
+                "schedule_id": r["schedule_id"],
+                "schedule_name": r["schedule_name"],
+                "outcome": r["outcome"],
+                "mode": r["mode"],
+                "trigger": r["trigger"],
+                "zones": zones,
+                "total_liters": r["total_liters"],
+            })
+        return out
+
+    async def count_schedule_events(self) -> int:
+        """Number of schedule events currently retained."""
+        return await self.hass.async_add_executor_job(
+            self._count_schedule_events_sync,
+        )
+
+    def _count_schedule_events_sync(self) -> int:
+        if not self._conn:
+            return 0
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM irrigation_events"
+                ).fetchone()
+                return int(row[0]) if row else 0
+            except Exception as e:
+                _LOGGER.error(
+                    "❌ Error counting schedule events: %s", e, exc_info=True,
+                )
+                return 0
+
+    async def cleanup_old_sessions(self, days: int = 90, batch_size: int = 500):
+        """Clean up completed sessions that started more than `days` ago.
+
+        v4.2 — same path as `clear_sessions`: batched, under the lock,
+        out of the usage rollup and into the `pruned_*` ledger.
+        """
+        return await self.hass.async_add_executor_job(
+            self._cleanup_old_sessions_sync, days, batch_size
+        )
+
+    def _cleanup_old_sessions_sync(self, days: int, batch_size: int = 500) -> int:
+        """Synchronous cleanup of old sessions"""
+        if not self._conn:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        deleted = self._delete_matching_sessions_sync(
+            ["ended_at IS NOT NULL", "started_at < ?"], [cutoff], batch_size,
+        )
+        if deleted > 0:
+            _LOGGER.info(f"🧹 Cleaned up {deleted} old sessions (>{days} days)")
+        return deleted
 
     async def close(self):
         """Close database connection"""
@@ -0,0 +1,152 @@
+"""Server-side downsampling for the `z2m_irrigation/series` websocket.
+
+v4.2 — charts of a session's flow trace or of years of daily usage
+used to receive every point and thin them in the browser. The command
+reduces a series to at most `points` points here instead:
+
+    lttb    Largest-Triangle-Three-Buckets. Keeps the visual shape of a
+            line with `points` points; first and last are always kept.
+    minmax  Splits the series into `points / 2` buckets and keeps each
+            bucket's minimum and maximum, in order, so spikes and dips
+            (a clog, a pressure drop) survive any reduction.
+
+Both return indices into the input, so x values pass through
+untouched. NumPy is used when installed (per-bucket work is then
+vectorized); results are identical either way. Reductions are cached
+in a small LRU keyed by (series key, method, points) — callers put a
+version into the series key when the underlying data can change.
+
+Pure data, no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+try:  # Optional — HA ships NumPy on most installs, but don't require it.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the install
+    np = None
+
+METHODS = ("lttb", "minmax")
+
+
+def _lttb_indices(xs: Sequence[float], ys: Sequence[float], n: int) -> List[int]:
+    size = len(xs)
+    every = (size - 2) / (n - 2)
+    out = [0]
+    a = 0
+    for i in range(n - 2):
+        lo = int((i + 1) * every) + 1
+        hi = min(int((i + 2) * every) + 1, size)
+        avg_x = sum(xs[lo:hi]) / (hi - lo)
+        avg_y = sum(ys[lo:hi]) / (hi - lo)
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo - 1, -1.0
+        for j in range(int(i * every) + 1, lo):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(size - 1)
+    return out
+
+
+def _lttb_indices_numpy(xs: Sequence[float], ys: Sequence[float], n: int) -> List[int]:
+    x = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
+    size = len(x)
+    # Same bucket edges as `_lttb_indices`: bucket i is [e[i], e[i+1]).
+    edges = (np.arange(n) * ((size - 2) / (n - 2))).astype(int) + 1
+    out = [0]
+    a = 0
+    for i in range(n - 2):
+        start, lo, hi = edges[i], edges[i + 1], min(edges[i + 2], size)
+        avg_x = x[lo:hi].mean()
+        avg_y = y[lo:hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:lo] - y[a]) - (x[a] - x[start:lo]) * (avg_y - y[a])
+        )
+        a = int(start + area.argmax())
+        out.append(a)
+    out.append(size - 1)
+    return out
+
+
+def _minmax_indices(ys: Sequence[float], n: int) -> List[int]:
+    size = len(ys)
+    buckets = max(1, n // 2)
+    out: List[int] = []
+    for b in range(buckets):
+        lo = b * size // buckets
+        hi = (b + 1) * size // buckets
+        if hi <= lo:
+            continue
+        i_min = min(range(lo, hi), key=ys.__getitem__)
+        i_max = max(range(lo, hi), key=ys.__getitem__)
+        out.extend(sorted({i_min, i_max}))
+    return out
+
+
+def _minmax_indices_numpy(ys: Sequence[float], n: int) -> List[int]:
+    y = np.asarray(ys, dtype=float)
+    size = len(y)
+    buckets = max(1, n // 2)
+    out: List[int] = []
+    for b in range(buckets):
+        lo = b * size // buckets
+        hi = (b + 1) * size // buckets
+        if hi <= lo:
+            continue
+        chunk = y[lo:hi]
+        out.extend(sorted({lo + int(chunk.argmin()), lo + int(chunk.argmax())}))
+    return out
+
+
+def downsample(
+    method: str, xs: Sequence[Any], ys: Sequence[float], points: int,
+) -> Tuple[List[Any], List[float]]:
+    """Reduce (xs, ys) to at most `points` points with `method`.
+
+    For LTTB `xs` must be numeric; pass an index range and map back for
+    labelled axes. Blocking CPU work — run it in the executor.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}")
+    size = len(ys)
+    if points >= size or size <= 2:
+        return list(xs), list(ys)
+    if method == "lttb":
+        if points < 3:
+            idx = [0, size - 1][:points]
+        elif np is not None:
+            idx = _lttb_indices_numpy(xs, ys, points)
+        else:
+            idx = _lttb_indices(xs, ys, points)
+    elif np is not None:
+        idx = _minmax_indices_numpy(ys, points)
+    else:
+        idx = _minmax_indices(ys, points)
+    return [xs[i] for i in idx], [ys[i] for i in idx]
+
+
+class DownsampleCache:
+    """Small LRU of downsampled series."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._items: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self._size:
+            self._items.popitem(last=False)
@@ -0,0 +1,154 @@
+"""Per-valve MQTT flight recorder for panic post-mortems.
+
+v4.2 — when `_trigger_panic` fires (directly, or after EVENT_SHUTOFF_FAILED
+exhausted the OFF retry chain) the log used to be the only record of
+what the valve was reporting. Each valve now keeps its last `capacity`
+decoded MQTT reports in a `FlightRecorder`: preallocated, column-wise
+`array` rings, so recording a report is a handful of item stores and
+allocates nothing. Per report:
+
+    ts               monotonic time of the report (converted on dump)
+    state            ON / OFF as last decoded
+    flow_lpm         normalized flow, float32
+    device_status    `current_device_status`, interned to a byte code
+    session_liters   integrated session volume, float32
+    flags            session_active / shutoff_in_progress /
+                     software_overshoot_fired bits
+
+On panic the manager snapshots every valve's ring together with the
+panic reason, guardrail state and shutoff attempt history, and
+`write_dump` stores it as gzip-compressed JSON under
+`/config/FLIGHT_RECORDER_DIR`.
+
+Pure data, no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Tuple
+
+DUMP_FORMAT = 1
+
+REPORT_COLUMNS = (
+    "ts", "state", "flow_lpm", "device_status", "session_liters",
+    "session_active", "shutoff_in_progress", "software_overshoot_fired",
+)
+
+FLAG_SESSION_ACTIVE = 1
+FLAG_SHUTOFF_IN_PROGRESS = 2
+FLAG_OVERSHOOT_FIRED = 4
+
+# Device status strings → byte codes, shared by every recorder. A new
+# status string is interned once; after that recording is a dict lookup.
+_STATUS_OTHER = 255
+_STATUS_CODES: Dict[str, int] = {"normal_state": 0}
+_STATUS_NAMES: List[str] = ["normal_state"]
+
+
+def status_code(status: str) -> int:
+    code = _STATUS_CODES.get(status)
+    if code is None:
+        if len(_STATUS_NAMES) >= _STATUS_OTHER:
+            return _STATUS_OTHER
+        code = _STATUS_CODES[status] = len(_STATUS_NAMES)
+        _STATUS_NAMES.append(status)
+    return code
+
+
+def _status_name(code: int) -> str:
+    return _STATUS_NAMES[code] if code < len(_STATUS_NAMES) else "other"
+
+
+class FlightRecorder:
+    """Fixed-size ring of the last `capacity` decoded reports of one valve."""
+
+    __slots__ = ("capacity", "_ts", "_flow", "_liters", "_on", "_status",
+                 "_flags", "_head", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = int(capacity)
+        self._ts = array("d", bytes(8 * self.capacity))
+        self._flow = array("f", bytes(4 * self.capacity))
+        self._liters = array("f", bytes(4 * self.capacity))
+        self._on = array("B", bytes(self.capacity))
+        self._status = array("B", bytes(self.capacity))
+        self._flags = array("B", bytes(self.capacity))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(
+        self, ts: float, on: bool, flow: float, status: int, liters: float,
+        flags: int,
+    ) -> None:
+        i = self._head
+        self._ts[i] = ts
+        self._on[i] = on
+        self._flow[i] = flow
+        self._status[i] = status
+        self._liters[i] = liters
+        self._flags[i] = flags
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def snapshot(self) -> Tuple[array, ...]:
+        """Copies of the columns (ts, on, flow, status, liters, flags),
+        oldest first."""
+        cols = (self._ts, self._on, self._flow, self._status, self._liters,
+                self._flags)
+        if self._count < self.capacity:
+            return tuple(c[: self._count] for c in cols)
+        split = self._head
+        return tuple(c[split:] + c[:split] for c in cols)
+
+
+def report_rows(snapshot: Tuple[array, ...], clock_offset: float) -> List[List[Any]]:
+    """Snapshot → rows in REPORT_COLUMNS order.
+
+    `clock_offset` turns the recorded monotonic times into epoch seconds
+    (`time.time() - time.monotonic()` at snapshot time).
+    """
+    ts, on, flow, status, liters, flags = snapshot
+    return [
+        [
+            round(ts[i] + clock_offset, 3),
+            "ON" if on[i] else "OFF",
+            round(flow[i], 3),
+            _status_name(status[i]),
+            round(liters[i], 3),
+            bool(flags[i] & FLAG_SESSION_ACTIVE),
+            bool(flags[i] & FLAG_SHUTOFF_IN_PROGRESS),
+            bool(flags[i] & FLAG_OVERSHOOT_FIRED),
+        ]
+        for i in range(len(ts))
+    ]
+
+
+def write_dump(directory: Path, stem: str, payload: Mapping[str, Any], keep: int) -> Path:
+    """Write `payload` as `<stem>.json.gz` in `directory`, keeping the
+    newest `keep` dumps. Returns the path written.
+
+    Blocking file I/O — run it in the executor.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{stem}.json.gz"
+    n = 1
+    while path.exists():
+        path = directory / f"{stem}-{n}.json.gz"
+        n += 1
+    body = json.dumps(
+        {"format": DUMP_FORMAT, "report_columns": REPORT_COLUMNS, **payload},
+        separators=(",", ":"), default=str,
+    ).encode()
+    with gzip.open(path, "wb", compresslevel=6) as fh:
+        fh.write(body)
+    for old in sorted(directory.glob("panic-*.json.gz"), key=lambda p: p.stat().st_mtime)[:-keep]:
+        old.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,161 @@
+"""Bulk session history import.
+
+v4.2 — loads completed sessions from a CSV or NDJSON file under
+`/config` (for example one written by the session export view, or
+converted from another controller). Accepted columns / keys:
+
+    valve (or valve_topic)       required
+    started_at, ended_at         required, ISO 8601; naive = UTC
+    volume_liters                required
+    duration_minutes             default: ended_at - started_at
+    name (or valve_name)         default: the valve topic
+    session_id                   default: "import:<valve>:<started_at>"
+    avg_flow_lpm (avg_flow_rate) default: liters / minutes
+    trigger_type                 default: "import"
+    target_liters, target_minutes, completed_successfully
+
+The default `session_id` is deterministic, so importing the same file
+twice does not duplicate sessions. Rows are parsed lazily — this module
+yields normalized tuples one at a time and never holds the file in
+memory; `IrrigationDatabase.import_sessions` batches them.
+
+Pure data, no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Order of the tuples yielded by `iter_import_rows` (= the `sessions`
+# columns written by `IrrigationDatabase.import_sessions`).
+IMPORT_COLUMNS = (
+    "session_id", "valve_topic", "valve_name", "started_at", "ended_at",
+    "duration_minutes", "volume_liters", "avg_flow_rate", "trigger_type",
+    "target_liters", "target_minutes", "completed_successfully",
+)
+
+_MAX_ERRORS = 20
+_TRUE = {"1", "true", "yes", "y", "on"}
+
+
+@dataclass
+class ImportStats:
+    """Counters reported by the import service."""
+    path: str
+    format: str
+    rows_read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < _MAX_ERRORS:
+            self.errors.append(f"row {line}: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def detect_format(path: Path, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl", ".json") else "csv"
+
+
+def _first(rec: Mapping[str, Any], *keys: str) -> Any:
+    for k in keys:
+        value = rec.get(k)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _timestamp(value: Any, key: str) -> datetime:
+    if value is None:
+        raise ValueError(f"missing {key}")
+    try:
+        ts = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"bad {key} {value!r}") from None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def _number(value: Any, key: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"bad {key} {value!r}") from None
+
+
+def normalize(rec: Mapping[str, Any]) -> Tuple:
+    """One input record → a tuple in IMPORT_COLUMNS order. Raises ValueError."""
+    valve = _first(rec, "valve", "valve_topic")
+    if valve is None:
+        raise ValueError("missing valve")
+    valve = str(valve).strip()
+    started = _timestamp(_first(rec, "started_at"), "started_at")
+    ended = _timestamp(_first(rec, "ended_at"), "ended_at")
+    if ended < started:
+        raise ValueError("ended_at before started_at")
+    liters = _number(_first(rec, "volume_liters"), "volume_liters")
+    if liters is None or liters < 0:
+        raise ValueError("missing or negative volume_liters")
+    minutes = _number(_first(rec, "duration_minutes"), "duration_minutes")
+    if minutes is None:
+        minutes = (ended - started).total_seconds() / 60.0
+    flow = _number(_first(rec, "avg_flow_lpm", "avg_flow_rate"), "avg_flow_lpm")
+    if flow is None and minutes > 0:
+        flow = liters / minutes
+    success = _first(rec, "completed_successfully")
+    started_iso = started.isoformat()
+    return (
+        str(_first(rec, "session_id") or f"import:{valve}:{started_iso}"),
+        valve,
+        str(_first(rec, "name", "valve_name") or valve),
+        started_iso,
+        ended.isoformat(),
+        minutes,
+        liters,
+        flow,
+        str(_first(rec, "trigger_type") or "import"),
+        _number(_first(rec, "target_liters"), "target_liters"),
+        _number(_first(rec, "target_minutes"), "target_minutes"),
+        1 if success is None or success is True or str(success).strip().lower() in _TRUE else 0,
+    )
+
+
+def iter_import_rows(path: Path, fmt: str, stats: ImportStats) -> Iterator[Tuple]:
+    """Yield normalized rows from `path`; bad rows are counted and skipped.
+
+    Blocking file I/O — run it in the executor.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            records: Iterator[Any] = csv.DictReader(fh)
+        else:
+            records = (line for line in fh if line.strip())
+        for line, rec in enumerate(records, start=1):
+            stats.rows_read += 1
+            try:
+                if fmt != "csv":
+                    rec = json.loads(rec)
+                    if not isinstance(rec, dict):
+                        raise ValueError("not a JSON object")
+                yield normalize(rec)
+            except ValueError as e:
+                stats.reject(line, str(e))
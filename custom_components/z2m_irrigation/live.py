@@ -0,0 +1,105 @@
+"""Compact live state for the `z2m_irrigation/subscribe` websocket.
+
+v4.2 — the dashboard cards used to rebuild live state by scanning
+`hass.states` on every `set hass`, i.e. on every state change anywhere
+in Home Assistant. The subscription instead pushes this module's
+compact model, and after the first message only what changed:
+
+    {
+      "valves": {topic: {"name", "on", "flow", "liters",
+                         "remaining_liters", "remaining_s",
+                         "queue_pos", "shutoff"}},
+      "queue":  [{"zone", "liters", "trigger"}, ...],
+      "panic":  {"active", "reason", "valves"},
+    }
+
+`diff` is per valve and per key: a valve entry in a delta carries only
+its changed keys, a removed valve is `None`; `queue` and `panic` are
+sent whole when they change. Values are rounded so sensor noise below
+display precision does not produce a message.
+
+Reads the manager's in-memory state only; no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional
+
+
+def valve_state(v: Any, queue_pos: Optional[int], now: float) -> Dict[str, Any]:
+    """Compact view of one `Valve` (remaining = same rules as the sensors)."""
+    remaining_l: Optional[float] = None
+    remaining_s: Optional[int] = None
+    if v.session_active:
+        if v.target_liters is not None:
+            remaining_l = round(max(0.0, float(v.target_liters) - v.session_liters), 1)
+            if v.flow_lpm > 0:
+                remaining_s = int(remaining_l / v.flow_lpm * 60.0)
+        elif v.session_end_ts is not None:
+            remaining_s = int(max(0.0, v.session_end_ts - now))
+            if v.flow_lpm > 0:
+                remaining_l = round(remaining_s / 60.0 * v.flow_lpm, 1)
+    return {
+        "name": v.name,
+        "on": v.state == "ON",
+        "flow": round(float(v.flow_lpm), 2),
+        "liters": round(float(v.session_liters), 2) if v.session_active else None,
+        "remaining_liters": remaining_l,
+        "remaining_s": remaining_s,
+        "queue_pos": queue_pos,
+        "shutoff": bool(v.shutoff_in_progress),
+    }
+
+
+def live_state(mgr: Any) -> Dict[str, Any]:
+    """Snapshot the manager's live state in the compact shape."""
+    queue: List[Dict[str, Any]] = (
+        [
+            {"zone": it["zone"], "liters": it["liters"], "trigger": it["trigger"]}
+            for it in mgr.schedule_engine.queue_snapshot()
+        ]
+        if mgr.schedule_engine is not None else []
+    )
+    positions: Dict[str, int] = {}
+    for i, it in enumerate(queue, start=1):
+        positions.setdefault(it["zone"], i)
+    now = time.monotonic()
+    return {
+        "valves": {
+            topic: valve_state(v, positions.get(topic), now)
+            for topic, v in mgr.valves.items()
+        },
+        "queue": queue,
+        "panic": {
+            "active": mgr.panic.active,
+            "reason": mgr.panic.reason or None,
+            "valves": list(mgr.panic.affected_valves),
+        },
+    }
+
+
+def diff(prev: Optional[Dict[str, Any]], cur: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed from `prev` to `cur` (everything when `prev` is None)."""
+    if prev is None:
+        return cur
+    out: Dict[str, Any] = {}
+    valves: Dict[str, Any] = {}
+    old_valves = prev.get("valves", {})
+    for topic, state in cur["valves"].items():
+        old = old_valves.get(topic)
+        if old is None:
+            valves[topic] = state
+            continue
+        changed = {k: val for k, val in state.items() if old.get(k) != val}
+        if changed:
+            valves[topic] = changed
+    for topic in old_valves:
+        if topic not in cur["valves"]:
+            valves[topic] = None
+    if valves:
+        out["valves"] = valves
+    for key in ("queue", "panic"):
+        if prev.get(key) != cur[key]:
+            out[key] = cur[key]
+    return out
@@ -3,15 +3,20 @@ from __future__ import annotations
 import json
 import logging
 import time
-from dataclasses import dataclass, field
-from typing import Callable, Dict, Optional, Iterable
+from collections import deque
+from dataclasses import dataclass, field, replace as dataclass_replace
+from typing import Any, Callable, Deque, Dict, List, Optional, Iterable
 
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import CoreState, HomeAssistant, callback
 from homeassistant.components import mqtt
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.helpers.event import async_call_later, async_track_time_interval
-from datetime import timedelta
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from datetime import date, timedelta
 
 from .const import (
     CONF_BASE_TOPIC,
@@ -44,12 +49,76 @@ from .const import (
 )
 from .database import IrrigationDatabase
 from .zone_store import ZoneStore
-from .calculator import CalculatorResult, WeatherInputs, compute as compute_calculator
+from .calculator import (
+    CalculatorResult,
+    WeatherInputs,
+    ZoneBatch,
+    compute as compute_calculator,
+    compute_batch,
+    quantize_inputs,
+    QUANT_MM,
+)
 from .weather import read_inputs as read_weather_inputs
 from .schedule_engine import ScheduleEngine
-from .aggregator import DailySummary, build_daily_summary
+from .aggregator import (
+    DailySummary,
+    build_daily_summary,
+    build_usage_series,
+    count_periods,
+)
+from .vpd_window import RollingVpdWindows
+from .water_balance import WaterBalance
+from .model import DashboardModel
+from .flowtrace import FlowTraceRecorder
+from .flightrecorder import (
+    FLAG_OVERSHOOT_FIRED,
+    FLAG_SESSION_ACTIVE,
+    FLAG_SHUTOFF_IN_PROGRESS,
+    FlightRecorder,
+    report_rows,
+    status_code,
+    write_dump,
+)
+from .downsample import DownsampleCache, downsample
+from .importer import IMPORT_FORMATS, ImportStats, detect_format, iter_import_rows
+from .planner import ForecastDay, WaterBudget, day_weather, parse_forecast, plan_week
 from .const import (
     SIG_GLOBAL_UPDATE,
+    SIG_SCHEDULE_EVENT,
+    SIG_PANIC_STATE,
+    HISTORY_RETENTION_DAYS,
+    VPD_ROLLING_WINDOWS_HOURS,
+    VPD_CALC_WINDOW_HOURS,
+    VPD_PERSIST_INTERVAL_MINUTES,
+    WEATHER_DEBOUNCE_SECONDS,
+    WEATHER_DELTA_VPD_KPA,
+    WEATHER_DELTA_RAIN_MM,
+    WEATHER_DELTA_FORECAST_MM,
+    WEATHER_DELTA_TEMP_C,
+    CALC_SAFETY_NET_MINUTES,
+    PLANNER_DAYS,
+    PLANNER_FORECAST_TTL_MINUTES,
+    USAGE_DEFAULT_PERIODS,
+    USAGE_MAX_PERIODS,
+    SESSIONS_CLEAR_BATCH,
+    IMPORT_BATCH_ROWS,
+    IMPORT_DEFER_INDEX_BYTES,
+    BACKUP_DIR,
+    BACKUP_KEEP,
+    BACKUP_PAGES_PER_STEP,
+    BACKUP_STEP_SLEEP_SECONDS,
+    MAINTENANCE_CHECK_MINUTES,
+    MAINTENANCE_INTERVAL_HOURS,
+    MAINTENANCE_VACUUM_PAGES,
+    MAINTENANCE_CONVERT_CLEAR_MINUTES,
+    FLOW_TRACE_MAX_SAMPLES,
+    FLIGHT_RECORDER_SAMPLES,
+    FLIGHT_RECORDER_DIR,
+    FLIGHT_RECORDER_KEEP,
+    SHUTOFF_HISTORY_MAX,
+    SERIES_CACHE_SIZE,
+    SERIES_DEFAULT_DAYS,
+    SERIES_MAX_DAYS,
     DEFAULT_GLOBAL_SKIP_RAIN_MM,
     DEFAULT_GLOBAL_SKIP_FORECAST_MM,
     DEFAULT_GLOBAL_MIN_RUN_LITERS,
@@ -145,6 +214,22 @@ class Valve:
     # Latest device status from `current_device_status` MQTT field.
     device_status: str = "normal_state"
 
+    # v4.2 — flow samples of the running session when the
+    # `record_flow_traces` option is on (see flowtrace.py). Allocated on
+    # the first traced session and reused after that.
+    flow_trace: Optional[FlowTraceRecorder] = None
+
+    # v4.2 — panic flight recorder (see flightrecorder.py): the last
+    # FLIGHT_RECORDER_SAMPLES decoded MQTT reports, and the last
+    # SHUTOFF_HISTORY_MAX shutoff chain events as
+    # (epoch ts, event, attempt, elapsed s, reason, published).
+    flight: FlightRecorder = field(
+        default_factory=lambda: FlightRecorder(FLIGHT_RECORDER_SAMPLES)
+    )
+    shutoff_history: Deque[tuple] = field(
+        default_factory=lambda: deque(maxlen=SHUTOFF_HISTORY_MAX)
+    )
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # v3.2 — System-level panic state (singleton on the manager, not per-valve)
@@ -190,6 +275,10 @@ class ValveManager:
         self.flow_scale = float(flow_scale or 1.0)
         self.valves: Dict[str, Valve] = {}
         self._unsubs: list[Callable[[], None]] = []
+        # v4.2 — timer / state / bus listeners owned by
+        # `_subscribe_listeners`, kept apart so a re-start (options
+        # update) replaces them instead of stacking a second set.
+        self._listener_unsubs: list[Callable[[], None]] = []
         self.db = IrrigationDatabase(hass)
 
         # v3.2 — System-level panic state. Single instance shared across all
@@ -218,15 +307,39 @@ class ValveManager:
         self.weather_rain_today_entity: Optional[str] = None
         self.weather_rain_forecast_24h_entity: Optional[str] = None
         self.weather_temp_entity: Optional[str] = None
+        # v4.2 — `weather.*` entity whose forecast feeds the planner.
+        self.weather_forecast_entity: Optional[str] = None
         self.global_skip_rain_threshold_mm: float = DEFAULT_GLOBAL_SKIP_RAIN_MM
         self.global_skip_forecast_threshold_mm: float = DEFAULT_GLOBAL_SKIP_FORECAST_MM
         self.global_min_run_liters: float = DEFAULT_GLOBAL_MIN_RUN_LITERS
+        # v4.2 — `record_flow_traces` option (see Valve.flow_trace).
+        self.record_flow_traces: bool = False
 
         # v4.0-alpha-1 — cached calculator result. Refreshed by
         # `recalculate_today()` on a 15-min interval and on demand. The
         # `today_calculation` global sensor reads from this cache.
         self.today_calculation: Optional[CalculatorResult] = None
-        self._today_recalc_unsub: Optional[Callable[[], None]] = None
+
+        # v4.2 — event-driven refresh: raw weather inputs of the last
+        # calculator run (for delta checks) and the pending debounce.
+        self._last_weather_inputs: Optional[WeatherInputs] = None
+        self._weather_debounce_unsub: Optional[Callable[[], None]] = None
+
+        # v4.2 — memo key of `today_calculation`: (ZoneStore config
+        # version, quantized weather inputs, global min-run). A repeat
+        # key means the existing result still holds.
+        self._calc_key: Optional[tuple] = None
+
+        # v4.2 — 7-day water budget (see planner.py). The parsed forecast
+        # is cached for PLANNER_FORECAST_TTL_MINUTES; `_forecast_stamp`
+        # bumps whenever a fetch returns different data, and the plan is
+        # rebuilt only when its memo key `_budget_key` changes.
+        self.water_budget: Optional[WaterBudget] = None
+        self._budget_key: Optional[tuple] = None
+        self._forecast: Dict[str, ForecastDay] = {}
+        self._forecast_fetched_at: Optional[float] = None
+        self._forecast_fetched_for: Optional[str] = None
+        self._forecast_stamp: int = 0
 
         # v4.0-alpha-2 — schedule engine. Owned by the manager so it
         # shares the lifecycle (start/stop) and can call back into
@@ -258,13 +371,35 @@ class ValveManager:
         # rather than a single-point snapshot.
         #
         # Samples are appended on every `_periodic_recalculate_today`
-        # tick (every 15 min). Each entry is a `(monotonic_ts, vpd_kpa)`
-        # tuple. Old entries are pruned at append time. Cold start has
-        # no history → average == snapshot until the buffer fills.
-        from collections import deque
-        self._vpd_samples: deque = deque()
-        # Maximum buffer age in seconds — 24 hours.
-        self._VPD_BUFFER_MAX_AGE_S = 24 * 3600
+        # tick (every 15 min). Cold start has no history → average ==
+        # snapshot until the buffer fills.
+        #
+        # v4.2 — time-weighted, O(1) per sample, several windows at once
+        # (VPD_ROLLING_WINDOWS_HOURS). Timestamps are monotonic seconds.
+        self._vpd_windows = RollingVpdWindows(
+            h * 3600 for h in VPD_ROLLING_WINDOWS_HOURS
+        )
+        self._unsub_vpd_stop: Optional[Callable[[], None]] = None
+
+        # v4.2 — per-zone soil water balance (see water_balance.py).
+        # Rolled forward a day at a time by `recalculate_today`; its
+        # carried deficit feeds the smart calculator.
+        self.water_balance = WaterBalance()
+
+        # v4.2 — `z2m_irrigation/snapshot` payload builder (see model.py).
+        self._dashboard_model = DashboardModel()
+
+        # v4.2 — storage maintenance (see `_periodic_db_maintenance`).
+        # `db_stats` backs the diagnostic storage sensors.
+        self.db_stats: Dict[str, Any] = {}
+        self.last_maintenance: Optional[Dict[str, Any]] = None
+        self._last_maintenance_ts: Optional[float] = None
+
+        # v4.2 — downsampled series for `z2m_irrigation/series`. Daily
+        # usage entries are keyed by `_usage_version`, bumped whenever
+        # session history changes, so stale reductions are never served.
+        self._series_cache = DownsampleCache(SERIES_CACHE_SIZE)
+        self._usage_version = 0
 
     def _schedule_task(self, coro):
         """Schedule an async task from a callback (thread-safe)."""
@@ -285,6 +420,22 @@ class ValveManager:
         # mistakenly merged with a stale orphan record.
         await self._recover_orphaned_sessions()
 
+        # v4.2 — one-shot import of the pre-v4.2 JSON schedule timeline
+        # into the `irrigation_events` table.
+        if self.zone_store is not None:
+            try:
+                legacy = self.zone_store.legacy_schedule_events()
+                if legacy:
+                    imported = await self.db.import_schedule_events(legacy)
+                    if imported:
+                        self.zone_store.drop_legacy_schedule_events()
+                    _LOGGER.info(
+                        "📜 Imported %d legacy schedule event(s) into SQLite",
+                        imported,
+                    )
+            except Exception as e:
+                _LOGGER.warning("Failed to import legacy schedule events: %s", e)
+
         # Subscriptions for device list (two possible topics)
         self._unsubs.append(
             await mqtt.async_subscribe(self.hass, f"{self.base}/bridge/devices", self._on_devices)
@@ -296,44 +447,6 @@ class ValveManager:
         for topic in self.manual_topics:
             self._ensure_valve(topic, topic)
 
-        # Start periodic refresh of 24h/7d sensors every 15 minutes
-        self._unsubs.append(
-            async_track_time_interval(
-                self.hass,
-                self._periodic_refresh_time_metrics,
-                timedelta(minutes=15)
-            )
-        )
-        _LOGGER.debug("Started periodic 24h/7d sensor refresh (every 15 minutes)")
-
-        # v3.1 — Start the safety guardrail loop. Independent of MQTT, this
-        # tick periodically inspects every active session and forces OFF if
-        # any of the five guardrails detect a runaway condition.
-        self._unsubs.append(
-            async_track_time_interval(
-                self.hass,
-                self._guardrail_tick,
-                timedelta(seconds=GUARDRAIL_CHECK_INTERVAL_SECONDS),
-            )
-        )
-        _LOGGER.info(
-            "🛡️  Safety guardrail loop started (every %ds)",
-            GUARDRAIL_CHECK_INTERVAL_SECONDS,
-        )
-
-        # v4.0-alpha-1 — periodic calculator refresh. Runs every 15 min so
-        # the today_calculation sensor stays fresh as weather changes
-        # throughout the day. Initial run is deferred until valves have
-        # been discovered (we trigger it from `_ensure_valve` once the
-        # first valve appears, and again from any zone-config change).
-        self._today_recalc_unsub = async_track_time_interval(
-            self.hass,
-            self._periodic_recalculate_today,
-            timedelta(minutes=15),
-        )
-        self._unsubs.append(self._today_recalc_unsub)
-        _LOGGER.info("📊 Calculator refresh loop started (every 15 min)")
-
         # v4.0-alpha-2 — start the schedule engine. The engine subscribes
         # to its own per-minute tick and runs an initial catch-up after a
         # short delay (so valves are discovered first).
@@ -347,7 +460,7 @@ class ValveManager:
         # the first valve is discovered, whichever fires first).
         if self.zone_store is not None:
             try:
-                snap = self.zone_store.get_daily_summary()
+                snap = await self.zone_store.async_get_daily_summary()
                 if snap is not None:
                     self.daily_summary = DailySummary.from_dict(snap)
                     _LOGGER.info(
@@ -358,13 +471,34 @@ class ValveManager:
             except Exception as e:
                 _LOGGER.warning("Failed to hydrate daily summary: %s", e)
 
+        # v4.2 — hydrate the soil water balance.
+        if self.zone_store is not None:
+            try:
+                if self.water_balance.load_snapshot(
+                    await self.zone_store.async_get_water_balance()
+                ):
+                    _LOGGER.info(
+                        "💧 Water balance hydrated: %d zone(s), open day %s",
+                        len(self.water_balance.depletion), self.water_balance.day,
+                    )
+            except Exception as e:
+                _LOGGER.warning("Failed to hydrate water balance: %s", e)
+
         # v4.0-rc-3 (F-G persist) — hydrate VPD 24h buffer from store
         # so the rolling average survives HA restart.
         try:
-            self._hydrate_vpd_buffer()
+            await self._hydrate_vpd_buffer()
         except Exception as e:
             _LOGGER.warning("Failed to hydrate VPD buffer: %s", e)
 
+        # v4.2 — periodic loops and entity/bus listeners.
+        self._subscribe_listeners()
+
+        try:
+            self.db_stats = await self.db.get_storage_stats()
+        except Exception as e:
+            _LOGGER.warning("Failed to read database storage stats: %s", e)
+
         # Ask Z2M to send the device list (ignore if MQTT not ready)
         try:
             await mqtt.async_publish(self.hass, f"{self.base}/bridge/config/devices/get", "")
@@ -378,6 +512,112 @@ class ValveManager:
             self.schedule_engine.stop()
         while self._unsubs:
             self._unsubs.pop()()
+        self._unsubscribe_listeners()
+        if self._weather_debounce_unsub is not None:
+            self._weather_debounce_unsub()
+            self._weather_debounce_unsub = None
+        self._persist_vpd_buffer_now()
+
+    def _subscribe_listeners(self) -> None:
+        """(Re)register the periodic loops and the weather / HA-stop
+        listeners. Cancels any set from an earlier `async_start` first,
+        so weather entities removed in the options stop being tracked."""
+        self._unsubscribe_listeners()
+
+        # Start periodic refresh of 24h/7d sensors every 15 minutes
+        self._listener_unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                self._periodic_refresh_time_metrics,
+                timedelta(minutes=15)
+            )
+        )
+        _LOGGER.debug("Started periodic 24h/7d sensor refresh (every 15 minutes)")
+
+        # v3.1 — Start the safety guardrail loop. Independent of MQTT, this
+        # tick periodically inspects every active session and forces OFF if
+        # any of the five guardrails detect a runaway condition.
+        self._listener_unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                self._guardrail_tick,
+                timedelta(seconds=GUARDRAIL_CHECK_INTERVAL_SECONDS),
+            )
+        )
+        _LOGGER.info(
+            "🛡️  Safety guardrail loop started (every %ds)",
+            GUARDRAIL_CHECK_INTERVAL_SECONDS,
+        )
+
+        # v4.0-alpha-1 — periodic calculator refresh. Initial run is
+        # deferred until valves have been discovered (we trigger it from
+        # `_ensure_valve` once the first valve appears, and again from
+        # any zone-config change).
+        #
+        # v4.2 — weather entity state changes now drive the refresh
+        # (`_on_weather_state`); this timer is only a slow safety net.
+        # The daily summary rides the 15-min metrics loop instead.
+        self._listener_unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                self._periodic_recalculate_today,
+                timedelta(minutes=CALC_SAFETY_NET_MINUTES),
+            )
+        )
+        weather_entities = [
+            e for e in (
+                self.weather_vpd_entity,
+                self.weather_rain_today_entity,
+                self.weather_rain_forecast_24h_entity,
+                self.weather_temp_entity,
+            ) if e
+        ]
+        if weather_entities:
+            self._listener_unsubs.append(
+                async_track_state_change_event(
+                    self.hass, weather_entities, self._on_weather_state,
+                )
+            )
+        _LOGGER.info(
+            "📊 Calculator refresh: %d weather entit(y/ies) tracked, "
+            "safety net every %d min",
+            len(weather_entities), CALC_SAFETY_NET_MINUTES,
+        )
+
+        # v4.2 — persist the VPD snapshot on a coarse interval and once
+        # more on HA shutdown (the cache Store flushes it in final write).
+        self._listener_unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                self._periodic_persist_vpd_buffer,
+                timedelta(minutes=VPD_PERSIST_INTERVAL_MINUTES),
+            )
+        )
+
+        @callback
+        def _on_ha_stop(_event) -> None:
+            self._unsub_vpd_stop = None
+            self._persist_vpd_buffer_now()
+
+        self._unsub_vpd_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, _on_ha_stop,
+        )
+
+        # v4.2 — idle-time database maintenance + storage stats refresh.
+        self._listener_unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                self._periodic_db_maintenance,
+                timedelta(minutes=MAINTENANCE_CHECK_MINUTES),
+            )
+        )
+
+    def _unsubscribe_listeners(self) -> None:
+        while self._listener_unsubs:
+            self._listener_unsubs.pop()()
+        if self._unsub_vpd_stop is not None:
+            self._unsub_vpd_stop()
+            self._unsub_vpd_stop = None
 
     async def _periodic_refresh_time_metrics(self, now=None) -> None:
         """Periodically refresh 24h/7d sensors and last session start (every 15 minutes)"""
@@ -414,6 +654,19 @@ class ValveManager:
             except Exception as e:
                 _LOGGER.error("❌ Error refreshing time metrics for %s: %s", topic, e, exc_info=True)
 
+        # v4.2 — daily aggregation moved here from the calculator loop,
+        # which now only runs as a slow safety net.
+        try:
+            await self.refresh_daily_summary()
+        except Exception as e:
+            _LOGGER.error("Periodic daily summary refresh failed: %s", e, exc_info=True)
+
+        # v4.2 — 7-day water budget (memoized; cheap when nothing moved).
+        try:
+            await self.refresh_water_budget()
+        except Exception as e:
+            _LOGGER.error("Periodic water budget refresh failed: %s", e, exc_info=True)
+
     # ---------- internal helpers ----------
     def _dispatch_signal(self, signal: str, *args) -> None:
         """Always fire dispatcher on HA loop thread (safe from any callback thread)."""
@@ -529,6 +782,49 @@ class ValveManager:
         """Fire the global update signal. Safe from any thread."""
         self._dispatch_signal(SIG_GLOBAL_UPDATE)
 
+    async def record_schedule_event(
+        self,
+        *,
+        kind: str,                              # "fired" | "skipped"
+        schedule_id: Optional[str],
+        schedule_name: Optional[str],
+        outcome: str,                           # OUTCOME_RAN, OUTCOME_SKIPPED_*, ...
+        mode: Optional[str] = None,
+        trigger: Optional[str] = None,          # "scheduled"|"catchup"|"manual"
+        zones: Optional[List[str]] = None,
+        total_liters: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """v4.2 — append a schedule event to the SQLite timeline.
+
+        The dashboard's Insight tab reads this timeline (via the
+        schedule history sensor) to render "what happened". Rows older
+        than HISTORY_RETENTION_DAYS are pruned in the same transaction.
+        """
+        from datetime import datetime as _dt, timezone as _tz
+        record: Dict[str, Any] = {
+            "at": _dt.now(_tz.utc).isoformat(),
+            "kind": kind,
+            "schedule_id": schedule_id,
+            "schedule_name": schedule_name,
+            "outcome": outcome,
+            "mode": mode,
+            "trigger": trigger,
+            "zones": list(zones or []),
+            "total_liters": (
+                round(float(total_liters), 2)
+                if total_liters is not None else None
+            ),
+        }
+        record["id"] = await self.db.record_schedule_event(
+            record, HISTORY_RETENTION_DAYS,
+        )
+        _LOGGER.debug(
+            "📜 Recorded schedule event kind=%s outcome=%s schedule=%s",
+            kind, outcome, schedule_id,
+        )
+        self._dispatch_signal(SIG_SCHEDULE_EVENT)
+        return record
+
     def set_master_enable(self, enabled: bool) -> None:
         """Toggle the global master-enable pause flag.
 
@@ -553,122 +849,152 @@ class ValveManager:
     # ─────────────────────────────────────────────────────────────────────
 
     def _sample_vpd_local(self, value: Optional[float]) -> None:
-        """Append a VPD sample to the in-memory rolling 24h buffer + prune.
+        """Append a VPD sample to the in-memory rolling windows.
 
-        Does NOT persist — call `_persist_vpd_buffer` after this to
-        write to the ZoneStore (must be called from an async context).
+        Does NOT persist — the snapshot is written on the coarse
+        `_periodic_persist_vpd_buffer` interval and on shutdown.
         """
         if value is None:
             return
-        now = time.monotonic()
-        self._vpd_samples.append((now, float(value)))
-        cutoff = now - self._VPD_BUFFER_MAX_AGE_S
-        while self._vpd_samples and self._vpd_samples[0][0] < cutoff:
-            self._vpd_samples.popleft()
-
-    async def _persist_vpd_buffer(self) -> None:
-        """Write the in-memory VPD buffer to the ZoneStore for restart survival."""
-        if self.zone_store is None or not self._vpd_samples:
+        self._vpd_windows.add(time.monotonic(), float(value))
+
+    @callback
+    def _persist_vpd_buffer_now(self) -> None:
+        """Hand the compact VPD snapshot to the ZoneStore cache document.
+
+        The cache document coalesces the write; on HA shutdown the Store's
+        final-write hook flushes it.
+        """
+        if self.zone_store is None or not len(self._vpd_windows):
             return
         try:
-            from datetime import datetime as _dt, timezone as _tz
-            wall_now = _dt.now(_tz.utc).timestamp()
-            mono_now = time.monotonic()
-            entries = []
-            for mono_ts, vpd in self._vpd_samples:
-                wall_ts = wall_now - (mono_now - mono_ts)
-                entries.append({
-                    "at": _dt.fromtimestamp(wall_ts, _tz.utc).isoformat(),
-                    "vpd_kpa": round(vpd, 6),
-                })
-            await self.zone_store.set_vpd_buffer(entries)
+            snap = self._vpd_windows.to_snapshot(time.monotonic(), time.time())
+            self.hass.async_create_task(self.zone_store.set_vpd_buffer(snap))
         except Exception as e:
             _LOGGER.warning("Failed to persist VPD buffer: %s", e)
 
-    def _hydrate_vpd_buffer(self) -> None:
-        """Load the persisted VPD buffer from the ZoneStore on startup.
+    async def _periodic_persist_vpd_buffer(self, now=None) -> None:
+        self._persist_vpd_buffer_now()
+
+    def _irrigation_idle(self) -> bool:
+        """No valve running or being shut off, nothing queued."""
+        if any(v.session_active or v.shutoff_in_progress for v in self.valves.values()):
+            return False
+        if self.schedule_engine is not None and self.schedule_engine.queue_snapshot():
+            return False
+        return not self.panic.active
+
+    def _schedule_due_within(self, minutes: float) -> bool:
+        """Whether the next enabled schedule fires within `minutes`."""
+        if self.schedule_engine is None:
+            return False
+        from datetime import datetime as _dt
+        from homeassistant.util import dt as dt_util
+        nxt = self.schedule_engine.compute_next_run_summary().get("next_run_at")
+        if not nxt:
+            return False
+        return _dt.fromisoformat(nxt) - dt_util.now() <= timedelta(minutes=minutes)
+
+    async def _periodic_db_maintenance(self, now=None) -> None:
+        """v4.2 — refresh storage stats; run maintenance when due and idle.
+
+        Maintenance takes the database lock step by step, so it is only
+        started while nothing is irrigating — session writes and the
+        MQTT path never wait behind a checkpoint or vacuum. The unbounded
+        one-time auto_vacuum conversion is further held back while a
+        schedule is due within MAINTENANCE_CONVERT_CLEAR_MINUTES.
+        """
+        try:
+            due = (
+                self._last_maintenance_ts is None
+                or time.monotonic() - self._last_maintenance_ts
+                >= MAINTENANCE_INTERVAL_HOURS * 3600
+            )
+            if due and self._irrigation_idle():
+                self.last_maintenance = await self.db.run_maintenance(
+                    MAINTENANCE_VACUUM_PAGES,
+                    convert=not self._schedule_due_within(
+                        MAINTENANCE_CONVERT_CLEAR_MINUTES,
+                    ),
+                )
+                self._last_maintenance_ts = time.monotonic()
+                self.db_stats = self.last_maintenance.get("stats", {})
+            else:
+                self.db_stats = await self.db.get_storage_stats()
+        except Exception as e:
+            _LOGGER.warning("Database maintenance failed: %s", e)
+            return
+        self._notify_global()
+
+    async def _hydrate_vpd_buffer(self) -> None:
+        """Load the persisted VPD snapshot from the ZoneStore on startup.
 
-        Converts wall-clock ISO timestamps back to monotonic offsets
-        from now. Entries older than 24h are pruned at load time.
+        Wall-clock timestamps are mapped back to monotonic offsets from
+        now; readings older than the widest window are dropped. Accepts
+        the pre-v4.2 ISO-stamped list as well.
         """
         if self.zone_store is None:
             _LOGGER.info("📊 VPD hydrate: no zone_store, skipping")
             return
-        raw = self.zone_store.get_vpd_buffer()
+        raw = await self.zone_store.async_get_vpd_buffer()
         if not raw:
             _LOGGER.info("📊 VPD hydrate: no buffer in store (raw=%s)", type(raw))
             return
-        _LOGGER.info("📊 VPD hydrate: found %d entries in store, processing...", len(raw))
-        from datetime import datetime as _dt, timezone as _tz, timedelta as _td
-        now_wall = _dt.now(_tz.utc)
-        now_mono = time.monotonic()
-        cutoff_wall = now_wall - _td(seconds=self._VPD_BUFFER_MAX_AGE_S)
-        loaded = 0
-        pruned = 0
-        errors = 0
-        for entry in raw:
-            try:
-                at_str = entry.get("at", "")
-                vpd = float(entry.get("vpd_kpa", 0))
-                at_dt = _dt.fromisoformat(at_str.replace("Z", "+00:00"))
-                if at_dt < cutoff_wall:
-                    pruned += 1
-                    continue  # too old
-                # Convert wall-clock → monotonic offset from now
-                delta_s = (now_wall - at_dt).total_seconds()
-                mono_ts = now_mono - delta_s
-                self._vpd_samples.append((mono_ts, vpd))
-                loaded += 1
-            except Exception as e:
-                errors += 1
-                _LOGGER.warning("📊 VPD hydrate: error parsing entry %s: %s", entry, e)
-                continue
+        loaded = self._vpd_windows.load_snapshot(
+            raw, time.monotonic(), time.time(),
+        )
         _LOGGER.info(
-            "📊 VPD buffer hydrated: %d loaded, %d pruned (>24h), %d errors, buffer now has %d samples",
-            loaded, pruned, errors, len(self._vpd_samples),
+            "📊 VPD buffer hydrated: %d sample(s) within %sh",
+            loaded, VPD_ROLLING_WINDOWS_HOURS[-1],
         )
 
+    def vpd_average(self, hours: float) -> Optional[float]:
+        """Time-weighted VPD mean over the trailing `hours` window.
+
+        `hours` must be one of VPD_ROLLING_WINDOWS_HOURS. Returns None
+        until the first sample lands.
+        """
+        return self._vpd_windows.mean(hours * 3600, time.monotonic())
+
     @property
     def vpd_24h_average(self) -> Optional[float]:
-        """Mean of the rolling 24h VPD buffer, or None if empty.
+        """Time-weighted mean of the rolling 24h VPD window, or None if empty.
 
         Cold start has no history so returns None until the first
         sample lands. The calculator falls back to the snapshot in
         that case.
         """
-        if not self._vpd_samples:
-            return None
-        total = sum(v for _ts, v in self._vpd_samples)
-        return total / len(self._vpd_samples)
+        return self.vpd_average(VPD_CALC_WINDOW_HOURS)
 
     @property
     def vpd_24h_sample_count(self) -> int:
-        return len(self._vpd_samples)
+        return self._vpd_windows.count(VPD_CALC_WINDOW_HOURS * 3600, time.monotonic())
 
-    async def recalculate_today(self) -> Optional[CalculatorResult]:
+    async def recalculate_today(
+        self, weather: Optional[WeatherInputs] = None,
+    ) -> Optional[CalculatorResult]:
         """Run the calculator over current zone config + weather and cache.
 
         Safe to call any time. Returns the new CalculatorResult, or None
         if the zone store isn't loaded yet (early in startup). Fires
         SIG_GLOBAL_UPDATE on success so the today_calculation sensor and
         any other listeners refresh.
+
+        `weather` lets the event-driven path pass the inputs it already
+        read; otherwise they are read from the configured entities.
         """
         if self.zone_store is None:
             return None
 
-        zones = self.zone_store.all_zones()
-        if not zones:
+        snap = self.zone_store.snapshot()
+        if not snap.zones:
             # No valves discovered yet — leave the cache alone (None) so
             # the sensor reports unknown rather than "0 zones".
             return None
 
-        weather = read_weather_inputs(
-            self.hass,
-            vpd_entity=self.weather_vpd_entity,
-            rain_today_entity=self.weather_rain_today_entity,
-            rain_forecast_24h_entity=self.weather_rain_forecast_24h_entity,
-            temp_entity=self.weather_temp_entity,
-        )
+        if weather is None:
+            weather = self._read_weather()
+        self._last_weather_inputs = weather
 
         # v4.0-rc-3 (F-G) — VPD 24h rolling average
         #
@@ -682,8 +1008,6 @@ class ValveManager:
         #    dashboard so the user can see both numbers.
         snapshot_vpd = weather.vpd_kpa
         self._sample_vpd_local(snapshot_vpd)
-        # Persist the buffer inline (we're already in an async context).
-        await self._persist_vpd_buffer()
         avg_vpd = self.vpd_24h_average
         if avg_vpd is not None:
             weather = WeatherInputs(
@@ -693,23 +1017,49 @@ class ValveManager:
                 temp_c=weather.temp_c,
             )
 
+        # v4.2 — soil water balance: close any finished days, note
+        # today's rain, and draw the carried deficit (less what was
+        # already delivered today) into the smart need.
+        carry = self._update_water_balance(snap.zones, weather, avg_vpd)
+
+        # v4.2 — memo hit: same zone config, same (quantized) weather,
+        # same carry-over, same min-run → the cached result is still
+        # exact. Only the VPD diagnostics are refreshed; no rebuild and
+        # no SIG_GLOBAL_UPDATE fan-out. Keyed on `zones_version`, so
+        # schedule edits and run stamps don't invalidate it.
+        key = (
+            snap.zones_version,
+            quantize_inputs(weather),
+            tuple(sorted((z, round(mm / QUANT_MM)) for z, mm in carry.items())),
+            self.global_min_run_liters,
+        )
+        # VPD-source diagnostic metadata for the cached result so the
+        # dashboard can show snapshot vs 24h-avg side by side. They
+        # don't affect the calculation, just visibility.
+        diagnostics = dict(
+            vpd_snapshot_kpa=snapshot_vpd,
+            vpd_24h_avg_kpa=avg_vpd,
+            vpd_sample_count=self.vpd_24h_sample_count,
+            vpd_window_avgs_kpa={
+                f"{h}h": self.vpd_average(h) for h in VPD_ROLLING_WINDOWS_HOURS
+            },
+        )
+        if key == self._calc_key and self.today_calculation is not None:
+            _LOGGER.debug("📊 Calculator inputs unchanged — reusing cached result")
+            self.today_calculation = dataclass_replace(
+                self.today_calculation, **diagnostics,
+            )
+            return self.today_calculation
+
         result = compute_calculator(
-            zones=zones,
+            zones=dict(snap.zones),
             weather=weather,
             global_min_run_liters=self.global_min_run_liters,
+            carryover_mm=carry,
         )
-
-        # Attach VPD-source diagnostic metadata to the cached result
-        # so the dashboard can show snapshot vs 24h-avg side by side.
-        # Stored as plain attributes on the result object — they don't
-        # affect the calculation, just visibility.
-        try:
-            result.vpd_snapshot_kpa = snapshot_vpd
-            result.vpd_24h_avg_kpa = avg_vpd
-            result.vpd_sample_count = self.vpd_24h_sample_count
-        except Exception:
-            pass
+        result = dataclass_replace(result, **diagnostics)
         self.today_calculation = result
+        self._calc_key = key
         _LOGGER.debug(
             "📊 Calculator refreshed: vpd=%s rain=%s fc24=%s → %.2f L "
             "across %d runnable zones",
@@ -719,19 +1069,301 @@ class ValveManager:
         self._notify_global()
         return result
 
+    def _update_water_balance(
+        self,
+        zones: Dict[str, Any],
+        weather: WeatherInputs,
+        avg_vpd: Optional[float],
+    ) -> Dict[str, float]:
+        """Roll the water balance to today and return today's carry-over."""
+        from homeassistant.util import dt as dt_util
+        today = dt_util.now().date()
+        wb = self.water_balance
+        closed = wb.roll(
+            today, zones,
+            avg_vpd if avg_vpd is not None else weather.effective_vpd,
+            self._delivered_on,
+        )
+        rained = wb.observe_rain(weather.rain_today_mm)
+        if closed:
+            _LOGGER.info(
+                "💧 Water balance closed %d day(s): %s", closed,
+                {z: round(mm, 1) for z, mm in wb.depletion.items()},
+            )
+        if (closed or rained) and self.zone_store is not None:
+            self.hass.async_create_task(
+                self.zone_store.set_water_balance(wb.to_snapshot())
+            )
+        return wb.carryover(zones, self._delivered_on(today))
+
+    def _delivered_on(self, day) -> Dict[str, float]:
+        """Per-zone liters delivered on a local date, from the daily summary."""
+        summary = self.daily_summary
+        if summary is None:
+            return {}
+        i = summary.index_of(day.isoformat())
+        if i is None:
+            return {}
+        return {zs.zone: zs.liters[i] for zs in summary.zones if i < len(zs.liters)}
+
+    async def async_simulate(
+        self,
+        scenarios: List[Dict[str, Any]],
+        zones: Optional[List[str]] = None,
+        global_min_run_liters: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """v4.2 — what-if calculator run over many weather scenarios.
+
+        Each scenario may set `vpd_kpa`, `rain_today_mm` and
+        `rain_forecast_24h_mm`. A key that is absent takes the value
+        `recalculate_today` would use (the 24h VPD average when there is
+        one, otherwise the sensor reading); an explicit `None` means
+        "sensor missing" (the calculator's neutral default). Every
+        scenario draws the same water-balance carry-over as today's
+        calculation, so an empty scenario reproduces it. `zones` limits
+        the zone set; the default is every configured zone. Nothing is
+        cached or published.
+        """
+        from homeassistant.util import dt as dt_util
+        all_zones = self.zone_store.all_zones() if self.zone_store is not None else {}
+        if zones:
+            all_zones = {n: c for n, c in all_zones.items() if n in set(zones)}
+        current = self._read_weather()
+        avg_vpd = self.vpd_24h_average
+        current_vpd = avg_vpd if avg_vpd is not None else current.vpd_kpa
+        inputs = [
+            WeatherInputs(
+                vpd_kpa=sc.get("vpd_kpa", current_vpd),
+                rain_today_mm=sc.get("rain_today_mm", current.rain_today_mm),
+                fc24_mm=sc.get("rain_forecast_24h_mm", current.fc24_mm),
+            )
+            for sc in scenarios
+        ]
+        min_run = (
+            self.global_min_run_liters
+            if global_min_run_liters is None else float(global_min_run_liters)
+        )
+        # Read-only: the balance is rolled by `recalculate_today`, not here.
+        carry = self.water_balance.carryover(
+            all_zones, self._delivered_on(dt_util.now().date()),
+        )
+        batch = ZoneBatch.from_zones(all_zones, min_run, carryover_mm=carry)
+        result = await self.hass.async_add_executor_job(compute_batch, batch, inputs)
+        return {
+            "backend": result.backend,
+            "zones": result.zones,
+            "scenarios": [
+                {
+                    "vpd_kpa": w.vpd_kpa,
+                    "rain_today_mm": w.rain_today_mm,
+                    "rain_forecast_24h_mm": w.fc24_mm,
+                    "dryness": round(result.dryness[i], 4),
+                    "total_liters": result.total_liters[i],
+                    "runnable_zones": result.runnable_zones[i],
+                    "liters": result.liters[i],
+                    "skipped": result.skipped[i],
+                }
+                for i, w in enumerate(result.scenarios)
+            ],
+        }
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — 7-day water budget planner
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def refresh_water_budget(self, force: bool = False) -> Optional[WaterBudget]:
+        """Rebuild the 7-day plan if any of its inputs changed.
+
+        Inputs: config version, forecast, local date, the schedules
+        already past today, live weather, master/skip-today gates and
+        thresholds. `force` re-fetches the forecast ignoring the TTL.
+        Fires SIG_GLOBAL_UPDATE when a new plan is built.
+        """
+        engine = self.schedule_engine
+        if self.zone_store is None or engine is None:
+            return None
+        await self._refresh_forecast(force=force)
+
+        snap = self.zone_store.snapshot()
+        now = engine._local_now()
+        today = now.date()
+        current = self._last_weather_inputs or self._read_weather()
+        fallback_vpd = self.vpd_24h_average
+        if fallback_vpd is None:
+            fallback_vpd = current.vpd_kpa
+        past_today = []
+        for sch in snap.schedules:
+            if not sch.enabled:
+                continue
+            at = engine._resolve_schedule_datetime(sch, today)
+            if at is not None and at <= now:
+                past_today.append(sch.id)
+        key = (
+            snap.version,
+            self._forecast_stamp,
+            today,
+            tuple(past_today),
+            quantize_inputs(current),
+            round(fallback_vpd, 2) if fallback_vpd is not None else None,
+            tuple(sorted(self.valves)),
+            self.master_enable,
+            engine.skip_today_active,
+            self.global_skip_rain_threshold_mm,
+            self.global_skip_forecast_threshold_mm,
+            self.global_min_run_liters,
+        )
+        if key == self._budget_key and self.water_budget is not None:
+            return self.water_budget
+
+        weather = day_weather(
+            self._forecast, today, PLANNER_DAYS,
+            current=current, fallback_vpd_kpa=fallback_vpd,
+        )
+        budget = plan_week(
+            schedules=snap.schedules,
+            zones=dict(snap.zones),
+            weather=weather,
+            start=today,
+            now=now,
+            fire_time=engine._resolve_schedule_datetime,
+            known_zones=self.valves.keys(),
+            global_min_run_liters=self.global_min_run_liters,
+            skip_rain_mm=self.global_skip_rain_threshold_mm,
+            skip_forecast_mm=self.global_skip_forecast_threshold_mm,
+            paused=not self.master_enable,
+            skip_today=engine.skip_today_active,
+            forecast_entity=self.weather_forecast_entity,
+        )
+        self.water_budget = budget
+        self._budget_key = key
+        _LOGGER.debug(
+            "🗓️  Water budget rebuilt: %.2f L over %d days (%d forecast day(s))",
+            budget.total_liters, len(budget.days), len(self._forecast),
+        )
+        self._notify_global()
+        return budget
+
+    async def _refresh_forecast(self, force: bool = False) -> None:
+        """Fetch + parse the daily forecast, honouring the TTL."""
+        entity_id = self.weather_forecast_entity
+        if not entity_id:
+            if self._forecast:
+                self._forecast = {}
+                self._forecast_stamp += 1
+            return
+        mono = time.monotonic()
+        if (
+            not force
+            and self._forecast_fetched_for == entity_id
+            and self._forecast_fetched_at is not None
+            and mono - self._forecast_fetched_at < PLANNER_FORECAST_TTL_MINUTES * 60
+        ):
+            return
+        self._forecast_fetched_at = mono
+        self._forecast_fetched_for = entity_id
+
+        state = self.hass.states.get(entity_id)
+        if state is None:
+            _LOGGER.debug("Forecast entity %s not available", entity_id)
+            return
+        entries: Optional[List[Dict[str, Any]]] = None
+        try:
+            resp = await self.hass.services.async_call(
+                "weather", "get_forecasts",
+                {"entity_id": entity_id, "type": "daily"},
+                blocking=True, return_response=True,
+            )
+            entries = ((resp or {}).get(entity_id) or {}).get("forecast")
+        except Exception as e:
+            _LOGGER.debug("weather.get_forecasts failed for %s: %s", entity_id, e)
+        if entries is None:
+            # Pre-2024.3 weather entities still carry the attribute.
+            entries = state.attributes.get("forecast")
+        if not entries:
+            _LOGGER.warning("⚠️ Weather entity %s returned no forecast", entity_id)
+            return
+
+        from homeassistant.util import dt as dt_util
+        forecast = parse_forecast(
+            entries,
+            local_tz=dt_util.DEFAULT_TIME_ZONE,
+            temperature_unit=state.attributes.get("temperature_unit"),
+            precipitation_unit=state.attributes.get("precipitation_unit"),
+        )
+        if forecast != self._forecast:
+            self._forecast = forecast
+            self._forecast_stamp += 1
+
     async def _periodic_recalculate_today(self, now=None) -> None:
-        """Time-interval wrapper around `recalculate_today` + the daily
-        aggregation refresh. Both run on the same 15-min cadence so the
-        Today and Insight tabs of the dashboard stay in lockstep.
+        """Safety-net wrapper around `recalculate_today`.
+
+        v4.2 — weather state changes drive the calculator now; this
+        catches anything the event path missed (e.g. entities that never
+        publish a change) and keeps the VPD windows sampled.
         """
         try:
             await self.recalculate_today()
         except Exception as e:
             _LOGGER.error("Periodic calculator refresh failed: %s", e, exc_info=True)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — event-driven calculator refresh
+    # ─────────────────────────────────────────────────────────────────────
+
+    @callback
+    def _on_weather_state(self, event) -> None:
+        """A tracked weather entity changed — arm the settle timer.
+
+        A throttle, not a sliding debounce: an already pending timer is
+        kept, so sensors reporting more often than
+        WEATHER_DEBOUNCE_SECONDS can't postpone the recompute forever.
+        Changes arriving meanwhile are picked up when it fires.
+        """
+        if self._weather_debounce_unsub is not None:
+            return
+        self._weather_debounce_unsub = async_call_later(
+            self.hass, WEATHER_DEBOUNCE_SECONDS, self._on_weather_settled,
+        )
+
+    async def _on_weather_settled(self, _now=None) -> None:
+        """Debounce expired: recompute only if an input moved meaningfully."""
+        self._weather_debounce_unsub = None
+        weather = self._read_weather()
+        if not self._weather_changed(self._last_weather_inputs, weather):
+            _LOGGER.debug("📊 Weather change below thresholds — skipping recompute")
+            return
         try:
-            await self.refresh_daily_summary()
+            await self.recalculate_today(weather=weather)
         except Exception as e:
-            _LOGGER.error("Periodic daily summary refresh failed: %s", e, exc_info=True)
+            _LOGGER.error("Event-driven calculator refresh failed: %s", e, exc_info=True)
+
+    @staticmethod
+    def _weather_changed(
+        old: Optional[WeatherInputs], new: WeatherInputs,
+    ) -> bool:
+        if old is None:
+            return True
+        for attr, delta in (
+            ("vpd_kpa", WEATHER_DELTA_VPD_KPA),
+            ("rain_today_mm", WEATHER_DELTA_RAIN_MM),
+            ("fc24_mm", WEATHER_DELTA_FORECAST_MM),
+            ("temp_c", WEATHER_DELTA_TEMP_C),
+        ):
+            a, b = getattr(old, attr), getattr(new, attr)
+            if (a is None) != (b is None):
+                return True
+            if a is not None and abs(a - b) >= delta:
+                return True
+        return False
+
+    def _read_weather(self) -> WeatherInputs:
+        return read_weather_inputs(
+            self.hass,
+            vpd_entity=self.weather_vpd_entity,
+            rain_today_entity=self.weather_rain_today_entity,
+            rain_forecast_24h_entity=self.weather_rain_forecast_24h_entity,
+            temp_entity=self.weather_temp_entity,
+        )
 
     async def refresh_daily_summary(self) -> Optional[DailySummary]:
         """Rebuild the daily aggregation cache from the SQLite session
@@ -763,6 +1395,296 @@ class ValveManager:
         self._notify_global()
         return summary
 
+    async def async_usage_series(
+        self,
+        resolution: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """v4.2 — usage at day / week / month / year resolution.
+
+        Dates are local. `end` defaults to today, `start` to
+        USAGE_DEFAULT_PERIODS[resolution] periods back. Served from the
+        `usage_daily` rollup. Raises ValueError for an empty or
+        oversized range.
+        """
+        from homeassistant.util import dt as dt_util
+        if end is None:
+            end = dt_util.now().date()
+        if start is None:
+            n = USAGE_DEFAULT_PERIODS[resolution]
+            if resolution == "day":
+                start = end - timedelta(days=n - 1)
+            elif resolution == "week":
+                start = end - timedelta(weeks=n - 1)
+            elif resolution == "month":
+                months = end.year * 12 + end.month - n
+                start = date(months // 12, months % 12 + 1, 1)
+            else:
+                start = date(end.year - n + 1, 1, 1)
+        periods = count_periods(resolution, start, end)
+        if periods <= 0:
+            raise ValueError("start must not be after end")
+        if periods > USAGE_MAX_PERIODS:
+            raise ValueError(
+                f"range spans {periods} {resolution} periods "
+                f"(max {USAGE_MAX_PERIODS})"
+            )
+        return await build_usage_series(self.db, self.valves, resolution, start, end)
+
+    async def async_series(
+        self,
+        series: str,
+        points: int,
+        method: str = "lttb",
+        session_id: Optional[str] = None,
+        valve: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        metric: str = "liters",
+    ) -> Dict[str, Any]:
+        """v4.2 — a stored series reduced to at most `points` points.
+
+        `flow_trace`: a session's flow curve (x = seconds since start,
+        y = L/min). `daily_usage`: zero-filled usage per local day of
+        one valve or all valves (x = ISO date, y = `metric`); the range
+        defaults to the last SERIES_DEFAULT_DAYS days. Reduction runs in
+        the executor and is cached (see downsample.py). Raises
+        ValueError for a bad series, range or missing trace.
+        """
+        from homeassistant.util import dt as dt_util
+        if series == "flow_trace":
+            if not session_id:
+                raise ValueError("session_id is required for flow_trace")
+            key: tuple = (series, session_id)
+        elif series == "daily_usage":
+            if metric not in ("liters", "minutes", "sessions"):
+                raise ValueError(f"unknown metric {metric!r}")
+            end = end or dt_util.now().date()
+            start = start or end - timedelta(days=SERIES_DEFAULT_DAYS - 1)
+            days = (end - start).days + 1
+            if days <= 0:
+                raise ValueError("start must not be after end")
+            if days > SERIES_MAX_DAYS:
+                raise ValueError(f"range spans {days} days (max {SERIES_MAX_DAYS})")
+            key = (series, valve, start, end, metric, self._usage_version)
+        else:
+            raise ValueError(f"unknown series {series!r}")
+
+        cache_key = (key, method, int(points))
+        cached = self._series_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if series == "flow_trace":
+            trace = await self.db.get_flow_trace(session_id)
+            if trace is None:
+                raise ValueError(f"no flow trace for session {session_id!r}")
+            xs: List[Any] = [t for t, _flow in trace]
+            ys = [flow for _t, flow in trace]
+        else:
+            rows = await self.db.get_usage_buckets(
+                "day", start.isoformat(), end.isoformat(),
+                [valve] if valve else None,
+            )
+            ys = [0.0] * days
+            for r in rows:
+                i = (date.fromisoformat(r["period"]) - start).days
+                if 0 <= i < days:
+                    ys[i] += float(r[metric])
+            xs = list(range(days))
+        rx, ry = await self.hass.async_add_executor_job(
+            downsample, method, xs, ys, int(points),
+        )
+        if series == "daily_usage":
+            rx = [(start + timedelta(days=i)).isoformat() for i in rx]
+        result = {
+            "series": series,
+            "method": method,
+            "source_points": len(ys),
+            "x": rx,
+            "y": ry,
+        }
+        self._series_cache.put(cache_key, result)
+        return result
+
+    def dashboard_snapshot(self) -> tuple[str, Dict[str, Any]]:
+        """v4.2 — (etag, payload) of the whole dashboard model."""
+        return self._dashboard_model.build(self)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # v4.2 — Session log (`z2m_irrigation/sessions/*` websocket)
+    # ─────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _session_bounds(
+        start: Optional[date], end: Optional[date],
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Local dates → tagged-UTC `ended_at` bounds [start, end + 1 day)."""
+        from homeassistant.util import dt as dt_util
+        if start is not None and end is not None and start > end:
+            raise ValueError("start must not be after end")
+
+        def _utc_midnight(d: date) -> str:
+            local = dt_util.start_of_local_day(d)
+            return dt_util.as_utc(local).isoformat()
+
+        return (
+            _utc_midnight(start) if start is not None else None,
+            _utc_midnight(end + timedelta(days=1)) if end is not None else None,
+        )
+
+    async def async_list_sessions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        valves: Optional[List[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        trigger_types: Optional[List[str]] = None,
+        success: Optional[bool] = None,
+        schedule_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """One page of completed sessions, newest first.
+
+        `start` / `end` are local dates (inclusive) on the session's end
+        time. Raises ValueError for a bad cursor or range.
+        """
+        lo, hi = self._session_bounds(start, end)
+        return await self.db.get_sessions_page(
+            limit, cursor=cursor, valve_topics=valves, start=lo, end=hi,
+            trigger_types=trigger_types, success=success,
+            schedule_ids=schedule_ids,
+        )
+
+    async def async_delete_sessions(self, session_ids: List[str]) -> int:
+        """Delete completed sessions by id and refresh derived state."""
+        deleted = await self.db.delete_sessions(session_ids)
+        if deleted:
+            await self._after_history_changed()
+        return deleted
+
+    async def async_clear_sessions(
+        self,
+        valves: Optional[List[str]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        trigger_types: Optional[List[str]] = None,
+        success: Optional[bool] = None,
+        schedule_ids: Optional[List[str]] = None,
+    ) -> int:
+        """Delete every completed session matching the filters."""
+        lo, hi = self._session_bounds(start, end)
+        deleted = await self.db.clear_sessions(
+            SESSIONS_CLEAR_BATCH, valve_topics=valves, start=lo, end=hi,
+            trigger_types=trigger_types, success=success,
+            schedule_ids=schedule_ids,
+        )
+        if deleted:
+            await self._after_history_changed()
+        return deleted
+
+    async def async_import_sessions(
+        self, path: str, fmt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """v4.2 — bulk-load completed sessions from a file under /config.
+
+        Relative paths are resolved against the config directory. Raises
+        ValueError for a path outside it, a missing file or an unknown
+        format. Returns `ImportStats.to_dict()`.
+        """
+        from pathlib import Path
+        config_dir = Path(self.hass.config.config_dir).resolve()
+        target = Path(path)
+        if not target.is_absolute():
+            target = config_dir / target
+        target = target.resolve()
+        if config_dir not in target.parents or not self.hass.config.is_allowed_path(str(target)):
+            raise ValueError(f"{path} is not inside the config directory")
+        size = await self.hass.async_add_executor_job(
+            lambda: target.stat().st_size if target.is_file() else None
+        )
+        if size is None:
+            raise ValueError(f"{path} does not exist")
+        fmt = detect_format(target, fmt)
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"unsupported format {fmt!r}")
+
+        stats = ImportStats(path=str(target), format=fmt)
+        started = time.monotonic()
+        stats.inserted, stats.duplicates = await self.db.import_sessions(
+            iter_import_rows(target, fmt, stats),
+            IMPORT_BATCH_ROWS,
+            defer_indexes=size > IMPORT_DEFER_INDEX_BYTES,
+        )
+        stats.seconds = round(time.monotonic() - started, 3)
+        stats.rows_per_sec = (
+            round(stats.rows_read / stats.seconds, 1) if stats.seconds > 0 else 0.0
+        )
+        _LOGGER.info(
+            "📥 Imported %d session(s) from %s in %.1fs (%.0f rows/s; "
+            "%d duplicate, %d invalid)",
+            stats.inserted, target, stats.seconds, stats.rows_per_sec,
+            stats.duplicates, stats.invalid,
+        )
+        if stats.inserted:
+            await self._reload_lifetime_totals()
+            await self._after_history_changed()
+        return stats.to_dict()
+
+    async def async_verify_totals(self, repair: bool = False) -> Dict[str, Any]:
+        """v4.2 — check lifetime totals against the session history.
+
+        With `repair`, drifted valves are corrected and their in-memory
+        lifetime figures reloaded.
+        """
+        report = await self.db.verify_valve_totals(repair=repair)
+        if report["repaired"]:
+            await self._reload_lifetime_totals()
+        return report
+
+    async def async_backup_database(self, method: str = "backup") -> Dict[str, Any]:
+        """v4.2 — consistent online copy of the database to /config/backups.
+
+        Keeps the newest BACKUP_KEEP copies. Returns the backup report
+        (path, method, bytes, seconds).
+        """
+        from pathlib import Path
+        from homeassistant.util import dt as dt_util
+        backup_dir = Path(self.hass.config.path(BACKUP_DIR))
+        stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+        result = await self.db.backup_to(
+            backup_dir / f"z2m_irrigation-{stamp}.db",
+            method=method,
+            pages=BACKUP_PAGES_PER_STEP,
+            sleep=BACKUP_STEP_SLEEP_SECONDS,
+        )
+
+        def _prune() -> List[str]:
+            old = sorted(backup_dir.glob("z2m_irrigation-*.db"))[:-BACKUP_KEEP]
+            for f in old:
+                f.unlink(missing_ok=True)
+            return [f.name for f in old]
+
+        result["pruned"] = await self.hass.async_add_executor_job(_prune)
+        return result
+
+    async def _reload_lifetime_totals(self) -> None:
+        for topic, v in self.valves.items():
+            totals = await self.db.load_valve_totals(topic)
+            v.lifetime_total_liters = totals["lifetime_total_liters"]
+            v.lifetime_total_minutes = totals["lifetime_total_minutes"]
+            v.lifetime_session_count = totals["lifetime_session_count"]
+            self._dispatch_signal(sig_update(topic))
+
+    async def _after_history_changed(self) -> None:
+        """Sessions were deleted or imported: the 24h/7d metrics, daily
+        summary and today's delivered liters (water-balance carry-over)
+        moved."""
+        self._usage_version += 1
+        await self._periodic_refresh_time_metrics()
+        await self.recalculate_today()
+
     @callback
     def _on_devices(self, msg) -> None:
         try:
@@ -814,6 +1736,8 @@ class ValveManager:
                     # so the dashboard's Insight tab has data immediately
                     # rather than waiting for the next 15-min tick.
                     await self.refresh_daily_summary()
+                    # v4.2 — and the 7-day water budget.
+                    await self.refresh_water_budget()
                 except Exception as e:
                     _LOGGER.warning(
                         "ZoneStore: failed to ensure zone '%s': %s", topic, e,
@@ -952,6 +1876,7 @@ class ValveManager:
                         v.software_overshoot_fired = True
                         v.software_overshoot_fired_ts = now
                     self._initiate_shutoff(v, "software_overshoot_140pct")
+                    self._record_flight(v, now)
                     return
                 else:
                     _LOGGER.debug(
@@ -988,6 +1913,7 @@ class ValveManager:
                         topic, elapsed_min, target_min
                     )
                     self._initiate_shutoff(v, "time_target_reached")
+                    self._record_flight(v, now)
                     return
 
         # v3.2 — Surface device's `current_device_status` field. Fire an
@@ -1027,6 +1953,14 @@ class ValveManager:
                     v.last_progress_ts = now
                     v.last_progress_value = 0.0
                     v.expected_duration_warned = False
+                    # v4.2 — start (or drop) this session's flow trace.
+                    if self.record_flow_traces:
+                        if v.flow_trace is None:
+                            v.flow_trace = FlowTraceRecorder(FLOW_TRACE_MAX_SAMPLES)
+                        else:
+                            v.flow_trace.reset()
+                    else:
+                        v.flow_trace = None
                     # Generate session ID immediately before valve can turn off
                     from datetime import datetime
                     v.current_session_id = f"{v.topic}_{datetime.now().timestamp()}"
@@ -1048,6 +1982,7 @@ class ValveManager:
                         "✅ Shutoff confirmed for %s (reason=%s, attempts=%d, elapsed=%.1fs)",
                         topic, v.shutoff_reason, v.shutoff_attempt, elapsed,
                     )
+                    self._log_shutoff(v, "confirmed", elapsed)
                     self._fire_event(
                         EVENT_SHUTOFF_CONFIRMED,
                         {
@@ -1084,22 +2019,23 @@ class ValveManager:
                         captured_session_liters = v.session_liters
                         captured_topic = v.topic
                         captured_name = v.name
+                        captured_trace = (
+                            v.flow_trace.snapshot() if v.flow_trace else None
+                        )
 
                         async def _end_and_sync():
-                            # End session in database using captured values
-                            await self.db.end_session(
+                            # End session and update totals in database
+                            # (one transaction, see `finish_session`)
+                            updated_totals = await self.db.finish_session(
                                 captured_session_id,
-                                session_duration,
-                                captured_session_liters,
-                                avg_flow
-                            )
-                            # Update totals in database
-                            updated_totals = await self.db.save_valve_totals(
                                 captured_topic,
                                 captured_name,
+                                session_duration,
                                 captured_session_liters,
-                                session_duration
+                                avg_flow,
+                                flow_trace=captured_trace,
                             )
+                            self._usage_version += 1
                             # Sync totals back to valve object
                             if updated_totals:
                                 v.lifetime_total_liters = updated_totals["lifetime_total_liters"]
@@ -1145,6 +2081,9 @@ class ValveManager:
                             # (above) so the new row is included.
                             try:
                                 await self.refresh_daily_summary()
+                                # v4.2 — today's delivery changed, so
+                                # did the water-balance carry-over.
+                                await self.recalculate_today()
                             except Exception as e:
                                 _LOGGER.warning(
                                     "Daily summary refresh on session end failed: %s",
@@ -1177,6 +2116,10 @@ class ValveManager:
             except Exception:
                 v.flow_lpm = 0.0
 
+        # v4.2 — flow trace sample (in-memory ring; written at session end)
+        if v.session_active and v.flow_trace is not None:
+            v.flow_trace.record(now - v.session_start_ts, v.flow_lpm)
+
         # optional absolute total from device (convert m³ to L if needed)
         if "consumption" in data:
             try:
@@ -1203,6 +2146,8 @@ class ValveManager:
 
         # Failsafe volume check is handled earlier in this method
 
+        self._record_flight(v, now)
+
         # SAFE dispatcher fire
         self._dispatch_signal(sig_update(topic))
 
@@ -1411,6 +2356,7 @@ class ValveManager:
         v.shutoff_reason = reason
         v.shutoff_attempt = 0
         v.shutoff_started_ts = time.monotonic()
+        self._log_shutoff(v, "initiated", 0.0)
 
         _LOGGER.warning(
             "🛑 Initiating shutoff for %s (reason=%s, target=%.2fL, current=%.2fL)",
@@ -1453,11 +2399,13 @@ class ValveManager:
                 "🛑 Shutoff attempt #%d for %s published (elapsed=%.1fs, reason=%s)",
                 attempt, v.topic, elapsed, v.shutoff_reason,
             )
+            self._log_shutoff(v, "attempt", elapsed, published=True)
         except Exception as e:
             _LOGGER.error(
                 "Shutoff attempt #%d for %s FAILED to publish: %s",
                 attempt, v.topic, e,
             )
+            self._log_shutoff(v, "attempt", elapsed, published=False)
 
         # Escalation by attempt count.
         if attempt == 4:
@@ -1490,6 +2438,7 @@ class ValveManager:
                 "Manual intervention required!",
                 v.topic, attempt, elapsed,
             )
+            self._log_shutoff(v, "gave_up", elapsed)
             self._fire_event(
                 EVENT_SHUTOFF_FAILED,
                 {
@@ -1573,14 +2522,15 @@ class ValveManager:
         from datetime import datetime as _dt
         if self.panic.active:
             # Merge in new affected valves; don't re-fire the event.
-            for vt in affected_valves:
-                if vt not in self.panic.affected_valves:
-                    self.panic.affected_valves.append(vt)
+            added = [vt for vt in affected_valves if vt not in self.panic.affected_valves]
+            self.panic.affected_valves.extend(added)
+            if added:
+                self._dump_flight_recorder(reason, added)
             _LOGGER.warning(
                 "🚨 Panic already active; merged affected valves. Now: %s",
                 self.panic.affected_valves,
             )
-            self._dispatch_signal("z2m_irrigation_panic_state_changed")
+            self._dispatch_signal(SIG_PANIC_STATE)
             return
 
         self.panic.active = True
@@ -1588,6 +2538,9 @@ class ValveManager:
         self.panic.triggered_at = time.monotonic()
         self.panic.triggered_at_iso = _dt.utcnow().isoformat() + "Z"
         self.panic.affected_valves = list(affected_valves)
+        # v4.2 — covers EVENT_SHUTOFF_FAILED too: the exhausted retry
+        # chain trips panic before it clears the valve's shutoff state.
+        self._dump_flight_recorder(reason, affected_valves)
 
         _LOGGER.error(
             "🚨🚨🚨 PANIC TRIGGERED: %s | affected valves: %s",
@@ -1614,6 +2567,8 @@ class ValveManager:
                 f"**Affected valves:** {names}\n\n"
                 f"Recommended action: **kill power to the water pump** "
                 f"immediately, then physically inspect the affected valves.\n\n"
+                f"The last MQTT reports of every valve were saved to "
+                f"`{FLIGHT_RECORDER_DIR}/` in the config directory.\n\n"
                 f"To clear panic state once the situation is resolved, call "
                 f"the `z2m_irrigation.clear_panic` service or use the bell "
                 f"icon button."
@@ -1622,7 +2577,7 @@ class ValveManager:
         )
 
         # Notify the binary sensor (if loaded yet) to update its state.
-        self._dispatch_signal("z2m_irrigation_panic_state_changed")
+        self._dispatch_signal(SIG_PANIC_STATE)
 
         # v4.0-alpha-1 — invoke the user-configured kill switch (best-effort).
         # This is the integration's last line of defense; the existing
@@ -1633,6 +2588,119 @@ class ValveManager:
         except Exception as e:
             _LOGGER.error("Kill switch invocation failed in panic flow: %s", e)
 
+    # ─── v4.2 — panic flight recorder ───────────────────────────────────
+
+    def _record_flight(self, v: Valve, now: float) -> None:
+        """Append the valve's decoded state after one MQTT report."""
+        v.flight.record(
+            now,
+            v.state == "ON",
+            v.flow_lpm,
+            status_code(v.device_status),
+            v.session_liters,
+            (FLAG_SESSION_ACTIVE if v.session_active else 0)
+            | (FLAG_SHUTOFF_IN_PROGRESS if v.shutoff_in_progress else 0)
+            | (FLAG_OVERSHOOT_FIRED if v.software_overshoot_fired else 0),
+        )
+
+    def _log_shutoff(
+        self, v: Valve, event: str, elapsed: float,
+        published: Optional[bool] = None,
+    ) -> None:
+        v.shutoff_history.append((
+            round(time.time(), 3), event, v.shutoff_attempt,
+            round(elapsed, 1), v.shutoff_reason, published,
+        ))
+
+    def _guardrail_state(self, v: Valve, now: float) -> Dict[str, Any]:
+        def _age(ts: float) -> Optional[float]:
+            return round(now - ts, 1) if ts > 0 else None
+
+        return {
+            "state": v.state,
+            "flow_lpm": round(v.flow_lpm, 3),
+            "device_status": v.device_status,
+            "session_active": v.session_active,
+            "session_liters": round(v.session_liters, 3),
+            "session_elapsed_s": _age(v.session_start_ts) if v.session_active else None,
+            "target_liters": v.target_liters,
+            "session_end_in_s": (
+                round(v.session_end_ts - now, 1) if v.session_end_ts else None
+            ),
+            "trigger_type": v.trigger_type,
+            "shutoff_in_progress": v.shutoff_in_progress,
+            "shutoff_reason": v.shutoff_reason,
+            "shutoff_attempt": v.shutoff_attempt,
+            "shutoff_elapsed_s": _age(v.shutoff_started_ts),
+            "software_overshoot_fired": v.software_overshoot_fired,
+            "software_overshoot_age_s": _age(v.software_overshoot_fired_ts),
+            "expected_duration_min": v.expected_duration_min,
+            "expected_duration_warned": v.expected_duration_warned,
+            "last_progress_age_s": _age(v.last_progress_ts),
+            "last_progress_liters": round(v.last_progress_value, 3),
+            "last_report_age_s": _age(v.last_ts),
+            "battery": v.battery,
+            "link_quality": v.link_quality,
+        }
+
+    def _dump_flight_recorder(self, reason: str, affected_valves: List[str]) -> None:
+        """Snapshot every valve's flight recorder and write it, with the
+        panic reason, guardrail state and shutoff history, to
+        /config/FLIGHT_RECORDER_DIR. The snapshot is taken here, on the
+        event loop; compression and the write run in the executor."""
+        from datetime import datetime as _dt
+        from pathlib import Path
+        now = time.monotonic()
+        wall = time.time()
+        snapshots = {
+            topic: (v.name, v.flight.snapshot(), self._guardrail_state(v, now),
+                    list(v.shutoff_history))
+            for topic, v in self.valves.items()
+        }
+        panic = {
+            "active": self.panic.active,
+            "reason": self.panic.reason,
+            "triggered_at": self.panic.triggered_at_iso,
+            "affected_valves": list(self.panic.affected_valves),
+        }
+        directory = Path(self.hass.config.path(FLIGHT_RECORDER_DIR))
+        stem = "panic-" + _dt.fromtimestamp(wall).strftime("%Y%m%d-%H%M%S")
+
+        def _write() -> Path:
+            offset = wall - now
+            return write_dump(directory, stem, {
+                "written_at": _dt.fromtimestamp(wall).astimezone().isoformat(),
+                "reason": reason,
+                "affected_valves": list(affected_valves),
+                "panic": panic,
+                "valves": [
+                    {
+                        "valve": topic,
+                        "name": name,
+                        "guardrail": guardrail,
+                        "shutoff_history": [
+                            dict(zip(
+                                ("ts", "event", "attempt", "elapsed_s",
+                                 "reason", "published"),
+                                entry,
+                            ))
+                            for entry in history
+                        ],
+                        "reports": report_rows(snap, offset),
+                    }
+                    for topic, (name, snap, guardrail, history) in snapshots.items()
+                ],
+            }, FLIGHT_RECORDER_KEEP)
+
+        async def _run() -> None:
+            try:
+                path = await self.hass.async_add_executor_job(_write)
+                _LOGGER.warning("🧾 Flight recorder dumped to %s (%s)", path, reason)
+            except Exception as e:
+                _LOGGER.error("Flight recorder dump failed: %s", e)
+
+        self._schedule_task(_run())
+
     def clear_panic(self, cleared_by: str = "manual") -> None:
         """Clear the panic state. Called by the
         z2m_irrigation.clear_panic service or by external automations.
@@ -1681,7 +2749,7 @@ class ValveManager:
         except Exception:
             pass
 
-        self._dispatch_signal("z2m_irrigation_panic_state_changed")
+        self._dispatch_signal(SIG_PANIC_STATE)
 
     def _check_panic_conditions(self, now: float) -> None:
         """Called periodically by _guardrail_tick. Evaluates the panic trip
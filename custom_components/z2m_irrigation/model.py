@@ -0,0 +1,151 @@
+"""Whole-dashboard model for the `z2m_irrigation/snapshot` websocket.
+
+v4.2 — the YAML dashboard renders from dozens of entities per zone plus
+the global sensors, each its own state object. The snapshot command
+returns the same model in one versioned payload:
+
+    {
+      "v": 1,
+      "valves":  {topic: {live keys (see live.py) + totals, 24h/7d,
+                          last run, avg flow, battery, link quality}},
+      "zones":   {zone: ZoneConfig fields},
+      "today":   today's calculation (per-zone need / liters / skip),
+      "queue", "panic", "next_run", "master_enable", "skip_today",
+      "daily_summary": DailySummary.to_dict() (columnar, v2),
+    }
+
+and an ETag (a hash of the payload). A client that sends back the ETag
+it holds gets `{"unchanged": true}` instead of the payload.
+
+The heavy sections (zones, today, daily summary) are re-serialized
+only when the object they come from is replaced — the ZoneStore
+snapshot, the memoized CalculatorResult and the DailySummary are all
+swapped, never mutated, when they change. The water balance's
+depletion dict *is* mutated in place (`close_day`), so the today
+section is additionally keyed on its contents.
+
+Reads the manager's in-memory state only; no Home Assistant imports.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import live
+
+SNAPSHOT_VERSION = 1
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) if value is not None else None
+
+
+def valve_stats(v: Any) -> Dict[str, Any]:
+    """The non-live per-valve figures the zone cards show."""
+    return {
+        "total_liters": _round(v.total_liters),
+        "total_minutes": _round(v.total_minutes),
+        "session_count": v.session_count,
+        "lifetime_liters": _round(v.lifetime_total_liters),
+        "lifetime_minutes": _round(v.lifetime_total_minutes),
+        "lifetime_sessions": v.lifetime_session_count,
+        "last_24h_liters": _round(v.last_24h_liters),
+        "last_24h_minutes": _round(v.last_24h_minutes),
+        "last_7d_liters": _round(v.last_7d_liters),
+        "last_7d_minutes": _round(v.last_7d_minutes),
+        "last_session_start": v.last_session_start,
+        "last_session_end": v.last_session_end,
+        "last_run_liters": _round(v.last_session_liters),
+        "avg_flow_lpm_7d": _round(v.avg_flow_lpm_7d, 3),
+        "battery": v.battery,
+        "link_quality": v.link_quality,
+    }
+
+
+def today_dict(result: Any, depletion: Dict[str, float]) -> Dict[str, Any]:
+    """Today's calculation in the shape of the today_calculation sensor."""
+    w = result.weather
+    return {
+        "total_liters": result.total_liters,
+        "runnable_zones": result.runnable_zones,
+        "dryness": result.dryness,
+        "vpd_kpa_effective": w.effective_vpd,
+        "vpd_24h_avg_kpa": result.vpd_24h_avg_kpa,
+        "rain_today_mm": w.rain_today_mm,
+        "rain_forecast_24h_mm": w.fc24_mm,
+        "temperature_c": w.temp_c,
+        "zones": {
+            z.zone: {
+                "need_mm": z.need_mm,
+                "carryover_mm": z.carryover_mm,
+                "liters": z.liters,
+                "skipped": z.skipped,
+                "skip_reason": z.skip_reason,
+            }
+            for z in result.zones
+        },
+        "soil_depletion_mm": dict(depletion),
+    }
+
+
+def etag_of(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+class DashboardModel:
+    """Builds the snapshot payload, reusing unchanged heavy sections."""
+
+    def __init__(self) -> None:
+        # section name → (source object, value key, serialized section)
+        self._sections: Dict[str, Tuple[Any, Any, Any]] = {}
+
+    def _section(
+        self, name: str, source: Any, build: Callable[[], Any], key: Any = None,
+    ) -> Any:
+        """Cached section: rebuilt when `source` is replaced or, for
+        state mutated in place, when `key` compares unequal."""
+        cached = self._sections.get(name)
+        if cached is not None and cached[0] is source and cached[1] == key:
+            return cached[2]
+        value = build() if source is not None else None
+        self._sections[name] = (source, key, value)
+        return value
+
+    def build(self, mgr: Any) -> Tuple[str, Dict[str, Any]]:
+        """Return (etag, payload) for the manager's current state."""
+        state = live.live_state(mgr)
+        depletion = mgr.water_balance.depletion
+        snap = mgr.zone_store.snapshot() if mgr.zone_store is not None else None
+        engine = mgr.schedule_engine
+        payload = {
+            "v": SNAPSHOT_VERSION,
+            "valves": {
+                topic: {**state["valves"][topic], **valve_stats(v)}
+                for topic, v in mgr.valves.items()
+            },
+            "zones": self._section(
+                "zones", snap,
+                lambda: {z: asdict(cfg) for z, cfg in snap.zones.items()},
+            ),
+            "today": self._section(
+                "today", mgr.today_calculation,
+                lambda: today_dict(mgr.today_calculation, depletion),
+                key=tuple(sorted(depletion.items())),
+            ),
+            "queue": state["queue"],
+            "panic": state["panic"],
+            "next_run": (
+                engine.compute_next_run_summary() if engine is not None else None
+            ),
+            "master_enable": mgr.master_enable,
+            "skip_today": engine.skip_today_active if engine is not None else False,
+            "daily_summary": self._section(
+                "daily_summary", mgr.daily_summary,
+                lambda: mgr.daily_summary.to_dict(),
+            ),
+        }
+        return etag_of(payload), payload
@@ -0,0 +1,286 @@
+"""Seven-day forward water budget.
+
+v4.2 — expands every enabled schedule over the next `days` local days
+and predicts, per day and per zone, the liters each run would deliver
+and whether the run would be skipped. All days are evaluated in one
+`calculator.compute_batch` pass.
+
+Weather model per planned day (the calculator's inputs as they would
+look at a morning fire):
+
+  * `vpd_kpa` — from the forecast's max temperature + relative humidity
+    (Tetens). Falls back to the current 24h rolling VPD when the
+    forecast has no humidity.
+  * `rain_today_mm` — the live sensor reading for today; 0 for future
+    days (nothing has fallen yet at the morning fire).
+  * `fc24_mm` — forecast precipitation for that day. For today the live
+    forecast sensor wins when configured.
+
+Every day starts from a full soil bucket: the water balance's
+carry-over (`water_balance.py`) is not projected forward.
+
+Skip prediction mirrors the engine's gates: master pause, skip-today,
+global rain/forecast thresholds (smart mode only), then zone
+resolution + min-run. Panic state is not predicted.
+
+Like `aggregator.py`, this module does no I/O; the manager fetches the
+forecast and hands it in.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .calculator import WeatherInputs, ZoneBatch, compute_batch
+from .const import (
+    DAYS_OF_WEEK,
+    OUTCOME_RAN,
+    OUTCOME_SKIPPED_FORECAST,
+    OUTCOME_SKIPPED_NO_ZONES,
+    OUTCOME_SKIPPED_PAUSED,
+    OUTCOME_SKIPPED_RAIN,
+    OUTCOME_SKIPPED_TODAY,
+    SCHEDULE_MODE_FIXED,
+)
+from .zone_store import Schedule, ZoneConfig
+
+_IN_TO_MM = 25.4
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Forecast parsing
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class ForecastDay:
+    """One local day of forecast, normalized to mm / °C / %."""
+    date: str                              # ISO date "YYYY-MM-DD"
+    precipitation_mm: Optional[float]
+    temp_max_c: Optional[float]
+    humidity_pct: Optional[float]
+
+
+def _num(value: Any) -> Optional[float]:
+    try:
+        out = float(value)
+    except (TypeError, ValueError):
+        return None
+    return out if math.isfinite(out) else None
+
+
+def parse_forecast(
+    entries: Iterable[Dict[str, Any]],
+    *,
+    local_tz: tzinfo,
+    temperature_unit: Optional[str] = None,
+    precipitation_unit: Optional[str] = None,
+) -> Dict[str, ForecastDay]:
+    """Fold HA weather forecast entries into one `ForecastDay` per local date.
+
+    Accepts daily, twice-daily or hourly entries: precipitation is summed,
+    temperature takes the max, humidity the mean.
+    """
+    temp_f = (temperature_unit or "").strip().upper() in ("°F", "F")
+    precip_in = (precipitation_unit or "").strip().lower() in ("in", "inch", "inches")
+    acc: Dict[str, Dict[str, List[float]]] = {}
+    for entry in entries or []:
+        try:
+            when = datetime.fromisoformat(
+                str(entry.get("datetime", "")).replace("Z", "+00:00")
+            )
+        except (AttributeError, ValueError):
+            continue
+        if when.tzinfo is not None:
+            when = when.astimezone(local_tz)
+        bucket = acc.setdefault(
+            when.date().isoformat(), {"p": [], "t": [], "h": []},
+        )
+        precip = _num(entry.get("precipitation"))
+        if precip is not None:
+            bucket["p"].append(precip * _IN_TO_MM if precip_in else precip)
+        temp = _num(entry.get("temperature"))
+        if temp is not None:
+            bucket["t"].append((temp - 32.0) * 5.0 / 9.0 if temp_f else temp)
+        hum = _num(entry.get("humidity"))
+        if hum is not None:
+            bucket["h"].append(hum)
+    return {
+        day: ForecastDay(
+            date=day,
+            precipitation_mm=round(sum(b["p"]), 2) if b["p"] else None,
+            temp_max_c=max(b["t"]) if b["t"] else None,
+            humidity_pct=sum(b["h"]) / len(b["h"]) if b["h"] else None,
+        )
+        for day, b in acc.items()
+    }
+
+
+def vpd_from_temp_rh(temp_c: Optional[float], rh_pct: Optional[float]) -> Optional[float]:
+    """Vapour-pressure deficit (kPa) via the Tetens saturation formula."""
+    if temp_c is None or rh_pct is None:
+        return None
+    es = 0.6108 * math.exp(17.27 * temp_c / (temp_c + 237.3))
+    return round(max(0.0, es * (1.0 - min(100.0, max(0.0, rh_pct)) / 100.0)), 3)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Plan shapes
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class PlannedRun:
+    """One predicted schedule firing."""
+    schedule_id: str
+    schedule_name: str
+    at: Optional[str]                      # local ISO datetime, None if unresolved
+    mode: str
+    outcome: str                           # OUTCOME_RAN or an OUTCOME_SKIPPED_*
+    zones: Dict[str, float] = field(default_factory=dict)
+    total_liters: float = 0.0
+
+
+@dataclass
+class PlannedDay:
+    date: str
+    vpd_kpa: Optional[float]
+    rain_today_mm: Optional[float]
+    fc24_mm: Optional[float]
+    runs: List[PlannedRun] = field(default_factory=list)
+    total_liters: float = 0.0
+
+
+@dataclass
+class WaterBudget:
+    """The planner's output, cached by the manager."""
+    built_at: str
+    forecast_entity: Optional[str]
+    days: List[PlannedDay] = field(default_factory=list)
+    zone_totals: Dict[str, float] = field(default_factory=dict)
+    total_liters: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Planner
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def day_weather(
+    forecast: Dict[str, ForecastDay],
+    start: date,
+    days: int,
+    *,
+    current: WeatherInputs,
+    fallback_vpd_kpa: Optional[float],
+) -> List[WeatherInputs]:
+    """Calculator inputs for each planned day (see module docstring)."""
+    out: List[WeatherInputs] = []
+    for offset in range(days):
+        d = start + timedelta(days=offset)
+        fc = forecast.get(d.isoformat())
+        vpd = vpd_from_temp_rh(fc.temp_max_c, fc.humidity_pct) if fc else None
+        if vpd is None:
+            vpd = fallback_vpd_kpa
+        fc24 = fc.precipitation_mm if fc else None
+        if offset == 0:
+            rain_today = current.rain_today_mm
+            if current.fc24_mm is not None:
+                fc24 = current.fc24_mm
+        else:
+            rain_today = 0.0
+        out.append(WeatherInputs(
+            vpd_kpa=vpd, rain_today_mm=rain_today, fc24_mm=fc24,
+            temp_c=fc.temp_max_c if fc else None,
+        ))
+    return out
+
+
+def plan_week(
+    *,
+    schedules: Sequence[Schedule],
+    zones: Dict[str, ZoneConfig],
+    weather: Sequence[WeatherInputs],
+    start: date,
+    now: datetime,
+    fire_time: Callable[[Schedule, date], Optional[datetime]],
+    known_zones: Iterable[str],
+    global_min_run_liters: float,
+    skip_rain_mm: float,
+    skip_forecast_mm: float,
+    paused: bool = False,
+    skip_today: bool = False,
+    forecast_entity: Optional[str] = None,
+) -> WaterBudget:
+    """Predict every enabled schedule's runs over `len(weather)` days."""
+    known = set(known_zones)
+    grid = compute_batch(ZoneBatch.from_zones(zones, global_min_run_liters), weather)
+    budget = WaterBudget(built_at=now.isoformat(), forecast_entity=forecast_entity)
+
+    for offset, w in enumerate(weather):
+        d = start + timedelta(days=offset)
+        weekday = DAYS_OF_WEEK[d.weekday()]
+        day = PlannedDay(
+            date=d.isoformat(),
+            vpd_kpa=w.vpd_kpa, rain_today_mm=w.rain_today_mm, fc24_mm=w.fc24_mm,
+        )
+        for sch in schedules:
+            if not sch.enabled or (sch.days and weekday not in sch.days):
+                continue
+            at = fire_time(sch, d)
+            if at is not None and at <= now:
+                continue  # already past today
+            run = PlannedRun(
+                schedule_id=sch.id, schedule_name=sch.name,
+                at=at.isoformat() if at is not None else None,
+                mode=sch.mode, outcome=OUTCOME_RAN,
+            )
+            day.runs.append(run)
+
+            if paused:
+                run.outcome = OUTCOME_SKIPPED_PAUSED
+                continue
+            if skip_today and offset == 0:
+                run.outcome = OUTCOME_SKIPPED_TODAY
+                continue
+
+            if sch.mode == SCHEDULE_MODE_FIXED:
+                liters = float(sch.fixed_liters_per_zone or 0)
+                if liters > 0:
+                    run.zones = {z: liters for z in sch.zones if z in known}
+            else:
+                if w.effective_rain_today >= skip_rain_mm:
+                    run.outcome = OUTCOME_SKIPPED_RAIN
+                    continue
+                if w.effective_fc24 >= skip_forecast_mm:
+                    run.outcome = OUTCOME_SKIPPED_FORECAST
+                    continue
+                wanted = set(sch.zones) if sch.zones else None
+                run.zones = {
+                    z: grid.liters[offset][j]
+                    for j, z in enumerate(grid.zones)
+                    if not grid.skipped[offset][j]
+                    and (wanted is None or z in wanted)
+                    and z in known
+                }
+            if not run.zones:
+                run.outcome = OUTCOME_SKIPPED_NO_ZONES
+                continue
+            run.total_liters = round(sum(run.zones.values()), 2)
+            day.total_liters += run.total_liters
+            for z, liters in run.zones.items():
+                budget.zone_totals[z] = budget.zone_totals.get(z, 0.0) + liters
+
+        day.total_liters = round(day.total_liters, 2)
+        budget.total_liters += day.total_liters
+        budget.days.append(day)
+
+    budget.total_liters = round(budget.total_liters, 2)
+    budget.zone_totals = {z: round(v, 2) for z, v in budget.zone_totals.items()}
+    return budget
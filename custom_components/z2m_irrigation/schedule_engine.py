@@ -41,7 +41,7 @@ import time
 from collections import deque
 from dataclasses import dataclass
 from datetime import date, datetime, time as dt_time, timedelta
-from typing import Callable, Deque, List, Optional, TYPE_CHECKING
+from typing import Callable, Deque, Iterable, List, Optional, Tuple, TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from homeassistant.core import HomeAssistant
@@ -144,6 +144,13 @@ class ScheduleEngine:
         self._fired_today: set[str] = set()
         self._fired_today_date: Optional[date] = None
 
+        # v4.2 — memo for the next-run scan in `compute_next_run_summary`,
+        # keyed on (ZoneStore snapshot version, local minute). The scan
+        # walks every schedule × 8 days and is otherwise repeated on every
+        # NextRunSummary sensor render.
+        self._next_run_key: Optional[Tuple[int, str]] = None
+        self._next_run: Tuple[Optional[datetime], Optional[Schedule]] = (None, None)
+
     # ─────────────────────────────────────────────────────────────────────
     # Lifecycle
     # ─────────────────────────────────────────────────────────────────────
@@ -360,7 +367,7 @@ class ScheduleEngine:
         """Called every minute on second=0. Fires any schedules due now."""
         self._refresh_fired_today()
         try:
-            schedules = self.store.all_schedules_typed()
+            schedules = self.store.snapshot().schedules
         except Exception as e:
             _LOGGER.error("ScheduleEngine: failed to read schedules: %s", e)
             return
@@ -414,7 +421,7 @@ class ScheduleEngine:
         today = local_now.date()
 
         try:
-            schedules = self.store.all_schedules_typed()
+            schedules = self.store.snapshot().schedules
         except Exception as e:
             _LOGGER.error("ScheduleEngine: catch-up read failed: %s", e)
             return
@@ -550,7 +557,7 @@ class ScheduleEngine:
         # v4.0-alpha-3 — record fire event in the global timeline so the
         # Insight tab can render the "what happened" chart.
         try:
-            await self.store.record_schedule_event(
+            await self.mgr.record_schedule_event(
                 kind="fired",
                 schedule_id=sch.id,
                 schedule_name=sch.name,
@@ -572,7 +579,9 @@ class ScheduleEngine:
         We always recompute on schedule fire so the inputs are fresh for
         the gate decision (rather than trusting whatever the 15-min loop
         last cached). The result is also stamped into the manager's
-        `today_calculation` cache as a side effect.
+        `today_calculation` cache as a side effect. v4.2 — when config and
+        (quantized) weather are unchanged the manager returns the cached
+        result as-is, so this is cheap on repeat fires.
         """
         try:
             return await self.mgr.recalculate_today()
@@ -646,7 +655,7 @@ class ScheduleEngine:
         await self.store.mark_schedule_run(sch.id, outcome=outcome)
         # v4.0-alpha-3 — record skip event in the global timeline.
         try:
-            await self.store.record_schedule_event(
+            await self.mgr.record_schedule_event(
                 kind="skipped",
                 schedule_id=sch.id,
                 schedule_name=sch.name,
@@ -931,22 +940,12 @@ class ScheduleEngine:
     # Sensor helpers — next_run summary
     # ─────────────────────────────────────────────────────────────────────
 
-    def compute_next_run_summary(self) -> dict:
-        """Find the soonest enabled schedule's next firing across all schedules.
-
-        Looks 8 days ahead (covers any weekday combination). Returns a
-        dict that the NextRunSummary sensor flattens into its state +
-        attributes.
-        """
-        try:
-            schedules = self.store.all_schedules_typed()
-        except Exception:
-            schedules = []
-
-        local_now = self._local_now()
+    def _scan_next_run(
+        self, schedules: Iterable[Schedule], local_now: datetime,
+    ) -> Tuple[Optional[datetime], Optional[Schedule]]:
+        """Earliest future firing across enabled schedules (8-day horizon)."""
         best_dt: Optional[datetime] = None
         best: Optional[Schedule] = None
-
         for sch in schedules:
             if not sch.enabled:
                 continue
@@ -969,6 +968,32 @@ class ScheduleEngine:
                     best_dt = dt
                     best = sch
                 break  # earliest matching day for this schedule
+        return best_dt, best
+
+    def compute_next_run_summary(self) -> dict:
+        """Find the soonest enabled schedule's next firing across all schedules.
+
+        Looks 8 days ahead (covers any weekday combination). Returns a
+        dict that the NextRunSummary sensor flattens into its state +
+        attributes.
+        """
+        local_now = self._local_now()
+        try:
+            snap = self.store.snapshot()
+        except Exception:
+            snap = None
+        key = (
+            (snap.version, local_now.strftime("%Y-%m-%d %H:%M"))
+            if snap is not None else None
+        )
+        if key is not None and key == self._next_run_key:
+            best_dt, best = self._next_run
+        else:
+            best_dt, best = self._scan_next_run(
+                snap.schedules if snap is not None else (), local_now,
+            )
+            self._next_run_key = key
+            self._next_run = (best_dt, best)
 
         if best is None or best_dt is None:
             return {
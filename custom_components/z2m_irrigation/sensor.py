@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
@@ -12,7 +13,7 @@ from .manager import ValveManager, Valve
 from .const import (
     DOMAIN, MANUFACTURER, MODEL,
     SIG_NEW_VALVE, sig_update,
-    SIG_GLOBAL_UPDATE, sig_zone_config_changed,
+    SIG_GLOBAL_UPDATE, SIG_SCHEDULE_EVENT, sig_zone_config_changed,
 )
 from .zone_store import ZoneConfig
 
@@ -74,6 +75,12 @@ async def async_setup_entry(hass, entry: ConfigEntry, async_add_entities):
         # exposed as a sensor attribute so the dashboard Log tab can
         # render them as a table without needing recorder access.
         SessionLogSensor(mgr),
+        # v4.2 — 7-day forward water budget
+        WaterBudgetSensor(mgr),
+        # v4.2 — database storage diagnostics
+        DatabaseSizeSensor(mgr),
+        DatabaseWalSizeSensor(mgr),
+        DatabaseFragmentationSensor(mgr),
     ], True)
 
 class BaseValveSensor(SensorEntity):
@@ -425,9 +432,10 @@ class ZoneDailyHistorySensor(BaseValveSensor):
     """v4.0-alpha-4 — `sensor.<zone>_daily_history`.
 
     State = total liters delivered by this zone over the cached window
-    (default 30 days). The `days` attribute carries the per-day series
-    (most-recent first), with zero-filled gaps so the dashboard chart
-    can render contiguous bars.
+    (default 30 days). The per-day series (most-recent first, zero-filled
+    so the dashboard chart can render contiguous bars) is exposed as
+    v4.2 columnar attributes: `dates` plus parallel `liters`, `minutes`
+    and `sessions` arrays.
 
     Reads from the manager's pre-built `daily_summary` cache — no DB
     hits at render time. The cache is refreshed on the existing 15-min
@@ -468,10 +476,7 @@ class ZoneDailyHistorySensor(BaseValveSensor):
         summary = self.mgr.daily_summary
         if summary is None:
             return None
-        for zs in summary.zones:
-            if zs.zone == self.valve.topic:
-                return zs
-        return None
+        return summary.zone(self.valve.topic)
 
     @property
     def native_value(self):
@@ -498,15 +503,9 @@ class ZoneDailyHistorySensor(BaseValveSensor):
             "total_liters": zs.total_liters,
             "total_minutes": zs.total_minutes,
             "total_sessions": zs.total_sessions,
-            "days": [
-                {
-                    "date": d.date,
-                    "liters": d.liters,
-                    "minutes": d.minutes,
-                    "sessions": d.sessions,
-                }
-                for d in zs.days
-            ],
+            # v4.2 — columnar: `liters[i]` etc. belong to `dates[i]`.
+            "dates": self.mgr.daily_summary.dates,
+            **zs.columns(),
         }
 
 
@@ -644,6 +643,8 @@ class TodayCalculationSensor(BaseGlobalSensor):
             "vpd_snapshot_kpa": getattr(result, "vpd_snapshot_kpa", None),
             "vpd_24h_avg_kpa": getattr(result, "vpd_24h_avg_kpa", None),
             "vpd_24h_sample_count": getattr(result, "vpd_sample_count", 0),
+            # v4.2 — time-weighted means for every rolling window.
+            "vpd_window_avgs_kpa": getattr(result, "vpd_window_avgs_kpa", {}),
             "rain_today_mm": result.weather.rain_today_mm,
             "rain_today_mm_effective": result.weather.effective_rain_today,
             "rain_forecast_24h_mm": result.weather.fc24_mm,
@@ -659,12 +660,16 @@ class TodayCalculationSensor(BaseGlobalSensor):
                     "factor": z.factor,
                     "l_per_mm": z.l_per_mm,
                     "need_mm": z.need_mm,
+                    # v4.2 — water-balance deficit included in need_mm
+                    "carryover_mm": z.carryover_mm,
                     "liters": z.liters,
                     "skipped": z.skipped,
                     "skip_reason": z.skip_reason,
                 }
                 for z in result.zones
             ],
+            # v4.2 — soil bucket depletion as of the last closed day.
+            "soil_depletion_mm": dict(self.mgr.water_balance.depletion),
         }
 
 
@@ -840,11 +845,18 @@ class SchedulesSensor(BaseGlobalSensor):
             mgr, "Z2M Irrigation Schedules",
             "z2m_irrigation_schedules",
         )
+        # v4.2 — serialized list reused until the store version changes.
+        self._cached_version: Optional[int] = None
+        self._cached: list = []
 
     def _all(self) -> list:
         if self.mgr.zone_store is None:
             return []
-        return self.mgr.zone_store.all_schedules()
+        snap = self.mgr.zone_store.snapshot()
+        if snap.version != self._cached_version:
+            self._cached = [sch.to_dict() for sch in snap.schedules]
+            self._cached_version = snap.version
+        return self._cached
 
     @property
     def native_value(self) -> int:
@@ -862,17 +874,18 @@ class ScheduleHistorySensor(BaseGlobalSensor):
     """v4.0-alpha-3 — `sensor.z2m_irrigation_schedule_history`.
 
     State = count of recorded schedule events in the retention window
-    (90 days by default, capped at HISTORY_MAX_ENTRIES). The `events`
-    attribute carries the most recent N events (most recent first), each
-    one a dict with `at`, `kind` (`fired`/`skipped`), `outcome`,
-    `schedule_name`, `mode`, `trigger`, `zones`, `total_liters`.
+    (90 days by default). The `events` attribute carries the most recent
+    N events (most recent first), each one a dict with `at`, `kind`
+    (`fired`/`skipped`), `outcome`, `schedule_name`, `mode`, `trigger`,
+    `zones`, `total_liters`.
 
     Powers the Insight tab's "what happened in the last 7 days" timeline.
 
     The sensor surfaces a clamped slice (most recent 100 events) in
-    attributes to keep the recorder happy — the full retained set lives
-    in the JSON store and can be read directly via the `zone_store` if
-    something ever needs more than 100.
+    attributes to keep the recorder happy. v4.2 — the full retained set
+    lives in the SQLite `irrigation_events` table and is paged via
+    `db.get_schedule_events(before_id=...)`. The slice and count are
+    re-read only when SIG_SCHEDULE_EVENT fires, never at render time.
     """
     _attr_icon = "mdi:history"
 
@@ -883,25 +896,52 @@ class ScheduleHistorySensor(BaseGlobalSensor):
             mgr, "Z2M Irrigation Schedule History",
             "z2m_irrigation_schedule_history",
         )
+        self._events: list = []
+        self._total: int = 0
+        self._unsub_events = None
 
-    def _all_events(self) -> list:
-        if self.mgr.zone_store is None:
-            return []
-        return self.mgr.zone_store.schedule_events()
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        await self._refresh()
+
+        async def _on_event():
+            await self._refresh()
+
+        self._unsub_events = async_dispatcher_connect(
+            self.hass, SIG_SCHEDULE_EVENT, _on_event,
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        if self._unsub_events:
+            self._unsub_events()
+            self._unsub_events = None
+
+    async def _refresh(self) -> None:
+        try:
+            self._events = await self.mgr.db.get_schedule_events(
+                limit=self._ATTR_LIMIT,
+            )
+            self._total = await self.mgr.db.count_schedule_events()
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(
+                "ScheduleHistorySensor refresh failed: %s", e,
+            )
+            self._events = []
+            self._total = 0
+        self.async_write_ha_state()
 
     @property
     def native_value(self) -> int:
-        return len(self._all_events())
+        return self._total
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        if self.mgr.zone_store is None:
-            return {"events": [], "total": 0}
-        events = self.mgr.zone_store.schedule_events(limit=self._ATTR_LIMIT)
         return {
-            "events": events,
-            "total": len(self._all_events()),
-            "shown": len(events),
+            "events": self._events,
+            "total": self._total,
+            "shown": len(self._events),
         }
 
 
@@ -909,9 +949,10 @@ class DailyTotalsSensor(BaseGlobalSensor):
     """v4.0-alpha-4 — `sensor.z2m_irrigation_daily_totals`.
 
     State = total liters delivered across all zones over the cached
-    window (default 30 days). The `days` attribute carries the
-    combined-across-zones daily series (most-recent first), and the
-    `zones` attribute carries the per-zone totals over the same window.
+    window (default 30 days). The `dates` / `liters` / `minutes` /
+    `sessions` attributes carry the combined-across-zones daily series
+    as parallel arrays (v4.2, most-recent first), and the `zones`
+    attribute carries the per-zone totals over the same window.
 
     The dashboard's Insight tab uses this for the "all zones" stacked
     bar chart at the top of the page; per-zone breakdowns come from
@@ -935,7 +976,7 @@ class DailyTotalsSensor(BaseGlobalSensor):
         summary = self.mgr.daily_summary
         if summary is None:
             return None
-        return round(sum(d.liters for d in summary.combined), 2)
+        return summary.combined.total_liters
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -946,18 +987,12 @@ class DailyTotalsSensor(BaseGlobalSensor):
             "available": True,
             "days_back": summary.days_back,
             "built_at": summary.built_at,
-            "total_liters": round(sum(d.liters for d in summary.combined), 2),
-            "total_minutes": round(sum(d.minutes for d in summary.combined), 2),
-            "total_sessions": sum(d.sessions for d in summary.combined),
-            "days": [
-                {
-                    "date": d.date,
-                    "liters": d.liters,
-                    "minutes": d.minutes,
-                    "sessions": d.sessions,
-                }
-                for d in summary.combined
-            ],
+            "total_liters": summary.combined.total_liters,
+            "total_minutes": summary.combined.total_minutes,
+            "total_sessions": summary.combined.total_sessions,
+            # v4.2 — columnar: `liters[i]` etc. belong to `dates[i]`.
+            "dates": summary.dates,
+            **summary.combined.columns(),
             "zones": [
                 {
                     "zone": z.zone,
@@ -1054,3 +1089,120 @@ class SessionLogSensor(BaseGlobalSensor):
             "sessions": self._sessions,
             "limit": self._LIMIT,
         }
+
+
+class WaterBudgetSensor(BaseGlobalSensor):
+    """v4.2 — `sensor.z2m_irrigation_water_budget`.
+
+    State = liters the enabled schedules are expected to deliver over
+    the next 7 days. The `days` attribute carries each day's weather
+    inputs and predicted runs (per-zone liters, or the skip outcome);
+    `zones` carries the per-zone totals over the whole window.
+
+    Reads the manager's `water_budget` cache (see `planner.py`), which
+    is rebuilt on the 15-min loop only when one of its inputs changed.
+    """
+    _attr_icon = "mdi:calendar-week"
+    _attr_native_unit_of_measurement = "L"
+
+    def __init__(self, mgr: ValveManager):
+        super().__init__(
+            mgr, "Z2M Irrigation Water Budget",
+            "z2m_irrigation_water_budget", "L",
+        )
+
+    @property
+    def native_value(self):
+        budget = self.mgr.water_budget
+        if budget is None:
+            return None
+        return budget.total_liters
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        budget = self.mgr.water_budget
+        if budget is None:
+            return {"available": False}
+        data = budget.to_dict()
+        return {
+            "available": True,
+            "built_at": data["built_at"],
+            "forecast_entity": data["forecast_entity"],
+            "days": data["days"],
+            "zones": data["zone_totals"],
+        }
+
+
+class _StorageDiagnosticSensor(BaseGlobalSensor):
+    """v4.2 — base for the database storage diagnostics.
+
+    Read `mgr.db_stats`, refreshed by the manager's maintenance check
+    (every MAINTENANCE_CHECK_MINUTES) and after each maintenance run.
+    """
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = "measurement"
+    _attr_icon = "mdi:database"
+
+    def _mib(self, key: str) -> Optional[float]:
+        value = self.mgr.db_stats.get(key)
+        return round(value / (1024 * 1024), 2) if value is not None else None
+
+
+class DatabaseSizeSensor(_StorageDiagnosticSensor):
+    """Main database file size; attributes carry the last maintenance run."""
+
+    def __init__(self, mgr: ValveManager):
+        super().__init__(
+            mgr, "Z2M Irrigation Database Size",
+            "z2m_irrigation_database_size", "MiB",
+        )
+
+    @property
+    def native_value(self):
+        return self._mib("db_bytes")
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        stats = self.mgr.db_stats
+        last = self.mgr.last_maintenance or {}
+        return {
+            "page_size": stats.get("page_size"),
+            "page_count": stats.get("page_count"),
+            "auto_vacuum": stats.get("auto_vacuum"),
+            "last_maintenance_seconds": last.get("seconds"),
+            "last_maintenance_freed_pages": last.get("freed_pages"),
+            "last_checkpoint": last.get("checkpoint"),
+        }
+
+
+class DatabaseWalSizeSensor(_StorageDiagnosticSensor):
+    """Write-ahead log file size (0 right after a TRUNCATE checkpoint)."""
+
+    def __init__(self, mgr: ValveManager):
+        super().__init__(
+            mgr, "Z2M Irrigation Database WAL Size",
+            "z2m_irrigation_database_wal_size", "MiB",
+        )
+
+    @property
+    def native_value(self):
+        return self._mib("wal_bytes")
+
+
+class DatabaseFragmentationSensor(_StorageDiagnosticSensor):
+    """Share of database pages on the freelist."""
+    _attr_icon = "mdi:database-refresh"
+
+    def __init__(self, mgr: ValveManager):
+        super().__init__(
+            mgr, "Z2M Irrigation Database Fragmentation",
+            "z2m_irrigation_database_fragmentation", "%",
+        )
+
+    @property
+    def native_value(self):
+        return self.mgr.db_stats.get("fragmentation_pct")
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        return {"freelist_count": self.mgr.db_stats.get("freelist_count")}
@@ -0,0 +1,186 @@
+"""Time-weighted rolling VPD averages.
+
+v4.2 — replaces the equal-weight deque mean in `ValveManager`. The old
+`vpd_24h_average` summed every buffered sample on each access and
+weighted a burst of readings the same as one reading held for hours.
+
+`RollingVpdWindows` treats the signal as sample-and-hold: each reading
+is the VPD until the next one arrives. For every configured window it
+keeps a running integral of the closed segments, so adding a sample is
+O(1) amortized (each sample is evicted at most once per window) and a
+mean is O(1). All windows share one pair of `array('d')` columns —
+timestamps and values — sized by the widest window.
+
+Timestamps are `time.monotonic()` seconds. For persistence the buffer
+is exported as a compact snapshot anchored to wall-clock time:
+
+    {"v": 1, "t0": <epoch s>, "dt": [offsets from t0, s], "vpd": [kPa]}
+
+which is a fraction of the size of the pre-v4.2 list of ISO-stamped
+dicts (still accepted by `load_snapshot` for upgrades).
+
+Pure data, no Home Assistant imports — unit-testable in isolation.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+SNAPSHOT_VERSION = 1
+
+# Compact the backing arrays once this many leading samples have aged
+# out of every window (and they make up at least half the buffer).
+_COMPACT_MIN = 64
+
+
+class RollingVpdWindows:
+    """Time-weighted means over several trailing windows at once."""
+
+    def __init__(self, windows_s: Iterable[float]) -> None:
+        self.windows_s = tuple(sorted({float(w) for w in windows_s}))
+        if not self.windows_s:
+            raise ValueError("at least one window is required")
+        self._ts = array("d")
+        self._vals = array("d")
+        # Per window: index of the oldest sample whose hold segment still
+        # overlaps the window, and the integral of closed segments from
+        # that sample up to the newest one.
+        self._heads = [0] * len(self.windows_s)
+        self._areas = [0.0] * len(self.windows_s)
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    # ─────────────────────────────────────────────────────────────────
+    # Ingest
+    # ─────────────────────────────────────────────────────────────────
+
+    def add(self, ts: float, value: float) -> None:
+        """Append one reading. Out-of-order readings are ignored."""
+        ts = float(ts)
+        value = float(value)
+        if self._ts:
+            last_t = self._ts[-1]
+            if ts < last_t:
+                return
+            if ts == last_t:
+                # Same instant — latest reading wins, no area to add.
+                self._vals[-1] = value
+                return
+            seg = self._vals[-1] * (ts - last_t)
+            for k in range(len(self._areas)):
+                self._areas[k] += seg
+        self._ts.append(ts)
+        self._vals.append(value)
+        self._evict(ts)
+
+    def _evict(self, now: float) -> None:
+        ts, vals = self._ts, self._vals
+        n = len(ts)
+        for k, window in enumerate(self.windows_s):
+            cutoff = now - window
+            h = self._heads[k]
+            while h + 1 < n and ts[h + 1] <= cutoff:
+                self._areas[k] -= vals[h] * (ts[h + 1] - ts[h])
+                h += 1
+            self._heads[k] = h
+        # The widest window (last) has the smallest head.
+        drop = self._heads[-1]
+        if drop >= _COMPACT_MIN and drop * 2 >= n:
+            del ts[:drop]
+            del vals[:drop]
+            self._heads = [h - drop for h in self._heads]
+
+    # ─────────────────────────────────────────────────────────────────
+    # Query
+    # ─────────────────────────────────────────────────────────────────
+
+    def mean(self, window_s: float, now: float) -> Optional[float]:
+        """Time-weighted mean over `[now - window_s, now]`, or None if empty.
+
+        With a single sample (or if `now` equals the newest sample) the
+        mean is just the newest value.
+        """
+        if not self._ts:
+            return None
+        k = self.windows_s.index(float(window_s))
+        self._evict(now)
+        h = self._heads[k]
+        ts, vals = self._ts, self._vals
+        cutoff = now - window_s
+        start = max(cutoff, ts[h])
+        span = now - start
+        if span <= 0:
+            return vals[-1]
+        area = (
+            self._areas[k]
+            + vals[-1] * (now - ts[-1])
+            - vals[h] * max(0.0, cutoff - ts[h])
+        )
+        return area / span
+
+    def count(self, window_s: float, now: float) -> int:
+        """Number of readings contributing to the window's mean."""
+        if not self._ts:
+            return 0
+        k = self.windows_s.index(float(window_s))
+        self._evict(now)
+        return len(self._ts) - self._heads[k]
+
+    # ─────────────────────────────────────────────────────────────────
+    # Persistence
+    # ─────────────────────────────────────────────────────────────────
+
+    def to_snapshot(self, mono_now: float, wall_now: float) -> Optional[Dict[str, Any]]:
+        """Export readings inside the widest window, wall-clock anchored."""
+        if not self._ts:
+            return None
+        self._evict(mono_now)
+        h = self._heads[-1]
+        offset = wall_now - mono_now
+        t0 = self._ts[h] + offset
+        return {
+            "v": SNAPSHOT_VERSION,
+            "t0": round(t0, 3),
+            "dt": [round(t + offset - t0, 1) for t in self._ts[h:]],
+            "vpd": [round(v, 4) for v in self._vals[h:]],
+        }
+
+    def load_snapshot(self, data: Any, mono_now: float, wall_now: float) -> int:
+        """Re-populate from `to_snapshot` output or the legacy ISO list.
+
+        Readings older than the widest window are dropped, except the
+        newest of them, which still holds at the window's start. Returns
+        the number of readings loaded.
+        """
+        walls: List[float] = []
+        values: List[float] = []
+        if isinstance(data, dict) and data.get("v") == SNAPSHOT_VERSION:
+            t0 = float(data.get("t0", 0.0))
+            for dt, v in zip(data.get("dt") or [], data.get("vpd") or []):
+                walls.append(t0 + float(dt))
+                values.append(float(v))
+        elif isinstance(data, list):
+            # Pre-v4.2: [{"at": ISO, "vpd_kpa": float}, ...]
+            for entry in data:
+                try:
+                    at = datetime.fromisoformat(
+                        str(entry.get("at", "")).replace("Z", "+00:00")
+                    )
+                    walls.append(at.timestamp())
+                    values.append(float(entry.get("vpd_kpa", 0)))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+        cutoff = wall_now - self.windows_s[-1]
+        offset = wall_now - mono_now
+        pairs = sorted(p for p in zip(walls, values) if p[0] <= wall_now)
+        first = 0
+        while first + 1 < len(pairs) and pairs[first + 1][0] <= cutoff:
+            first += 1
+        if pairs and pairs[first][0] < cutoff and first + 1 == len(pairs):
+            first += 1  # only stale readings — nothing overlaps the window
+        for wall, v in pairs[first:]:
+            self.add(wall - offset, v)
+        return len(pairs) - first
@@ -0,0 +1,167 @@
+"""Per-zone soil water balance.
+
+v4.2 — gives the smart calculator a memory across days. Each zone keeps
+a soil-moisture "bucket" expressed as a depletion in mm (0 = field
+capacity). When a local day closes, every zone is updated once:
+
+    depletion = clamp(depletion + demand - rain - irrigation, 0, cap)
+
+    demand     = base_mm × dryness   (the calculator's daily demand term,
+                                      dryness from the 24h mean VPD)
+    rain       = the day's rain-today reading (largest value observed)
+    irrigation = delivered liters / (factor × l_per_mm)
+    cap        = WATER_BALANCE_MAX_DEFICIT_DAYS × base_mm
+
+so the update is O(1) per zone per day and nothing is replayed. Rain
+beyond field capacity drains (the bucket never goes negative).
+
+Today's smart need then draws on the bucket: the carried depletion,
+less what was already delivered today, is added to the calculator's
+`base_mm × dryness − rain − 0.7 × forecast` (see `compute`'s
+`carryover_mm`). With a full bucket and nothing delivered yet the
+result is exactly the pre-v4.2 number.
+
+Persisted as a compact snapshot:
+
+    {"v": 1, "date": "YYYY-MM-DD", "rain": mm, "d": {zone: depletion_mm}}
+
+where `date` is the open (not yet closed) day. Pure data, no Home
+Assistant imports.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from .calculator import compute_dryness
+from .const import WATER_BALANCE_MAX_CATCHUP_DAYS, WATER_BALANCE_MAX_DEFICIT_DAYS
+from .zone_store import ZoneConfig
+
+SNAPSHOT_VERSION = 1
+
+
+def liters_to_mm(liters: float, cfg: ZoneConfig) -> float:
+    """Invert the calculator's `liters = mm × factor × l_per_mm`."""
+    scale = float(cfg.factor) * float(cfg.l_per_mm)
+    return float(liters) / scale if scale > 0 else 0.0
+
+
+class WaterBalance:
+    """Running depletion per zone plus the open day's rain observation."""
+
+    def __init__(self) -> None:
+        self.day: Optional[date] = None
+        self.rain_mm: float = 0.0
+        self.depletion: Dict[str, float] = {}
+
+    # ─────────────────────────────────────────────────────────────────
+    # Daily update
+    # ─────────────────────────────────────────────────────────────────
+
+    def observe_rain(self, rain_mm: Optional[float]) -> bool:
+        """Record a rain-today reading for the open day. Returns True if
+        the stored value changed (rain-today sensors only grow within a
+        day, so the largest reading wins)."""
+        if rain_mm is None or rain_mm <= self.rain_mm:
+            return False
+        self.rain_mm = float(rain_mm)
+        return True
+
+    def close_day(
+        self,
+        zones: Mapping[str, ZoneConfig],
+        dryness: float,
+        rain_mm: float,
+        delivered_liters: Mapping[str, float],
+    ) -> None:
+        """Apply one day's demand, rain and irrigation to every zone."""
+        for name, cfg in zones.items():
+            cap = WATER_BALANCE_MAX_DEFICIT_DAYS * float(cfg.base_mm)
+            d = (
+                self.depletion.get(name, 0.0)
+                + float(cfg.base_mm) * dryness
+                - rain_mm
+                - liters_to_mm(delivered_liters.get(name, 0.0), cfg)
+            )
+            self.depletion[name] = round(min(cap, max(0.0, d)), 3)
+        for name in [n for n in self.depletion if n not in zones]:
+            del self.depletion[name]
+
+    def roll(
+        self,
+        today: date,
+        zones: Mapping[str, ZoneConfig],
+        vpd_kpa: float,
+        delivered_for: Callable[[date], Mapping[str, float]],
+    ) -> int:
+        """Close every day before `today` that is still open.
+
+        The first closed day uses the observed rain; any further missed
+        days (HA was down) assume no rain. `vpd_kpa` — the 24h mean at
+        the time of the call — stands in for each closed day's VPD.
+        Returns the number of days closed.
+        """
+        if self.day is None:
+            self.day = today
+            return 0
+        if today <= self.day:
+            return 0
+        first = max(self.day, today - timedelta(days=WATER_BALANCE_MAX_CATCHUP_DAYS))
+        dryness = compute_dryness(vpd_kpa)
+        closed = 0
+        d = first
+        while d < today:
+            rain = self.rain_mm if d == self.day else 0.0
+            self.close_day(zones, dryness, rain, delivered_for(d))
+            closed += 1
+            d += timedelta(days=1)
+        self.day = today
+        self.rain_mm = 0.0
+        return closed
+
+    def carryover(
+        self,
+        zones: Mapping[str, ZoneConfig],
+        delivered_today: Mapping[str, float],
+    ) -> Dict[str, float]:
+        """Per-zone mm to add to today's need (may be negative when more
+        than the carried deficit has already been delivered today)."""
+        return {
+            name: round(
+                self.depletion.get(name, 0.0)
+                - liters_to_mm(delivered_today.get(name, 0.0), cfg),
+                3,
+            )
+            for name, cfg in zones.items()
+        }
+
+    # ─────────────────────────────────────────────────────────────────
+    # Persistence
+    # ─────────────────────────────────────────────────────────────────
+
+    def to_snapshot(self) -> Optional[Dict[str, Any]]:
+        if self.day is None:
+            return None
+        return {
+            "v": SNAPSHOT_VERSION,
+            "date": self.day.isoformat(),
+            "rain": round(self.rain_mm, 2),
+            "d": dict(self.depletion),
+        }
+
+    def load_snapshot(self, data: Any) -> bool:
+        if not isinstance(data, dict) or data.get("v") != SNAPSHOT_VERSION:
+            return False
+        try:
+            self.day = date.fromisoformat(str(data["date"]))
+            self.rain_mm = float(data.get("rain", 0.0))
+            self.depletion = {
+                str(k): float(v) for k, v in (data.get("d") or {}).items()
+            }
+        except (KeyError, TypeError, ValueError):
+            self.day = None
+            self.rain_mm = 0.0
+            self.depletion = {}
+            return False
+        return True
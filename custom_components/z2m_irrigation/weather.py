@@ -15,6 +15,10 @@ over-watering. The new conversion path reads each entity's
 factor before handing the value to the calculator. Unknown units are
 passed through with a warning so the user is told what to fix.
 
+v4.2 — the unit → multiplier resolution is cached per entity and only
+redone when the entity's `unit_of_measurement` changes; warnings about
+missing or unknown units are logged once per entity/unit.
+
 The integration ships with no built-in weather provider — the user
 wires in whatever they already have (BoM, OpenWeatherMap, Ecowitt,
 AccuWeather, a custom template helper, etc.). This keeps v4.0
@@ -25,7 +29,7 @@ choice of units.
 from __future__ import annotations
 
 import logging
-from typing import Mapping, Optional
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from homeassistant.core import HomeAssistant
 
@@ -93,10 +97,57 @@ def _normalize_unit(unit: Optional[str]) -> str:
     return str(unit).strip().lower()
 
 
+# v4.2 — resolved multiplier per (entity_id, target unit), together with
+# the raw `unit_of_measurement` it was resolved for. A read only redoes
+# the normalize + table lookup (and its warning) when that attribute
+# changes, so a stuck unknown unit warns once, not on every refresh.
+_RESOLVED: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+
+
+def _resolve_multiplier(
+    entity_id: str,
+    unit_attr: Any,
+    table: Mapping[str, float],
+    target_label: str,
+) -> float:
+    """Cached unit → multiplier lookup; pass-through (×1) on unknown unit."""
+    key = (entity_id, target_label)
+    cached = _RESOLVED.get(key)
+    if cached is not None and cached[0] == unit_attr:
+        return cached[1]
+
+    unit = _normalize_unit(unit_attr)
+    if not unit:
+        # Sensor reports no unit at all — pass through and warn once.
+        _LOGGER.warning(
+            "weather: %s reports no unit_of_measurement — assuming target "
+            "unit %s. Set the unit on the source sensor or use a template "
+            "to convert.",
+            entity_id, target_label,
+        )
+        multiplier = 1.0
+    elif unit not in table:
+        _LOGGER.warning(
+            "weather: %s reports unknown unit %r — passing value through "
+            "unchanged. Add the unit to the conversion table in weather.py "
+            "or use a template sensor to convert to %s.",
+            entity_id, unit, target_label,
+        )
+        multiplier = 1.0
+    else:
+        multiplier = table[unit]
+        _LOGGER.debug(
+            "weather: %s unit %s → %s (×%s)",
+            entity_id, unit, target_label, multiplier,
+        )
+    _RESOLVED[key] = (unit_attr, multiplier)
+    return multiplier
+
+
 def _read_float_raw(
     hass: HomeAssistant, entity_id: Optional[str]
-) -> Optional[tuple[float, str]]:
-    """Read (numeric_state, normalized_unit) or None if unavailable.
+) -> Optional[tuple[float, Any]]:
+    """Read (numeric_state, raw unit_of_measurement) or None if unavailable.
 
     Pulled out so the unit-aware conversion path and the legacy
     pass-through (`_read_float`) can share the parsing + null-handling.
@@ -118,75 +169,35 @@ def _read_float_raw(
             entity_id, state.state,
         )
         return None
-    unit = (state.attributes or {}).get("unit_of_measurement", "")
-    return value, _normalize_unit(unit)
+    return value, (state.attributes or {}).get("unit_of_measurement")
 
 
-def _convert_via_table(
+def _read_converted(
+    hass: HomeAssistant,
     entity_id: Optional[str],
-    parsed: Optional[tuple[float, str]],
     table: Mapping[str, float],
     target_label: str,
 ) -> Optional[float]:
-    """Apply a conversion table; pass through with a warning on unknown unit.
-
-    Logs are deduplicated per entity_id + unit pair via the standard
-    `_LOGGER.warning` mechanism — HA's logger collapses duplicates
-    naturally, so a stuck unknown unit only warns on first sight per
-    integration restart, not on every 15-min refresh.
-    """
+    """Read an entity and scale it to `target_label` via `table`."""
+    parsed = _read_float_raw(hass, entity_id)
     if parsed is None:
         return None
-    value, unit = parsed
-    if not unit:
-        # Sensor reports no unit at all — pass through and warn ONCE.
-        _LOGGER.warning(
-            "weather: %s reports no unit_of_measurement — assuming target "
-            "unit %s. Set the unit on the source sensor or use a template "
-            "to convert.",
-            entity_id, target_label,
-        )
-        return value
-    multiplier = table.get(unit)
-    if multiplier is None:
-        _LOGGER.warning(
-            "weather: %s reports unknown unit %r — passing value through "
-            "unchanged. Add the unit to the conversion table in weather.py "
-            "or use a template sensor to convert to %s.",
-            entity_id, unit, target_label,
-        )
-        return value
-    converted = value * multiplier
-    if multiplier != 1.0:
-        _LOGGER.debug(
-            "weather: %s %s %s → %s %s (×%s)",
-            entity_id, value, unit, converted, target_label, multiplier,
-        )
-    return converted
+    value, unit_attr = parsed
+    return value * _resolve_multiplier(entity_id, unit_attr, table, target_label)
 
 
 def _read_pressure_kpa(
     hass: HomeAssistant, entity_id: Optional[str]
 ) -> Optional[float]:
     """Read a pressure entity and convert to kPa via the unit table."""
-    return _convert_via_table(
-        entity_id,
-        _read_float_raw(hass, entity_id),
-        _PRESSURE_TO_KPA,
-        "kPa",
-    )
+    return _read_converted(hass, entity_id, _PRESSURE_TO_KPA, "kPa")
 
 
 def _read_length_mm(
     hass: HomeAssistant, entity_id: Optional[str]
 ) -> Optional[float]:
     """Read a length/rain entity and convert to mm via the unit table."""
-    return _convert_via_table(
-        entity_id,
-        _read_float_raw(hass, entity_id),
-        _LENGTH_TO_MM,
-        "mm",
-    )
+    return _read_converted(hass, entity_id, _LENGTH_TO_MM, "mm")
 
 
 def _read_float(hass: HomeAssistant, entity_id: Optional[str]) -> Optional[float]:
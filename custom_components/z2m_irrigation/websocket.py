@@ -1,34 +1,92 @@
 """WebSocket API for Z2M Irrigation."""
 import logging
-from typing import Any
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
 
 import voluptuous as vol
 
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
 
-from .const import DOMAIN
+from . import live
+from .aggregator import USAGE_RESOLUTIONS
+from .downsample import METHODS as DOWNSAMPLE_METHODS
+from .const import (
+    DOMAIN,
+    LIVE_DEFAULT_MAX_RATE,
+    LIVE_MAX_RATE,
+    LIVE_MIN_RATE,
+    SERIES_DEFAULT_POINTS,
+    SERIES_MAX_POINTS,
+    SESSIONS_DELETE_MAX,
+    SESSIONS_PAGE_DEFAULT,
+    SESSIONS_PAGE_MAX,
+    SIG_GLOBAL_UPDATE,
+    SIG_NEW_VALVE,
+    SIG_PANIC_STATE,
+    SIMULATE_MAX_SCENARIOS,
+    sig_update,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 @callback
 def async_register_websocket_handlers(hass: HomeAssistant):
-    """Register WebSocket API handlers."""
+    """Register WebSocket API handlers.
+
+    v4.2 — called once from `async_setup` (commands are domain-wide and
+    resolve the manager per call). The schedule timeline is served by
+    the Insight sensors, not over the websocket.
+    """
     websocket_api.async_register_command(hass, handle_list_sessions)
     websocket_api.async_register_command(hass, handle_delete_session)
     websocket_api.async_register_command(hass, handle_clear_sessions)
-    websocket_api.async_register_command(hass, handle_list_schedules)
-    websocket_api.async_register_command(hass, handle_get_schedule)
-    websocket_api.async_register_command(hass, handle_list_schedule_runs)
+    websocket_api.async_register_command(hass, handle_simulate)
+    websocket_api.async_register_command(hass, handle_water_budget)
+    websocket_api.async_register_command(hass, handle_usage)
+    websocket_api.async_register_command(hass, handle_subscribe)
+    websocket_api.async_register_command(hass, handle_snapshot)
+    websocket_api.async_register_command(hass, handle_series)
+
+
+# v4.2 — filters shared by `sessions/list` and `sessions/clear`. Dates are
+# local ISO dates (inclusive) on the session's end time; `trigger_type`
+# matches exactly or as the kind of `schedule_smart:<id>`-style values,
+# `schedule_ids` the part after the colon.
+_SESSION_FILTERS = {
+    vol.Optional("valves"): [str],
+    vol.Optional("start_date"): str,
+    vol.Optional("end_date"): str,
+    vol.Optional("trigger_types"): [str],
+    vol.Optional("success"): bool,
+    vol.Optional("schedule_ids"): [str],
+}
+
+
+def _session_filter_args(msg: dict[str, Any]) -> dict[str, Any]:
+    """Websocket filter keys → manager kwargs. Raises ValueError."""
+    return {
+        "valves": msg.get("valves") or None,
+        "start": date.fromisoformat(msg["start_date"]) if "start_date" in msg else None,
+        "end": date.fromisoformat(msg["end_date"]) if "end_date" in msg else None,
+        "trigger_types": msg.get("trigger_types") or None,
+        "success": msg.get("success"),
+        "schedule_ids": msg.get("schedule_ids") or None,
+    }
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "z2m_irrigation/sessions/list",
-        vol.Optional("valve_filter"): str,
-        vol.Optional("start_date"): str,
-        vol.Optional("end_date"): str,
+        vol.Optional("limit", default=SESSIONS_PAGE_DEFAULT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=SESSIONS_PAGE_MAX),
+        ),
+        vol.Optional("cursor"): vol.Any(None, str),
+        **_SESSION_FILTERS,
     }
 )
 @websocket_api.async_response
@@ -37,118 +95,371 @@ async def handle_list_sessions(
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle list sessions command."""
-    valve_filter = msg.get("valve_filter")
-    start_date = msg.get("start_date")
-    end_date = msg.get("end_date")
-
-    all_sessions = []
-    for entry_id, data in hass.data[DOMAIN].items():
-        if isinstance(data, dict) and "manager" in data:
-            sessions = data["manager"].get_sessions(valve_filter, start_date, end_date)
-            all_sessions.extend(sessions)
-
-    all_sessions.sort(key=lambda x: x["start"], reverse=True)
+    """v4.2 — one page of completed sessions, newest first.
 
-    connection.send_result(msg["id"], {"sessions": all_sessions})
+    Reply: {"sessions": [...], "next_cursor": str | None}. Send
+    `next_cursor` back as `cursor` for the next (older) page.
+    """
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    try:
+        result = await mgr.async_list_sessions(
+            msg["limit"], cursor=msg.get("cursor"), **_session_filter_args(msg),
+        )
+    except ValueError as e:
+        connection.send_error(msg["id"], "invalid_format", str(e))
+        return
+    connection.send_result(msg["id"], result)
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "z2m_irrigation/sessions/delete",
-        vol.Required("session_id"): str,
+        vol.Required("session_ids"): vol.All(
+            [str], vol.Length(min=1, max=SESSIONS_DELETE_MAX),
+        ),
     }
 )
+@websocket_api.require_admin
 @websocket_api.async_response
 async def handle_delete_session(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle delete session command."""
-    session_id = msg["session_id"]
-
-    for entry_id, data in hass.data[DOMAIN].items():
-        if isinstance(data, dict) and "manager" in data:
-            await data["manager"].delete_session(session_id)
-
-    connection.send_result(msg["id"], {"success": True})
+    """v4.2 — bulk delete completed sessions by `session_id`."""
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    deleted = await mgr.async_delete_sessions(msg["session_ids"])
+    connection.send_result(msg["id"], {"deleted": deleted})
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "z2m_irrigation/sessions/clear",
+        **_SESSION_FILTERS,
     }
 )
+@websocket_api.require_admin
 @websocket_api.async_response
 async def handle_clear_sessions(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle clear all sessions command."""
-    for entry_id, data in hass.data[DOMAIN].items():
+    """v4.2 — delete every completed session matching the filters
+    (all of them when no filter is given)."""
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    try:
+        deleted = await mgr.async_clear_sessions(**_session_filter_args(msg))
+    except ValueError as e:
+        connection.send_error(msg["id"], "invalid_format", str(e))
+        return
+    connection.send_result(msg["id"], {"deleted": deleted})
+
+
+def _first_manager(hass: HomeAssistant):
+    """Return the ValveManager of the (single) loaded config entry, if any."""
+    for data in hass.data.get(DOMAIN, {}).values():
         if isinstance(data, dict) and "manager" in data:
-            await data["manager"].clear_sessions()
+            return data["manager"]
+    return None
 
-    connection.send_result(msg["id"], {"success": True})
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "z2m_irrigation/simulate",
+        vol.Required("scenarios"): vol.All(
+            [
+                {
+                    vol.Optional("vpd_kpa"): vol.Any(None, vol.Coerce(float)),
+                    vol.Optional("rain_today_mm"): vol.Any(None, vol.Coerce(float)),
+                    vol.Optional("rain_forecast_24h_mm"): vol.Any(None, vol.Coerce(float)),
+                }
+            ],
+            vol.Length(min=1, max=SIMULATE_MAX_SCENARIOS),
+        ),
+        vol.Optional("zones"): [str],
+        vol.Optional("global_min_run_liters"): vol.Coerce(float),
+    }
+)
+@websocket_api.async_response
+async def handle_simulate(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+):
+    """v4.2 — evaluate the calculator over a batch of what-if scenarios."""
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    result = await mgr.async_simulate(
+        msg["scenarios"],
+        zones=msg.get("zones") or None,
+        global_min_run_liters=msg.get("global_min_run_liters"),
+    )
+    connection.send_result(msg["id"], result)
 
 
 @websocket_api.websocket_command(
     {
-        vol.Required("type"): "z2m_irrigation/schedules/list",
+        vol.Required("type"): "z2m_irrigation/water_budget",
+        vol.Optional("refresh", default=False): bool,
     }
 )
 @websocket_api.async_response
-async def handle_list_schedules(
+async def handle_water_budget(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle list schedules command."""
-    # Scheduler disabled in v3.0.0 - always return empty list
-    all_schedules = []
-    _LOGGER.warning("Schedules not available - scheduler disabled in v3.0.0")
-    connection.send_result(msg["id"], {"schedules": all_schedules})
+    """v4.2 — the cached 7-day water budget (`refresh` re-fetches the forecast)."""
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    budget = await mgr.refresh_water_budget(force=msg["refresh"])
+    connection.send_result(msg["id"], budget.to_dict() if budget is not None else None)
 
 
 @websocket_api.websocket_command(
     {
-        vol.Required("type"): "z2m_irrigation/schedules/get",
-        vol.Required("schedule_id"): str,
+        vol.Required("type"): "z2m_irrigation/usage",
+        vol.Required("resolution"): vol.In(USAGE_RESOLUTIONS),
+        vol.Optional("start"): str,
+        vol.Optional("end"): str,
     }
 )
 @websocket_api.async_response
-async def handle_get_schedule(
+async def handle_usage(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle get schedule command."""
-    schedule_id = msg["schedule_id"]
-    # Scheduler disabled in v3.0.0
-    _LOGGER.warning(f"Schedule {schedule_id} not available - scheduler disabled in v3.0.0")
-    connection.send_error(msg["id"], "not_found", "Scheduler disabled in v3.0.0")
+    """v4.2 — usage buckets (day / ISO week / month / year) for the Insight tab.
+
+    `start` / `end` are local ISO dates. The reply is columnar: a
+    `periods` axis, per-zone `liters` / `minutes` / `sessions` arrays
+    and a `combined` series.
+    """
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    try:
+        start = date.fromisoformat(msg["start"]) if "start" in msg else None
+        end = date.fromisoformat(msg["end"]) if "end" in msg else None
+        result = await mgr.async_usage_series(msg["resolution"], start, end)
+    except ValueError as e:
+        connection.send_error(msg["id"], "invalid_format", str(e))
+        return
+    connection.send_result(msg["id"], result)
 
 
 @websocket_api.websocket_command(
     {
-        vol.Required("type"): "z2m_irrigation/schedules/runs",
-        vol.Optional("schedule_id"): str,
-        vol.Optional("limit"): int,
+        vol.Required("type"): "z2m_irrigation/series",
+        vol.Required("series"): vol.In(("flow_trace", "daily_usage")),
+        vol.Optional("points", default=SERIES_DEFAULT_POINTS): vol.All(
+            int, vol.Range(min=2, max=SERIES_MAX_POINTS),
+        ),
+        vol.Optional("method", default="lttb"): vol.In(DOWNSAMPLE_METHODS),
+        vol.Optional("session_id"): str,
+        vol.Optional("valve"): str,
+        vol.Optional("start"): str,
+        vol.Optional("end"): str,
+        vol.Optional("metric", default="liters"): vol.In(
+            ("liters", "minutes", "sessions"),
+        ),
     }
 )
 @websocket_api.async_response
-async def handle_list_schedule_runs(
+async def handle_series(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+):
+    """v4.2 — a stored series downsampled server-side.
+
+    `flow_trace` needs `session_id`; `daily_usage` takes an optional
+    `valve` (default: all valves) and local ISO `start` / `end`. The
+    reply is columnar: {"series", "method", "source_points", "x", "y"}
+    with at most `points` points (LTTB or per-bucket min/max).
+    """
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    try:
+        result = await mgr.async_series(
+            msg["series"],
+            msg["points"],
+            method=msg["method"],
+            session_id=msg.get("session_id"),
+            valve=msg.get("valve"),
+            start=date.fromisoformat(msg["start"]) if "start" in msg else None,
+            end=date.fromisoformat(msg["end"]) if "end" in msg else None,
+            metric=msg["metric"],
+        )
+    except ValueError as e:
+        connection.send_error(msg["id"], "invalid_format", str(e))
+        return
+    connection.send_result(msg["id"], result)
+
+
+class _LiveSubscription:
+    """v4.2 — one `z2m_irrigation/subscribe` stream.
+
+    Listens to the manager's own dispatcher signals (per-valve updates,
+    new valves, global updates such as queue advances, panic). Any
+    signal marks the stream dirty; a flush is sent at most once per
+    `min_interval` seconds and carries `live.diff` of the last sent
+    state, so a burst of MQTT reports becomes one message — or none when
+    nothing visible changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        mgr,
+        min_interval: float,
+    ) -> None:
+        self.hass = hass
+        self.connection = connection
+        self.msg_id = msg_id
+        self.mgr = mgr
+        self.min_interval = min_interval
+        self._sent: Optional[Dict[str, Any]] = None
+        self._last_flush = 0.0
+        self._seq = 0
+        self._timer: Optional[Callable[[], None]] = None
+        self._unsubs: List[Callable[[], None]] = []
+
+    @callback
+    def start(self) -> None:
+        for signal in (SIG_GLOBAL_UPDATE, SIG_PANIC_STATE):
+            self._unsubs.append(
+                async_dispatcher_connect(self.hass, signal, self._on_signal)
+            )
+        self._unsubs.append(
+            async_dispatcher_connect(self.hass, SIG_NEW_VALVE, self._on_new_valve)
+        )
+        for topic in list(self.mgr.valves):
+            self._watch(topic)
+        self._flush()
+
+    @callback
+    def _watch(self, topic: str) -> None:
+        self._unsubs.append(
+            async_dispatcher_connect(self.hass, sig_update(topic), self._on_signal)
+        )
+
+    @callback
+    def _on_new_valve(self, valve) -> None:
+        self._watch(valve.topic)
+        self._on_signal()
+
+    @callback
+    def _on_signal(self, *_args) -> None:
+        if self._timer is not None:
+            return  # a flush is already scheduled; it will see this change
+        wait = self._last_flush + self.min_interval - time.monotonic()
+        if wait <= 0:
+            self._flush()
+        else:
+            self._timer = async_call_later(self.hass, wait, self._on_timer)
+
+    @callback
+    def _on_timer(self, _now) -> None:
+        self._timer = None
+        self._flush()
+
+    @callback
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        state = live.live_state(self.mgr)
+        delta = live.diff(self._sent, state)
+        if not delta:
+            return
+        self._seq += 1
+        self.connection.send_message(websocket_api.event_message(
+            self.msg_id,
+            {"seq": self._seq, "full": self._sent is None, **delta},
+        ))
+        self._sent = state
+
+    @callback
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+        while self._unsubs:
+            self._unsubs.pop()()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "z2m_irrigation/subscribe",
+        vol.Optional("max_rate", default=LIVE_DEFAULT_MAX_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=LIVE_MIN_RATE, max=LIVE_MAX_RATE),
+        ),
+    }
+)
+@callback
+def handle_subscribe(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: dict[str, Any],
 ):
-    """Handle list schedule runs command."""
-    schedule_id = msg.get("schedule_id")
-    limit = msg.get("limit", 50)
-
-    # Scheduler disabled in v3.0.0 - always return empty list
-    all_runs = []
-    _LOGGER.warning("Schedule runs not available - scheduler disabled in v3.0.0")
-    connection.send_result(msg["id"], {"runs": all_runs})
+    """v4.2 — stream live valve / queue / panic state as compact diffs.
+
+    The first event (`full: true`) carries the whole model (see
+    `live.py`); later events only what changed, at most `max_rate`
+    per second. `seq` increments per event.
+    """
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    sub = _LiveSubscription(hass, connection, msg["id"], mgr, 1.0 / msg["max_rate"])
+    connection.subscriptions[msg["id"]] = sub.close
+    connection.send_result(msg["id"])
+    sub.start()
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "z2m_irrigation/snapshot",
+        vol.Optional("etag"): vol.Any(None, str),
+    }
+)
+@callback
+def handle_snapshot(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+):
+    """v4.2 — the whole dashboard model in one reply (see `model.py`).
+
+    Reply: {"etag", "payload"}; when the client's `etag` still matches,
+    {"etag", "unchanged": true} without the payload.
+    """
+    mgr = _first_manager(hass)
+    if mgr is None:
+        connection.send_error(msg["id"], "not_loaded", "Integration not loaded")
+        return
+    etag, payload = mgr.dashboard_snapshot()
+    if msg.get("etag") == etag:
+        connection.send_result(msg["id"], {"etag": etag, "unchanged": True})
+        return
+    connection.send_result(msg["id"], {"etag": etag, "unchanged": False, "payload": payload})
@@ -15,15 +15,27 @@ that the migration path stays at version 1 when alpha-2 lands.
 
 Storage location: `.storage/z2m_irrigation.<entry_id>` — per config entry,
 so a hypothetical second instance of the integration would not collide.
+
+v4.2 — the config document now holds only `zones` and `schedules`. The
+high-churn caches (`vpd_buffer`, `daily_summary`, `history`) each live in
+their own Store document (`z2m_irrigation.<entry_id>.<name>`), are loaded
+lazily on first access, and are written with a short coalescing delay.
+A legacy single-blob store is split on first load.
+
+v4.2 — readers get typed zone/schedule objects from an immutable
+`ConfigSnapshot`, rebuilt lazily after a mutation and stamped with a
+monotonically increasing `version` so consumers can skip work when
+nothing changed.
 """
 
 from __future__ import annotations
 
 import logging
 import secrets
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.storage import Store
@@ -31,12 +43,16 @@ from homeassistant.helpers.storage import Store
 from .const import (
     STORE_VERSION,
     STORE_KEY_PREFIX,
+    STORE_CACHE_VERSION,
+    STORE_CACHE_VPD_BUFFER,
+    STORE_CACHE_DAILY_SUMMARY,
+    STORE_CACHE_HISTORY,
+    STORE_CACHE_WATER_BALANCE,
+    STORE_CACHE_SAVE_DELAY_SECONDS,
     DEFAULT_ZONE_FACTOR,
     DEFAULT_ZONE_L_PER_MM,
     DEFAULT_ZONE_BASE_MM,
     DEFAULT_ZONE_IN_SMART_CYCLE,
-    HISTORY_RETENTION_DAYS,
-    HISTORY_MAX_ENTRIES,
     SCHEDULE_MODE_SMART,
     SCHEDULE_MODE_FIXED,
     DAYS_OF_WEEK,
@@ -45,7 +61,7 @@ from .const import (
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Schedule:
     """A user-defined irrigation schedule.
 
@@ -65,14 +81,18 @@ class Schedule:
         mode means "all zones currently flagged in_smart_cycle".
       * `last_run_at` / `last_run_outcome` — set by the engine after each
         fire attempt; rendered on the schedule list in the dashboard.
+
+    Frozen since v4.2: instances are shared through `ConfigSnapshot`.
+    `days` / `zones` are copied to tuples so a snapshot shares no
+    mutable list with the store document.
     """
     id: str
     name: str
     enabled: bool = True
     time: str = "06:00"
-    days: List[str] = field(default_factory=list)  # [] = every day
+    days: Tuple[str, ...] = ()  # () = every day
     mode: str = SCHEDULE_MODE_SMART
-    zones: List[str] = field(default_factory=list)  # [] = all in_smart_cycle
+    zones: Tuple[str, ...] = ()  # () = all in_smart_cycle
     fixed_liters_per_zone: Optional[float] = None
     created_at: str = ""
     last_run_at: Optional[str] = None
@@ -87,8 +107,15 @@ class Schedule:
         filtered.setdefault("name", "")
         return cls(**filtered)
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "days", tuple(self.days or ()))
+        object.__setattr__(self, "zones", tuple(self.zones or ()))
+
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        data = asdict(self)
+        data["days"] = list(self.days)
+        data["zones"] = list(self.zones)
+        return data
 
 
 def _new_schedule_id() -> str:
@@ -100,12 +127,13 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-@dataclass
+@dataclass(frozen=True)
 class ZoneConfig:
     """Per-zone calculator + display config.
 
     Threshold fields use `None` to mean "inherit from global". The
     calculator and skip-condition checks resolve null → global at read time.
+    Frozen since v4.2: instances are shared through `ConfigSnapshot`.
     """
 
     factor: float = DEFAULT_ZONE_FACTOR
@@ -133,14 +161,95 @@ class ZoneConfig:
         return cls(**filtered)
 
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable typed view of the config document at one `version`.
+
+    `version` increases on every ZoneStore mutation within a process, so
+    `snap.version == last_seen` is a complete "nothing changed" check.
+    `zones_version` only moves when zone config changes — schedule edits
+    and `mark_schedule_run` stamps leave it (and `zones`) as they were.
+    """
+    version: int
+    zones: Mapping[str, ZoneConfig]
+    schedules: Tuple[Schedule, ...]
+    zones_version: int = 0
+
+    def get_schedule(self, schedule_id: str) -> Optional[Schedule]:
+        for sch in self.schedules:
+            if sch.id == schedule_id:
+                return sch
+        return None
+
+
+class _CacheDocument:
+    """One high-churn cache section persisted under its own Store key.
+
+    Loaded lazily on the first `async_get()`, and written through
+    `Store.async_delay_save` so several updates in quick succession
+    collapse into a single disk write. The payload is wrapped as
+    `{"data": ...}` so `None` round-trips cleanly.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, name: str) -> None:
+        self.name = name
+        self._store: Store = Store(
+            hass,
+            STORE_CACHE_VERSION,
+            f"{STORE_KEY_PREFIX}.{entry_id}.{name}",
+        )
+        self._data: Any = None
+        self._loaded = False
+
+    async def async_get(self) -> Any:
+        """Return the cached section, loading it from disk on first use."""
+        if not self._loaded:
+            raw = await self._store.async_load()
+            # A legacy-blob migration may have seeded us while we awaited.
+            if not self._loaded:
+                self._data = raw.get("data") if isinstance(raw, dict) else None
+                self._loaded = True
+        return self._data
+
+    def peek(self) -> Any:
+        """Sync read of the in-memory copy (None until loaded)."""
+        return self._data
+
+    def set(self, data: Any) -> None:
+        """Replace the section and schedule a coalesced write."""
+        self._data = data
+        self._loaded = True
+        self._store.async_delay_save(self._payload, STORE_CACHE_SAVE_DELAY_SECONDS)
+
+    async def async_set(self, data: Any) -> None:
+        """Replace the section and write it now (no coalescing delay)."""
+        self._data = data
+        self._loaded = True
+        await self._store.async_save(self._payload())
+
+    def _payload(self) -> Dict[str, Any]:
+        return {"data": self._data}
+
+
 class ZoneStore:
     """JSON-backed per-zone config store.
 
     The store is loaded once on integration setup, mutated in-memory by the
     config services, and persisted on every change. All reads are sync from
     the in-memory copy; only writes hit disk.
+
+    v4.2 — only `zones` + `schedules` live in the config document. The
+    cache sections are separate `_CacheDocument`s so config writes stay
+    tiny and cache writes never touch config.
     """
 
+    _CACHE_NAMES = (
+        STORE_CACHE_VPD_BUFFER,
+        STORE_CACHE_DAILY_SUMMARY,
+        STORE_CACHE_HISTORY,
+        STORE_CACHE_WATER_BALANCE,
+    )
+
     def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
         self.hass = hass
         self._store: Store = Store(
@@ -152,17 +261,29 @@ class ZoneStore:
             "version": STORE_VERSION,
             "zones": {},
             "schedules": [],         # populated in alpha-2
-            "history": {},           # schedule timeline (alpha-3)
-            "daily_summary": None,   # snapshot for cold-start hydration (alpha-4)
+        }
+        self._caches: Dict[str, _CacheDocument] = {
+            name: _CacheDocument(hass, entry_id, name)
+            for name in self._CACHE_NAMES
         }
         self._loaded = False
+        self._version = 0
+        # Zones section of the last snapshot: (raw copy, version, mapping).
+        self._zones_version = 0
+        self._zones_view: Optional[Tuple[Dict[str, Any], int, Mapping[str, ZoneConfig]]] = None
+        self._snapshot: Optional[ConfigSnapshot] = None
 
     # ─────────────────────────────────────────────────────────────────────
     # Lifecycle
     # ─────────────────────────────────────────────────────────────────────
 
     async def async_load(self) -> None:
-        """Load store from disk. Idempotent."""
+        """Load the config document from disk. Idempotent.
+
+        Cache documents are NOT loaded here — each loads on first access.
+        The exception is `history`, which backs sync sensor reads and is
+        small, so it is warmed up front.
+        """
         if self._loaded:
             return
         raw = await self._store.async_load()
@@ -172,22 +293,91 @@ class ZoneStore:
                 "version": raw.get("version", STORE_VERSION),
                 "zones": raw.get("zones", {}) or {},
                 "schedules": raw.get("schedules", []) or [],
-                "history": raw.get("history", {}) or {},
-                "daily_summary": raw.get("daily_summary"),  # may be None
-                "vpd_buffer": raw.get("vpd_buffer"),        # may be None
             }
             _LOGGER.info(
                 "📁 ZoneStore loaded: %d zone(s), %d schedule(s)",
                 len(self._data["zones"]), len(self._data["schedules"]),
             )
+            # Pre-v4.2 single-blob store: move each cache section into its
+            # own document, then rewrite the config without them. The
+            # cache documents are written (not delay-saved) first — once
+            # the slimmed config is on disk the legacy blob is gone, so a
+            # crash in between must not lose the caches.
+            legacy = [name for name in self._CACHE_NAMES if name in raw]
+            if legacy:
+                for name in legacy:
+                    if raw.get(name) is not None:
+                        await self._caches[name].async_set(raw[name])
+                await self._async_save()
+                _LOGGER.info(
+                    "📁 ZoneStore: split legacy cache sections %s into their "
+                    "own store documents", legacy,
+                )
         else:
             _LOGGER.info("📁 ZoneStore: no existing store, starting fresh")
+        await self._caches[STORE_CACHE_HISTORY].async_get()
+        self._mark_changed()
         self._loaded = True
 
     async def _async_save(self) -> None:
-        """Persist the in-memory state to disk."""
+        """Persist the config document (zones + schedules) to disk.
+
+        Every config mutation ends here, so this is also where the
+        snapshot is invalidated — before the await, so no reader can see
+        the mutated dicts through a stale snapshot.
+        """
+        self._mark_changed()
         await self._store.async_save(self._data)
 
+    # ─────────────────────────────────────────────────────────────────────
+    # Snapshot — v4.2
+    # ─────────────────────────────────────────────────────────────────────
+
+    def _mark_changed(self) -> None:
+        self._version += 1
+        self._snapshot = None
+
+    @property
+    def version(self) -> int:
+        """Monotonic config version; bumps on every mutation."""
+        return self._version
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Return the typed, immutable view of zones + schedules.
+
+        Built at most once per version; repeat calls are free.
+        """
+        snap = self._snapshot
+        if snap is None:
+            raw_zones = self._data["zones"]
+            view = self._zones_view
+            if view is None or view[0] != raw_zones:
+                self._zones_version += 1
+                view = (
+                    {name: dict(raw) for name, raw in raw_zones.items()},
+                    self._zones_version,
+                    MappingProxyType({
+                        name: ZoneConfig.from_dict(raw)
+                        for name, raw in raw_zones.items()
+                    }),
+                )
+                self._zones_view = view
+            snap = ConfigSnapshot(
+                version=self._version,
+                zones=view[2],
+                schedules=tuple(
+                    Schedule.from_dict(raw) for raw in self._data["schedules"]
+                ),
+                zones_version=view[1],
+            )
+            self._snapshot = snap
+        return snap
+
+    def _history(self) -> Dict[str, Any]:
+        """In-memory history section, created empty on first write."""
+        data = self._caches[STORE_CACHE_HISTORY].peek()
+        return data if isinstance(data, dict) else {}
+
     # ─────────────────────────────────────────────────────────────────────
     # Zone config — public API
     # ─────────────────────────────────────────────────────────────────────
@@ -200,16 +390,11 @@ class ZoneStore:
 
         Does NOT auto-create the zone — call `ensure_zone()` for that.
         """
-        raw = self._data["zones"].get(zone)
-        if raw is None:
-            return ZoneConfig()
-        return ZoneConfig.from_dict(raw)
+        cfg = self.snapshot().zones.get(zone)
+        return cfg if cfg is not None else ZoneConfig()
 
     def all_zones(self) -> Dict[str, ZoneConfig]:
-        return {
-            name: ZoneConfig.from_dict(raw)
-            for name, raw in self._data["zones"].items()
-        }
+        return dict(self.snapshot().zones)
 
     async def ensure_zone(self, zone: str) -> ZoneConfig:
         """Create a zone with default config if it doesn't exist yet.
@@ -278,13 +463,10 @@ class ZoneStore:
 
     def all_schedules_typed(self) -> List[Schedule]:
         """Return all stored schedules as `Schedule` objects (for the engine)."""
-        return [Schedule.from_dict(s) for s in self._data["schedules"]]
+        return list(self.snapshot().schedules)
 
     def get_schedule(self, schedule_id: str) -> Optional[Schedule]:
-        for raw in self._data["schedules"]:
-            if raw.get("id") == schedule_id:
-                return Schedule.from_dict(raw)
-        return None
+        return self.snapshot().get_schedule(schedule_id)
 
     async def create_schedule(
         self,
@@ -374,114 +556,34 @@ class ZoneStore:
     # ─────────────────────────────────────────────────────────────────────
     # History — v4.0-alpha-3
     #
-    # The `history` top-level slot stores two kinds of records, indexed
-    # by namespace key:
-    #
-    #   "_schedule_events": [...]      # global timeline of schedule
-    #                                    fires and skips with outcome
-    #                                    + zones + total liters.
+    # The `history` cache document stores per-zone records indexed by
+    # namespace key:
     #
     #   "<zone_friendly_name>": [...]  # per-zone session summaries
     #                                    (start, end, liters, trigger).
-    #                                    Populated by alpha-4 — alpha-3
-    #                                    only ships the global timeline.
     #
-    # Both kinds of records are pruned on every write by
-    # `_prune_history_namespace`: entries older than HISTORY_RETENTION_DAYS
-    # are removed, and any namespace with more than HISTORY_MAX_ENTRIES
-    # records is truncated to the most recent HISTORY_MAX_ENTRIES.
+    # v4.2 — the global schedule timeline (formerly the
+    # "_schedule_events" namespace) moved to the `irrigation_events`
+    # SQLite table; see `IrrigationDatabase.record_schedule_event`.
+    # `legacy_schedule_events` hands any pre-v4.2 records over once so
+    # the manager can import them.
     # ─────────────────────────────────────────────────────────────────────
 
     _SCHEDULE_EVENTS_KEY = "_schedule_events"
 
-    def _prune_history_namespace(self, key: str) -> None:
-        """Drop entries older than the retention window AND cap by count.
-
-        Tolerates malformed records (missing/invalid `at` timestamp) by
-        keeping them — better to leak a little than to lose data on a
-        parse error.
-        """
-        records = self._data["history"].get(key)
-        if not records:
-            return
-
-        cutoff = datetime.now(timezone.utc) - timedelta(days=HISTORY_RETENTION_DAYS)
-        kept: List[Dict[str, Any]] = []
-        for r in records:
-            at_str = r.get("at")
-            if not at_str:
-                kept.append(r)
-                continue
-            try:
-                at_dt = datetime.fromisoformat(at_str.replace("Z", "+00:00"))
-                if at_dt >= cutoff:
-                    kept.append(r)
-            except Exception:
-                kept.append(r)  # malformed, don't drop
-
-        # Hard count cap — keep most recent.
-        if len(kept) > HISTORY_MAX_ENTRIES:
-            kept = kept[-HISTORY_MAX_ENTRIES:]
-
-        self._data["history"][key] = kept
-
-    async def record_schedule_event(
-        self,
-        *,
-        kind: str,                              # "fired" | "skipped"
-        schedule_id: Optional[str],
-        schedule_name: Optional[str],
-        outcome: str,                           # OUTCOME_RAN, OUTCOME_SKIPPED_*, ...
-        mode: Optional[str] = None,
-        trigger: Optional[str] = None,          # "scheduled"|"catchup"|"manual"
-        zones: Optional[List[str]] = None,
-        total_liters: Optional[float] = None,
-    ) -> Dict[str, Any]:
-        """Append a schedule event to the global timeline and persist.
-
-        The dashboard's Insight tab reads this list to render the "what
-        happened in the last 7 days" timeline. Records are kept for
-        HISTORY_RETENTION_DAYS days, capped at HISTORY_MAX_ENTRIES total.
-        """
-        record: Dict[str, Any] = {
-            "at": _now_iso(),
-            "kind": kind,
-            "schedule_id": schedule_id,
-            "schedule_name": schedule_name,
-            "outcome": outcome,
-            "mode": mode,
-            "trigger": trigger,
-            "zones": list(zones or []),
-            "total_liters": (
-                round(float(total_liters), 2)
-                if total_liters is not None else None
-            ),
-        }
-        bucket = self._data["history"].setdefault(self._SCHEDULE_EVENTS_KEY, [])
-        bucket.append(record)
-        self._prune_history_namespace(self._SCHEDULE_EVENTS_KEY)
-        await self._async_save()
-        _LOGGER.debug(
-            "📜 ZoneStore: recorded schedule event kind=%s outcome=%s schedule=%s",
-            kind, outcome, schedule_id,
-        )
-        return record
-
-    def schedule_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Return the global schedule timeline, most-recent-first.
+    def legacy_schedule_events(self) -> List[Dict[str, Any]]:
+        """Pre-v4.2 JSON schedule timeline (oldest first), if still present."""
+        return list(self._history().get(self._SCHEDULE_EVENTS_KEY) or [])
 
-        `limit` clamps the returned slice to N records. None returns the
-        full retained set (capped by HISTORY_MAX_ENTRIES).
-        """
-        records = list(self._data["history"].get(self._SCHEDULE_EVENTS_KEY, []))
-        records.reverse()
-        if limit is not None:
-            records = records[:limit]
-        return records
+    def drop_legacy_schedule_events(self) -> None:
+        """Forget the pre-v4.2 JSON timeline once it has been imported."""
+        history = self._history()
+        if history.pop(self._SCHEDULE_EVENTS_KEY, None) is not None:
+            self._caches[STORE_CACHE_HISTORY].set(history)
 
     def history_for_zone(self, zone: str) -> List[Dict[str, Any]]:
         """Per-zone session summaries — populated by alpha-4. Empty until then."""
-        return list(self._data["history"].get(zone, []))
+        return list(self._history().get(zone, []))
 
     # ─────────────────────────────────────────────────────────────────────
     # Daily summary snapshot — v4.0-alpha-4
@@ -503,16 +605,27 @@ class ZoneStore:
     # offsets from now. Entries older than 24h are pruned at load time.
     # ─────────────────────────────────────────────────────────────────────
 
-    def get_vpd_buffer(self) -> Optional[List[Dict[str, Any]]]:
-        return self._data.get("vpd_buffer")
+    async def async_get_vpd_buffer(self) -> Optional[List[Dict[str, Any]]]:
+        return await self._caches[STORE_CACHE_VPD_BUFFER].async_get()
 
     async def set_vpd_buffer(self, entries: List[Dict[str, Any]]) -> None:
-        self._data["vpd_buffer"] = entries
-        await self._async_save()
+        self._caches[STORE_CACHE_VPD_BUFFER].set(entries)
 
-    def get_daily_summary(self) -> Optional[Dict[str, Any]]:
-        return self._data.get("daily_summary")
+    async def async_get_daily_summary(self) -> Optional[Dict[str, Any]]:
+        return await self._caches[STORE_CACHE_DAILY_SUMMARY].async_get()
 
     async def set_daily_summary(self, snapshot: Optional[Dict[str, Any]]) -> None:
-        self._data["daily_summary"] = snapshot
-        await self._async_save()
+        self._caches[STORE_CACHE_DAILY_SUMMARY].set(snapshot)
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Soil water balance — v4.2
+    #
+    # `water_balance.WaterBalance.to_snapshot()`: the open day, its rain
+    # observation and one depletion float per zone.
+    # ─────────────────────────────────────────────────────────────────────
+
+    async def async_get_water_balance(self) -> Optional[Dict[str, Any]]:
+        return await self._caches[STORE_CACHE_WATER_BALANCE].async_get()
+
+    async def set_water_balance(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        self._caches[STORE_CACHE_WATER_BALANCE].set(snapshot)